@@ -17,6 +17,9 @@ AUC_MIN = float(os.environ.get("AUC_MIN", "0.65"))
 INJECT_DRIFT = os.environ.get("INJECT_DRIFT", "1") == "1"
 FORCE_RETRAIN = os.environ.get("FORCE_RETRAIN", "0") == "1"
 DATA_TRIGGER_PATH = os.environ.get("DATA_TRIGGER_PATH", f"{PROJECT_DIR}/data/drift/new_data.flag")
+# full — MLP с нуля; incremental — partial_fit прошлой модели на новом размеченном батче
+NN_TRAIN_MODE = os.environ.get("NN_TRAIN_MODE", "full")
+NN_NEW_DATA_PATH = os.environ.get("NN_NEW_DATA_PATH", "data/drift/current.csv")
 
 
 def _read_json(path: str) -> dict:
@@ -86,7 +89,7 @@ with DAG(
         bash_command=(
             "cd $PROJECT_DIR && "
             "python -m src.monitoring.drift_job "
-            "--reference-path data/processed/credit.csv "
+            "--reference-path data/processed/credit.feather "
             "--current-path data/drift/current.csv "
             "--model-path models/model.joblib "
             "--out-dir reports/evidently "
@@ -103,9 +106,37 @@ with DAG(
         bash_command=(
             "cd $PROJECT_DIR && "
             "dvc repro --no-scm train && "
-            "python -m src.models.train_nn_onnx --data-path data/processed/credit.csv "
+            "python -m src.models.train_nn_onnx --data-path data/processed/credit.feather "
             "--model-path models/nn_model.joblib --onnx-path models/nn_model.onnx "
-            "&& rm -f data/drift/new_data.flag"
+            + (
+                f"--mode incremental --new-data-path {NN_NEW_DATA_PATH} "
+                if NN_TRAIN_MODE == "incremental"
+                else ""
+            )
+            + "&& rm -f data/drift/new_data.flag"
+        ),
+    )
+
+    # Офлайн-оптимизация графа + ORT-формат с проверкой паритета (падает при расхождении)
+    optimize_onnx = BashOperator(
+        task_id="optimize_onnx",
+        bash_command=(
+            "cd $PROJECT_DIR && "
+            "python -m src.models.optimize_onnx --data-path data/processed/credit.feather "
+            "--onnx-path models/nn_model.onnx --out-path models/nn_model.ort "
+            "--report-path reports/onnx_optimization.json"
+        ),
+    )
+
+    # API берёт models/nn_model.bundle раньше .ort/.onnx: бандл собирается заново,
+    # иначе после переобучения отдавался бы старый (с прежними порогом и весами NumPy)
+    build_bundle = BashOperator(
+        task_id="build_bundle",
+        bash_command=(
+            "cd $PROJECT_DIR && "
+            "python -m src.models.build_bundle --model-path models/nn_model.ort "
+            "--joblib-path models/nn_model.joblib --out-path models/nn_model.bundle "
+            "--report-path reports/bundle.json"
         ),
     )
 
@@ -133,5 +164,6 @@ with DAG(
     end = EmptyOperator(task_id="end")
 
     start >> simulate_current >> drift_report >> branch
-    branch >> retrain >> evaluate >> quality_gate >> mark_ready >> end
+    branch >> retrain >> optimize_onnx >> build_bundle >> evaluate
+    evaluate >> quality_gate >> mark_ready >> end
     branch >> skip >> end
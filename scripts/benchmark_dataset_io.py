@@ -0,0 +1,101 @@
+import argparse
+import json
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import psutil
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset, write_columnar  # noqa: E402
+from src.models.latency import peak_rss_mb  # noqa: E402
+
+
+def _load_once(path: str, columns, queue) -> None:
+    # Отдельный процесс на каждый замер: RSS не "помнит" предыдущие загрузки
+    proc = psutil.Process()
+    rss_before = proc.memory_info().rss
+    t0 = time.perf_counter()
+    df = read_dataset(Path(path), columns=columns)
+    elapsed = time.perf_counter() - t0
+    queue.put(
+        {
+            "seconds": elapsed,
+            "rss_delta_mb": (proc.memory_info().rss - rss_before) / 2**20,
+            "peak_rss_mb": peak_rss_mb(),
+            "frame_mb": float(df.memory_usage(deep=True).sum()) / 2**20,
+        }
+    )
+
+
+def bench_format(path: Path, columns, runs: int) -> dict:
+    ctx = mp.get_context("spawn")
+    samples = []
+    for _ in range(runs):
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_load_once, args=(str(path), columns, queue))
+        proc.start()
+        samples.append(queue.get())
+        proc.join()
+
+    seconds = sorted(s["seconds"] for s in samples)
+    return {
+        "path": str(path),
+        "size_mb": path.stat().st_size / 2**20,
+        "load_ms_median": seconds[len(seconds) // 2] * 1000,
+        "load_ms_min": seconds[0] * 1000,
+        "rss_delta_mb": max(s["rss_delta_mb"] for s in samples),
+        "peak_rss_mb": max(s["peak_rss_mb"] for s in samples),
+        "frame_mb": samples[0]["frame_mb"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Load time / RSS: CSV vs Parquet vs Feather")
+    parser.add_argument("--csv-path", default="data/processed/credit.csv")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--columns",
+        default="",
+        help="Список колонок через запятую (проверка column projection)",
+    )
+    parser.add_argument("--out-path", default="reports/dataset_io_benchmark.json")
+    args = parser.parse_args()
+
+    csv_path = Path(args.csv_path)
+    columns = [c for c in args.columns.split(",") if c] or None
+
+    import pandas as pd
+
+    df = pd.read_csv(csv_path)
+    results = {"rows": len(df), "columns": columns, "formats": {}}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        parquet_path = write_columnar(df, Path(tmp) / "credit.parquet")
+        feather_path = write_columnar(df, Path(tmp) / "credit.feather")
+        del df
+
+        for name, path in (("csv", csv_path), ("parquet", parquet_path), ("feather", feather_path)):
+            results["formats"][name] = bench_format(path, columns, args.runs)
+
+    base = results["formats"]["csv"]["load_ms_median"]
+    print(f"Rows: {results['rows']}, columns: {columns or 'all'}")
+    for name, r in results["formats"].items():
+        print(
+            f"{name:8s} size={r['size_mb']:7.2f} MB  load={r['load_ms_median']:8.2f} ms "
+            f"(x{base / r['load_ms_median']:.1f} vs csv)  rss+={r['rss_delta_mb']:7.1f} MB  "
+            f"peak_rss={r['peak_rss_mb']:7.1f} MB  frame={r['frame_mb']:6.2f} MB"
+        )
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.data.make_dataset import RAW_COLUMNS  # noqa: E402
+from src.features.engine import engineer_columns, engineer_frame  # noqa: E402
+
+
+def pandas_baseline(df: pd.DataFrame) -> pd.DataFrame:
+    """Прежняя реализация на pandas (build_features до единого движка)."""
+    df = df.copy()
+    bill_cols = [c for c in df.columns if c.startswith("BILL_AMT")]
+    pay_cols = [c for c in df.columns if c.startswith("PAY_AMT")]
+    df["BILL_AMT_SUM"] = df[bill_cols].sum(axis=1)
+    df["PAY_AMT_SUM"] = df[pay_cols].sum(axis=1)
+    denom = df["BILL_AMT_SUM"].replace(0, np.nan)
+    df["PAY_RATIO"] = (df["PAY_AMT_SUM"] / denom).fillna(0.0).clip(lower=0.0)
+    df["AGE_BIN"] = pd.cut(
+        df["AGE"],
+        bins=[0, 25, 35, 45, 55, 65, 200],
+        labels=["<25", "25-34", "35-44", "45-54", "55-64", "65+"],
+        right=False,
+    ).astype(str)
+    return df
+
+
+def bench(fn, rows: int, min_time: float) -> dict:
+    fn()  # прогрев
+    runs, total = 0, 0.0
+    times = []
+    while total < min_time or runs < 3:
+        t0 = time.perf_counter()
+        fn()
+        dt = time.perf_counter() - t0
+        times.append(dt)
+        total += dt
+        runs += 1
+    times.sort()
+    median = times[len(times) // 2]
+    return {"us_median": median * 1e6, "rows_per_s": rows / median, "runs": runs}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Feature engine throughput across batch sizes")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--batch-sizes", default="1,10,100,1000,10000,100000")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Секунд на одну точку")
+    parser.add_argument("--out-path", default="reports/features_benchmark.json")
+    args = parser.parse_args()
+
+    base = read_dataset(Path(args.data_path), columns=[c for c in RAW_COLUMNS if c != "default"])
+    results = []
+    for n in [int(x) for x in args.batch_sizes.split(",")]:
+        reps = -(-n // len(base))
+        df = pd.concat([base] * reps, ignore_index=True).head(n)
+        columns = {c: df[c].to_numpy() for c in df.columns}
+        row = {
+            "batch_size": n,
+            "pandas_baseline": bench(lambda: pandas_baseline(df), n, args.min_time),
+            "engine_frame": bench(lambda: engineer_frame(df), n, args.min_time),
+            "engine_arrays": bench(lambda: engineer_columns(columns, n), n, args.min_time),
+        }
+        results.append(row)
+        print(
+            f"n={n:>7}: pandas {row['pandas_baseline']['us_median']:>10.1f} us | "
+            f"frame {row['engine_frame']['us_median']:>10.1f} us | "
+            f"arrays {row['engine_arrays']['us_median']:>10.1f} us | "
+            f"arrays {row['engine_arrays']['rows_per_s']:,.0f} rows/s"
+        )
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+from sklearn.model_selection import train_test_split
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.data.synthetic import SyntheticModel, fit_synthetic, generate_chunks  # noqa: E402
+from src.inference.model import OnnxModel  # noqa: E402
+from src.models.latency import ort_latency  # noqa: E402
+from src.models.onnx_export import export_pipeline  # noqa: E402
+from src.models.pipeline import Schema, split_xy  # noqa: E402
+from src.models.selection import benchmark_latency  # noqa: E402
+from src.models.train import default_experiments, fit_experiment  # noqa: E402
+
+MODELS = ("gb", "rf", "hgb")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="GB / RF / HGB: время обучения и инференса")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--generator-path", default="models/synthetic_generator.npz")
+    parser.add_argument("--rows", default="30000,300000,3000000")
+    parser.add_argument(
+        "--max-rows-slow",
+        type=int,
+        default=300_000,
+        help="GB/RF на большем числе строк пропускаются (часы на одном ядре)",
+    )
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--batch-sizes", default="1,64")
+    parser.add_argument("--repeats", type=int, default=50)
+    parser.add_argument("--out-path", default="reports/hgb_benchmark.json")
+    args = parser.parse_args()
+
+    gen_path = Path(args.generator_path)
+    if gen_path.exists():
+        generator = SyntheticModel.load(gen_path)
+    else:
+        generator = fit_synthetic(read_dataset(Path(args.data_path)))
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    experiments = {e.run_name: e for e in default_experiments()}
+
+    report = {"batch_sizes": batch_sizes, "runs": []}
+    for n_rows in [int(r) for r in args.rows.split(",")]:
+        df = pd.concat(generate_chunks(generator, n_rows, seed=n_rows), ignore_index=True)
+        X, y = split_xy(df, Schema())
+        X_train, X_test, y_train, y_test = train_test_split(
+            X, y, test_size=0.2, random_state=42, stratify=y
+        )
+        for name in MODELS:
+            row = {"rows": n_rows, "model": name}
+            if name != "hgb" and n_rows > args.max_rows_slow:
+                row["skipped"] = f"rows > --max-rows-slow={args.max_rows_slow}"
+                report["runs"].append(row)
+                print(f"{n_rows:>9} {name:>4}: skipped")
+                continue
+            exp = experiments[name]
+            t0 = time.perf_counter()
+            res = fit_experiment(
+                exp.name, exp.estimator, X_train, y_train, X_test, y_test, False, 0, args.n_jobs
+            )
+            row["fit_seconds"] = round(time.perf_counter() - t0, 3)
+            row["roc_auc"] = round(res.metrics["roc_auc"], 4)
+            row["latency_sklearn"] = benchmark_latency(
+                res.model, X_test, batch_sizes, args.repeats, warmup=5
+            )
+            if name == "hgb":
+                model = res.model.named_steps["model"]
+                row["n_iter"] = int(model.n_iter_)
+                onnx_path = Path("artifacts") / f"hgb_{n_rows}.onnx"
+                sample = X_test.iloc[:5000]
+                exported = export_pipeline(res.model, sample, res.cat_cols, onnx_path)
+                row["onnx_max_abs_diff"] = exported["parity"]["max_abs_diff"]
+                row["latency_onnx"] = ort_latency(
+                    OnnxModel(onnx_path, threads=1), X_test, batch_sizes, args.repeats
+                )
+            report["runs"].append(row)
+            lat = row["latency_sklearn"]
+            print(
+                f"{n_rows:>9} {name:>4}: fit={row['fit_seconds']:.1f}s auc={row['roc_auc']:.4f} "
+                + " ".join(f"b{b} p50={lat[b]['p50_ms']:.2f}ms" for b in batch_sizes)
+                + (
+                    " | onnx "
+                    + " ".join(
+                        f"b{b} p50={row['latency_onnx'][b]['p50_ms']:.2f}ms" for b in batch_sizes
+                    )
+                    if "latency_onnx" in row
+                    else ""
+                )
+            )
+        del df, X, y, X_train, X_test
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved: {out_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,82 +1,40 @@
+"""sklearn vs ONNX на одном размере батча — обёртка над ``src.models.benchmark``."""
+
 import argparse
-import time
+import json
+import sys
 from pathlib import Path
 
-import joblib
-import numpy as np
-import onnxruntime as ort
-import pandas as pd
-
-
-CAT_COLS = {"SEX", "EDUCATION", "MARRIAGE", "AGE_BIN"}
-
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-def to_onnx_inputs(df: pd.DataFrame) -> dict:
-    """
-    skl2onnx для sklearn-пайплайнов часто ожидает отдельный input на каждый столбец.
-    Категориальные -> string, числовые -> float32.
-    """
-    inputs = {}
-    for c in df.columns:
-        col = df[[c]]
-        if c in CAT_COLS:
-            inputs[c] = col.astype(str).values
-        else:
-            inputs[c] = col.astype(np.float32).values
-    return inputs
-
-
-def bench(fn, warmup: int, n_runs: int) -> float:
-    # warmup
-    for _ in range(warmup):
-        fn()
-    t0 = time.perf_counter()
-    for _ in range(n_runs):
-        fn()
-    t1 = time.perf_counter()
-    return (t1 - t0) / n_runs
+from src.models.benchmark import describe, load_frame, parse_backend, run_suite  # noqa: E402
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data-path", default="data/processed/credit.csv")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
     parser.add_argument("--sk-model", default="models/nn_model.joblib")
     parser.add_argument("--onnx-model", default="models/nn_model.onnx")
     parser.add_argument("--batch-size", type=int, default=256)
     parser.add_argument("--warmup", type=int, default=30)
     parser.add_argument("--runs", type=int, default=200)
+    parser.add_argument("--out-path", default="reports/benchmark_onnx.json")
     args = parser.parse_args()
 
-    data_path = Path(args.data_path)
-    sk_path = Path(args.sk_model)
-    onnx_path = Path(args.onnx_model)
-
-    df = pd.read_csv(data_path)
-    X = df.drop(columns=["default"])
-
-    # Берем один и тот же батч
-    batch = X.sample(n=min(args.batch_size, len(X)), random_state=1).reset_index(drop=True)
-
-    # sklearn
-    sk_model = joblib.load(sk_path)
-
-    # onnxruntime
-    sess = ort.InferenceSession(onnx_path.as_posix(), providers=["CPUExecutionProvider"])
-    onnx_inputs = to_onnx_inputs(batch)
-
-    def sklearn_call():
-        _ = sk_model.predict_proba(batch)
-
-    def onnx_call():
-        _ = sess.run(None, onnx_inputs)
-
-    sk_t = bench(sklearn_call, warmup=args.warmup, n_runs=args.runs)
-    onnx_t = bench(onnx_call, warmup=args.warmup, n_runs=args.runs)
-
-    print(f"Batch size: {len(batch)}")
-    print(f"Sklearn avg: {sk_t*1000:.3f} ms/run")
-    print(f"ONNX    avg: {onnx_t*1000:.3f} ms/run")
-    print(f"Speedup: {sk_t/onnx_t:.2f}x")
+    backends = [
+        parse_backend(f"sklearn=sklearn:{args.sk_model}"),
+        parse_backend(f"onnx=onnx:{args.onnx_model}"),
+    ]
+    X = load_frame(Path(args.data_path), rows=max(5000, args.batch_size))
+    report = run_suite(backends, X, [args.batch_size], [1], args.runs, args.warmup)
+    Path(args.out_path).parent.mkdir(parents=True, exist_ok=True)
+    Path(args.out_path).write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print(describe(report))
+    by_name = {r["name"]: r for r in report["results"]}
+    if {"sklearn", "onnx"} <= set(by_name):
+        print(f"Speedup p50: {by_name['sklearn']['p50_ms'] / by_name['onnx']['p50_ms']:.2f}x")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,89 @@
+import argparse
+import json
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+from sklearn.model_selection import train_test_split
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.models.pipeline import Schema, split_xy  # noqa: E402
+from src.models.search import SearchConfig  # noqa: E402
+from src.models.train import default_experiments, fit_experiment, load_params  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Exhaustive random search vs successive halving")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--experiments", default="logreg_tuned,rf_tuned")
+    parser.add_argument("--n-jobs", type=int, default=-1)
+    parser.add_argument("--out-path", default="reports/search_comparison.json")
+    args = parser.parse_args()
+
+    train_params = load_params().get("train", {})
+    base = SearchConfig.from_params(train_params)
+    modes = {
+        "random": replace(base, mode="random"),
+        "halving_samples": replace(base, mode="halving", resource="n_samples"),
+        "halving_estimators": replace(base, mode="halving", resource="n_estimators"),
+    }
+
+    X, y = split_xy(read_dataset(Path(args.data_path)), Schema())
+    X_train, X_test, y_train, y_test = train_test_split(
+        X,
+        y,
+        test_size=float(train_params.get("test_size", 0.2)),
+        random_state=int(train_params.get("random_state", 42)),
+        stratify=y,
+    )
+
+    wanted = set(args.experiments.split(","))
+    report = {"rows": len(X), "budget_fits": base.budget, "experiments": {}}
+    for exp in default_experiments():
+        if exp.run_name not in wanted:
+            continue
+        rows = {}
+        for mode, cfg in modes.items():
+            if mode == "halving_estimators" and "n_estimators" not in exp.estimator.get_params():
+                continue
+            res = fit_experiment(
+                exp.name,
+                exp.estimator,
+                X_train,
+                y_train,
+                X_test,
+                y_test,
+                tune=True,
+                n_iter=cfg.n_iter,
+                n_jobs=args.n_jobs,
+                search=cfg,
+            )
+            rows[mode] = {
+                "test_roc_auc": res.metrics["roc_auc"],
+                "cv_best": res.cv_best,
+                "best_params": {k: str(v) for k, v in res.best_params.items()},
+                **res.search_info,
+            }
+            print(
+                f"{exp.run_name:>14} {mode:>18}: auc={res.metrics['roc_auc']:.4f} "
+                f"search={res.search_info['seconds']:.1f}s "
+                f"fits={res.search_info['full_fit_equivalents']:.1f} "
+                f"candidates={res.search_info['n_candidates']}"
+            )
+        ref = rows["random"]
+        for mode, row in rows.items():
+            row["auc_delta_vs_random"] = round(row["test_roc_auc"] - ref["test_roc_auc"], 5)
+            row["time_ratio_vs_random"] = round(row["seconds"] / max(ref["seconds"], 1e-9), 3)
+        report["experiments"][exp.run_name] = rows
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import argparse
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from sklearn.model_selection import train_test_split
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.models.pipeline import Schema, split_xy  # noqa: E402
+from src.models.train import default_experiments, run_experiments  # noqa: E402
+
+
+def timed(experiments, data, n_iter: int, max_parallel: int, cache_dir) -> dict:
+    t0 = time.perf_counter()
+    results = run_experiments(
+        experiments, *data, n_iter=n_iter, max_parallel=max_parallel, cache_dir=cache_dir
+    )
+    return {
+        "wall_seconds": round(time.perf_counter() - t0, 3),
+        "experiments": {
+            r.key: {"seconds": round(r.seconds, 3), "roc_auc": r.value.metrics["roc_auc"]}
+            for r in results
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Training-stage wall time with/without prep cache")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    all_names = ",".join(e.run_name for e in default_experiments())
+    parser.add_argument(
+        "--experiments",
+        default="logreg,logreg_tuned,rf,gb",
+        help=f"run_name через запятую ('all' — все из train.py: {all_names})",
+    )
+    parser.add_argument("--n-iter", type=int, default=10)
+    parser.add_argument("--max-parallel", type=int, default=1)
+    parser.add_argument("--out-path", default="reports/train_cache_benchmark.json")
+    args = parser.parse_args()
+
+    X, y = split_xy(read_dataset(Path(args.data_path)), Schema())
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=0.2, random_state=42, stratify=y
+    )
+    data = (X_train, y_train, X_test, y_test)
+
+    experiments = default_experiments()
+    if args.experiments != "all":
+        wanted = set(args.experiments.split(","))
+        experiments = [e for e in experiments if e.run_name in wanted]
+
+    report = {"rows": len(X), "n_iter": args.n_iter, "max_parallel": args.max_parallel}
+    report["no_cache"] = timed(experiments, data, args.n_iter, args.max_parallel, None)
+    with tempfile.TemporaryDirectory() as cache_dir:
+        report["cache_cold"] = timed(experiments, data, args.n_iter, args.max_parallel, cache_dir)
+        # Повторный запуск (следующий retrain на тех же данных) берёт препроцессинг из кэша
+        report["cache_warm"] = timed(experiments, data, args.n_iter, args.max_parallel, cache_dir)
+
+    for mode in ("no_cache", "cache_cold", "cache_warm"):
+        r = report[mode]
+        per_exp = ", ".join(f"{k}={v['seconds']:.1f}s" for k, v in r["experiments"].items())
+        print(f"{mode:>10}: {r['wall_seconds']:.1f}s ({per_exp})")
+    aucs = {
+        m: [v["roc_auc"] for v in report[m]["experiments"].values()] for m in report if "cache" in m
+    }
+    report["same_metrics"] = len({tuple(v) for v in aucs.values()}) == 1
+    print("Same metrics across modes:", report["same_metrics"])
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
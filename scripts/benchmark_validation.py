@@ -0,0 +1,97 @@
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.data.compiled_validation import compile_suite  # noqa: E402
+from src.data.validation import load_suite  # noqa: E402
+
+
+def bench(fn, runs: int) -> dict:
+    times = []
+    result = None
+    for _ in range(runs):
+        t0 = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "ms_median": times[len(times) // 2] * 1000,
+        "ms_min": times[0] * 1000,
+        "success": bool(result["success"]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compiled validator vs Great Expectations")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--suite-path", default="data/expectations/credit_suite.json")
+    parser.add_argument("--chunk-rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--skip-ge", action="store_true")
+    parser.add_argument("--out-path", default="reports/validation_benchmark.json")
+    args = parser.parse_args()
+
+    data_path = Path(args.data_path)
+    suite = load_suite(Path(args.suite_path))
+    df = read_dataset(data_path)
+
+    t0 = time.perf_counter()
+    plan = compile_suite(suite)
+    compile_ms = (time.perf_counter() - t0) * 1000
+
+    results = {
+        "rows": len(df),
+        "expectations": len(suite.get("expectations", [])),
+        "compiled": {
+            "compile_ms": compile_ms,
+            "in_memory": bench(lambda: plan.validate(df), args.runs),
+            "chunked_from_file": bench(
+                lambda: plan.validate_path(data_path, chunk_rows=args.chunk_rows), args.runs
+            ),
+        },
+    }
+
+    if not args.skip_ge:
+        try:
+            t0 = time.perf_counter()
+            import great_expectations as ge  # type: ignore
+
+            import_ms = (time.perf_counter() - t0) * 1000
+            results["ge"] = {
+                "import_ms": import_ms,
+                "in_memory": bench(
+                    lambda: ge.from_pandas(df).validate(expectation_suite=suite), args.runs
+                ),
+            }
+        except ImportError:
+            print("great_expectations is not installed: GE path skipped")
+
+    print(f"Rows: {results['rows']}, expectations: {results['expectations']}")
+    c = results["compiled"]
+    print(f"compiled compile: {c['compile_ms']:.3f} ms")
+    print(f"compiled in-memory: {c['in_memory']['ms_median']:.2f} ms")
+    print(
+        f"compiled chunked ({args.chunk_rows} rows, incl. read): "
+        f"{c['chunked_from_file']['ms_median']:.2f} ms"
+    )
+    if "ge" in results:
+        g = results["ge"]
+        print(f"GE import: {g['import_ms']:.0f} ms")
+        print(f"GE in-memory: {g['in_memory']['ms_median']:.2f} ms")
+        speedup = g["in_memory"]["ms_median"] / c["in_memory"]["ms_median"]
+        print(f"Speedup (GE/compiled): {speedup:.1f}x")
+
+    out_path = Path(args.out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    print("Saved:", out_path)
+
+
+if __name__ == "__main__":
+    main()
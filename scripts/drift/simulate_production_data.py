@@ -1,10 +1,22 @@
 import argparse
+import sys
 from pathlib import Path
 
 import numpy as np
 import pandas as pd
 from sklearn.model_selection import train_test_split
 
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+from src.data.synthetic import (  # noqa: E402
+    SyntheticModel,
+    fit_synthetic,
+    generate_chunks,
+    load_scenarios,
+)
+
 
 def inject_drift(df: pd.DataFrame, seed: int = 42) -> pd.DataFrame:
     """Небольшая искусственная имитация дрифта: сдвигаем несколько числовых признаков.
@@ -34,14 +46,44 @@ def main() -> None:
     parser = argparse.ArgumentParser(
         description="Симуляция новых прод-данных для дрифт мониторинга"
     )
-    parser.add_argument("--data-path", default="data/processed/credit.csv")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
     parser.add_argument("--out-path", default="data/drift/current.csv")
     parser.add_argument("--rows", type=int, default=2000)
     parser.add_argument("--inject-drift", action="store_true", help="Добавить искусственный дрейф")
     parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument(
+        "--synthetic",
+        action="store_true",
+        help="Генерировать строки копула-генератором (src.data.synthetic), а не брать test split",
+    )
+    parser.add_argument(
+        "--synthetic-model",
+        default="models/synthetic_generator.npz",
+        help="Обученный генератор; если файла нет — обучается на лету по --data-path",
+    )
+    parser.add_argument("--scenario", default=None, help="YAML со сценариями дрифта")
     args = parser.parse_args()
 
-    df = pd.read_csv(args.data_path)
+    if args.synthetic:
+        model_path = Path(args.synthetic_model)
+        if model_path.exists():
+            model = SyntheticModel.load(model_path)
+        else:
+            model = fit_synthetic(read_dataset(Path(args.data_path)))
+        scenarios = load_scenarios(Path(args.scenario) if args.scenario else None)
+        cur = pd.concat(
+            generate_chunks(model, args.rows, seed=args.seed, scenarios=scenarios),
+            ignore_index=True,
+        )
+        if args.inject_drift:
+            cur = inject_drift(cur, seed=args.seed)
+        out_path = Path(args.out_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        cur.to_csv(out_path, index=False)
+        print(f"Saved synthetic current data: {out_path} (rows={len(cur)})")
+        return
+
+    df = read_dataset(Path(args.data_path))
     # Берём "тестовую" часть как псевдо-текущие данные
     train_df, test_df = train_test_split(
         df,
@@ -1,16 +1,21 @@
 import argparse
 import json
+import sys
 from pathlib import Path
 
 import joblib
-import pandas as pd
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import train_test_split
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.data.columnar import read_dataset  # noqa: E402
+
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data-path", default="data/processed/credit.csv")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
     parser.add_argument("--model-path", default="models/model.joblib")
     parser.add_argument("--out-path", default="reports/model_eval.json")
     parser.add_argument("--target-col", default="default")
@@ -18,7 +23,7 @@ def main() -> None:
     parser.add_argument("--random-state", type=int, default=42)
     args = parser.parse_args()
 
-    df = pd.read_csv(args.data_path)
+    df = read_dataset(Path(args.data_path))
     X = df.drop(columns=[args.target_col])
     y = df[args.target_col].astype(int)
 
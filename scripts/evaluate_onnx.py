@@ -1,59 +1,27 @@
 import argparse
 import json
+import sys
 from pathlib import Path
 
-import numpy as np
-import onnxruntime as ort
 import pandas as pd
 from sklearn.metrics import roc_auc_score
 from sklearn.model_selection import train_test_split
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
 
-CAT_COLS = {"SEX", "EDUCATION", "MARRIAGE", "AGE_BIN"}
-
-
-def to_onnx_inputs(df: pd.DataFrame) -> dict:
-    inputs = {}
-    for c in df.columns:
-        col = df[[c]]
-        if c in CAT_COLS:
-            inputs[c] = col.astype(str).values
-        else:
-            # skl2onnx обычно ожидает float32
-            inputs[c] = col.astype(np.float32).values
-    return inputs
-
-
-def extract_proba(outputs) -> np.ndarray:
-    probs = outputs[-1]
-
-    # ZipMap: list[dict]
-    if isinstance(probs, list) and len(probs) > 0 and isinstance(probs[0], dict):
-        out = []
-        for d in probs:
-            if 1 in d:
-                out.append(d[1])
-            elif "1" in d:
-                out.append(d["1"])
-            else:
-                out.append(max(d.values()))
-        return np.asarray(out, dtype=float)
-
-    probs = np.asarray(probs)
-    if probs.ndim == 2 and probs.shape[1] == 2:
-        return probs[:, 1].astype(float)
-    return probs.reshape(-1).astype(float)
+from src.data.columnar import read_dataset  # noqa: E402
+from src.inference.model import OnnxModel  # noqa: E402
 
 
 def eval_onnx(onnx_path: str, X: pd.DataFrame, y: pd.Series) -> float:
-    sess = ort.InferenceSession(onnx_path, providers=["CPUExecutionProvider"])
-    proba = extract_proba(sess.run(None, to_onnx_inputs(X)))
+    proba = OnnxModel(Path(onnx_path)).predict_proba_frame(X)
     return float(roc_auc_score(y, proba))
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--data-path", default="data/processed/credit.csv")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
     parser.add_argument("--onnx-path", default="models/nn_model.onnx")
     parser.add_argument("--onnx-int8-path", default="models/nn_model_int8.onnx")
     parser.add_argument("--out-path", default="reports/onnx_eval.json")
@@ -62,7 +30,7 @@ def main() -> None:
     parser.add_argument("--seed", type=int, default=42)
     args = parser.parse_args()
 
-    df = pd.read_csv(args.data_path)
+    df = read_dataset(Path(args.data_path))
     y = df[args.target_col]
     X = df.drop(columns=[args.target_col])
 
@@ -1,44 +1,88 @@
+"""Нагрузочный сценарий API скоринга.
+
+Payload'ы — реальные строки ``credit.csv`` (или синтетики, ``loadtest.generator_path``),
+а не один размноженный запрос: распределение признаков, а значит и ветки
+валидации/модели, как в проде. Смесь запросов задаётся весами ``loadtest.weights``
+(одиночный ``/predict``, ``/predict/batch`` случайного размера, ``/health``),
+форма нагрузки — ``loadtest.shape`` (step | spike | none). По завершении SLO
+(p95/p99/доля ошибок) проверяются по каждому запросу, и при нарушении locust
+выходит с кодом 1.
+
+    locust -f scripts/locustfile.py --host http://localhost:8000 --headless \\
+        --csv reports/loadtest/run --csv-full-history
+    python -m src.loadtest.summary --prefix reports/loadtest/run
+
+Переменные окружения: ``LOADTEST_PARAMS`` (путь к params.yaml), ``LOADTEST_SHAPE``
+(переопределяет ``loadtest.shape``; ``none`` — пользователи из ``-u/-r``).
+"""
+
+import os
 import random
-from locust import HttpUser, task, between
-
-
-PAYLOAD = {
-    "LIMIT_BAL": 200000,
-    "SEX": 2,
-    "EDUCATION": 2,
-    "MARRIAGE": 1,
-    "AGE": 35,
-    "PAY_0": 0,
-    "PAY_2": 0,
-    "PAY_3": 0,
-    "PAY_4": 0,
-    "PAY_5": 0,
-    "PAY_6": 0,
-    "BILL_AMT1": 50000,
-    "BILL_AMT2": 48000,
-    "BILL_AMT3": 47000,
-    "BILL_AMT4": 46000,
-    "BILL_AMT5": 45000,
-    "BILL_AMT6": 44000,
-    "PAY_AMT1": 2000,
-    "PAY_AMT2": 2000,
-    "PAY_AMT3": 2000,
-    "PAY_AMT4": 2000,
-    "PAY_AMT5": 2000,
-    "PAY_AMT6": 2000,
-}
-
-
-class PredictUser(HttpUser):
-    wait_time = between(0.0, 0.01)  # почти без паузы
-
-    @task
+import sys
+from pathlib import Path
+
+from locust import HttpUser, LoadTestShape, between, events, task
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from src.loadtest.config import load_config  # noqa: E402
+from src.loadtest.payloads import PayloadSampler  # noqa: E402
+from src.loadtest.shapes import build_shape  # noqa: E402
+from src.loadtest.summary import AGGREGATED, describe, evaluate_slo  # noqa: E402
+
+CONFIG = load_config(Path(os.getenv("LOADTEST_PARAMS", ROOT / "params.yaml")))
+SAMPLER = PayloadSampler.from_config(CONFIG)
+SHAPE_KIND = os.getenv("LOADTEST_SHAPE", CONFIG.shape)
+SHAPE = build_shape(SHAPE_KIND, getattr(CONFIG, SHAPE_KIND, {}))
+
+
+def _check(response) -> None:
+    if response.status_code != 200:
+        response.failure(f"HTTP {response.status_code}")
+
+
+class ScoringUser(HttpUser):
+    wait_time = between(*CONFIG.wait_seconds)
+
+    @task(CONFIG.weights.get("single", 0))
     def predict(self):
-        # небольшая рандомизация, чтобы не был один и тот же запрос
-        p = dict(PAYLOAD)
-        p["LIMIT_BAL"] = p["LIMIT_BAL"] + random.randint(-50000, 50000)
-        p["AGE"] = max(18, min(80, p["AGE"] + random.randint(-5, 5)))
-
-        with self.client.post("/predict", json=p, catch_response=True) as r:
-            if r.status_code != 200:
-                r.failure(f"HTTP {r.status_code}")
+        with self.client.post("/predict", json=SAMPLER.record(), catch_response=True) as r:
+            _check(r)
+
+    @task(CONFIG.weights.get("batch", 0))
+    def predict_batch(self):
+        payload = {"records": SAMPLER.batch(random.randint(*CONFIG.batch_size))}
+        with self.client.post("/predict/batch", json=payload, catch_response=True) as r:
+            _check(r)
+
+    @task(CONFIG.weights.get("health", 0))
+    def health(self):
+        with self.client.get("/health", catch_response=True) as r:
+            _check(r)
+
+
+if SHAPE is not None:
+
+    class ConfiguredShape(LoadTestShape):
+        def tick(self):
+            return SHAPE.tick(self.get_run_time())
+
+
+@events.quitting.add_listener
+def check_slo(environment, **kwargs):
+    stats = environment.stats
+    metrics = {}
+    for entry in [*stats.entries.values(), stats.total]:
+        name = AGGREGATED if entry is stats.total else f"{entry.method} {entry.name}"
+        metrics[name] = {
+            "requests": entry.num_requests,
+            "failures": entry.num_failures,
+            "error_rate": entry.fail_ratio,
+            "p95_ms": entry.get_response_time_percentile(0.95),
+            "p99_ms": entry.get_response_time_percentile(0.99),
+        }
+    slo = evaluate_slo(metrics, CONFIG)
+    print(describe({"source": "locust", "requests": metrics, "slo": slo, "failures": []}))
+    if not slo["passed"]:
+        environment.process_exit_code = 1
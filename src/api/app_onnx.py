@@ -1,9 +1,9 @@
+import os
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Mapping, Optional
 
 import numpy as np
 import onnxruntime as ort
-import pandas as pd
 from fastapi import FastAPI, HTTPException
 from pydantic import BaseModel
 
@@ -11,8 +11,37 @@ from fastapi.responses import Response
 from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
 import time
 
-MODEL_PATH = Path("models/nn_model.onnx")
-CAT_COLS = {"SEX", "EDUCATION", "MARRIAGE", "AGE_BIN"}
+from src.api.request_validation import MODES, RequestValidator
+from src.features.engine import ENGINEERED_COLUMNS, engineer_columns
+from src.inference.bundle import ModelBundle
+from src.inference.model import OnnxModel
+from src.inference.numpy_mlp import NumpyMLP
+
+# Бандл (src.models.build_bundle), иначе офлайн ORT-формат (src.models.optimize_onnx), иначе ONNX
+DEFAULT_MODEL_PATHS = ("models/nn_model.bundle", "models/nn_model.ort", "models/nn_model.onnx")
+MODEL_PATH = Path(
+    os.getenv(
+        "ONNX_MODEL_PATH",
+        next((p for p in DEFAULT_MODEL_PATHS if Path(p).exists()), DEFAULT_MODEL_PATHS[-1]),
+    )
+)
+# IOBinding: только для моделей с числовыми входами (иначе ошибка при старте)
+ONNX_IO_BINDING = os.getenv("ONNX_IO_BINDING", "0") == "1"
+
+# NumPy-бэкенд того же MLP (src.inference.numpy_mlp) для запросов до N строк; 0 — выключен.
+# Из бандла берётся его секция, NUMPY_BACKEND_PATH тогда не используется
+NUMPY_BACKEND_PATH = Path(
+    os.getenv("NUMPY_BACKEND_PATH", str(MODEL_PATH.with_name(MODEL_PATH.stem + ".joblib")))
+)
+NUMPY_BACKEND_MAX_ROWS = int(os.getenv("NUMPY_BACKEND_MAX_ROWS", "16"))
+# Допуск сверки с ONNX при старте (INT8-модель расходится сильнее float32)
+NUMPY_BACKEND_ATOL = float(os.getenv("NUMPY_BACKEND_ATOL", "1e-3"))
+
+# Проверка входных значений по expectation suite: reject | flag | count | off
+SUITE_PATH = Path(os.getenv("EXPECTATION_SUITE_PATH", "data/expectations/credit_suite.json"))
+REQUEST_VALIDATION_MODE = os.getenv("REQUEST_VALIDATION_MODE", "count")
+if REQUEST_VALIDATION_MODE not in MODES:
+    raise ValueError(f"REQUEST_VALIDATION_MODE must be one of {MODES}")
 
 app = FastAPI(title="Credit Scoring PD API (ONNX)", version="0.1")
 
@@ -27,6 +56,11 @@ HTTP_REQUEST_DURATION_SECONDS = Histogram(
     "HTTP request latency, seconds",
     labelnames=("method", "path"),
 )
+REQUEST_EXPECTATION_VIOLATIONS = Counter(
+    "request_expectation_violations_total",
+    "Input values violating the expectation suite",
+    labelnames=("expectation",),
+)
 
 
 @app.middleware("http")
@@ -79,71 +113,116 @@ class CreditFeatures(BaseModel):
     AGE_BIN: Optional[str] = None
 
 
-def compute_engineered(df: pd.DataFrame) -> pd.DataFrame:
-    bill_cols = [c for c in df.columns if c.startswith("BILL_AMT")]
-    pay_cols = [c for c in df.columns if c.startswith("PAY_AMT")]
-
-    df = df.copy()
-    df["BILL_AMT_SUM"] = df[bill_cols].sum(axis=1)
-    df["PAY_AMT_SUM"] = df[pay_cols].sum(axis=1)
+class CreditBatch(BaseModel):
+    records: List[CreditFeatures]
 
-    denom = df["BILL_AMT_SUM"].replace(0, 1.0)
-    df["PAY_RATIO"] = (df["PAY_AMT_SUM"] / denom).clip(lower=0.0)
 
-    df["AGE_BIN"] = pd.cut(
-        df["AGE"].astype(int),
-        bins=[0, 25, 35, 45, 55, 65, 200],
-        labels=["<25", "25-34", "35-44", "45-54", "55-64", "65+"],
-        right=False,
-    ).astype(str)
-    return df
+INPUT_FIELDS = list(CreditFeatures.model_fields)
+# Инженерные поля клиента модель не видит (model_columns их пересчитывает) — не проверяются
+VALIDATED_FIELDS = [c for c in INPUT_FIELDS if c not in ENGINEERED_COLUMNS]
 
 
-def to_onnx_inputs(df: pd.DataFrame) -> dict:
-    inputs = {}
-    for c in df.columns:
-        col = df[[c]]
-        if c in CAT_COLS:
-            inputs[c] = col.astype(str).values
-        else:
-            inputs[c] = col.astype(np.float32).values
-    return inputs
+def records_to_columns(records: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Записи запроса -> {поле: 1-D массив} без промежуточного DataFrame."""
+    return {c: np.asarray([r[c] for r in records]) for c in INPUT_FIELDS}
 
 
-def extract_proba(outputs) -> float:
-    probs = outputs[-1]
+def model_columns(columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Инженерные признаки пересчитываются всегда (значения клиента игнорируются)."""
+    return {**columns, **engineer_columns(columns)}
 
-    # ZipMap: list[dict]
-    if isinstance(probs, list) and len(probs) > 0 and isinstance(probs[0], dict):
-        d = probs[0]
-        if 1 in d:
-            return float(d[1])
-        if "1" in d:
-            return float(d["1"])
-        return float(max(d.values()))
 
-    probs = np.asarray(probs)
-    if probs.ndim == 2 and probs.shape[1] == 2:
-        return float(probs[0, 1])
-    return float(probs.reshape(-1)[0])
+def load_bundle() -> Optional[ModelBundle]:
+    return ModelBundle.open(MODEL_PATH) if MODEL_PATH.suffix == ".bundle" else None
 
 
-def load_session() -> ort.InferenceSession:
-    if not MODEL_PATH.exists():
-        raise FileNotFoundError(f"Missing {MODEL_PATH}. Train/convert ONNX first.")
-
+def load_model(bundle: Optional[ModelBundle] = None) -> OnnxModel:
     # ORT сам выберет доступный провайдер, но на GPU-хосте важно иметь CUDAExecutionProvider
     providers = ort.get_available_providers()
-    return ort.InferenceSession(MODEL_PATH.as_posix(), providers=providers)
-
-
-SESSION = None
+    if bundle is not None:
+        return bundle.onnx_model(providers=providers, io_binding=ONNX_IO_BINDING)
+    return OnnxModel(MODEL_PATH, providers=providers, io_binding=ONNX_IO_BINDING)
+
+
+def load_numpy_backend(
+    model: OnnxModel, bundle: Optional[ModelBundle] = None
+) -> Optional[NumpyMLP]:
+    """NumPy-бэкенд, если он есть и совпадает с ONNX-моделью на пробных строках."""
+    source = bundle.path if bundle is not None else NUMPY_BACKEND_PATH
+    if NUMPY_BACKEND_MAX_ROWS <= 0 or not source.exists():
+        return None
+    try:
+        backend = bundle.numpy_model() if bundle is not None else NumpyMLP.load(source)
+        if backend is None:
+            return None
+        probe = backend.probe_columns()
+        diff = float(
+            np.max(
+                np.abs(backend.predict_proba_columns(probe) - model.predict_proba_columns(probe))
+            )
+        )
+    except (ValueError, KeyError, TypeError, AttributeError, IndexError) as e:
+        print(f"NumPy backend disabled: {source}: {e}")
+        return None
+    if not diff <= NUMPY_BACKEND_ATOL:
+        print(f"NumPy backend disabled: max |diff| vs ONNX = {diff:.2e} > {NUMPY_BACKEND_ATOL}")
+        return None
+    return backend
+
+
+BUNDLE: Optional[ModelBundle] = None
+MODEL: Optional[OnnxModel] = None
+THRESHOLD = 0.5
+SMALL_MODEL: Optional[NumpyMLP] = None
+REQUEST_VALIDATOR: Optional[RequestValidator] = None
+
+
+def scoring_model(n_rows: int):
+    """Короткие запросы — NumPy (без фиксированной цены вызова ORT), батчи — ORT."""
+    if SMALL_MODEL is not None and n_rows <= NUMPY_BACKEND_MAX_ROWS:
+        return SMALL_MODEL
+    return MODEL
+
+
+def load_request_validator() -> Optional[RequestValidator]:
+    if REQUEST_VALIDATION_MODE == "off" or not SUITE_PATH.exists():
+        return None
+    return RequestValidator.from_suite_path(SUITE_PATH, fields=VALIDATED_FIELDS)
 
 
 @app.on_event("startup")
 def startup():
-    global SESSION
-    SESSION = load_session()
+    global BUNDLE, MODEL, THRESHOLD, SMALL_MODEL, REQUEST_VALIDATOR
+    BUNDLE = load_bundle()
+    MODEL = load_model(BUNDLE)
+    THRESHOLD = BUNDLE.threshold if BUNDLE is not None else 0.5
+    SMALL_MODEL = load_numpy_backend(MODEL, BUNDLE)
+    REQUEST_VALIDATOR = load_request_validator()
+
+
+def apply_request_validation(row_violations: List[List[str]]) -> None:
+    """Счётчики по каждому ожиданию; в режиме reject — 422 с перечнем нарушений."""
+    counts: Dict[str, int] = {}
+    for names in row_violations:
+        for name in names:
+            counts[name] = counts.get(name, 0) + 1
+    for name, n in counts.items():
+        REQUEST_EXPECTATION_VIOLATIONS.labels(name).inc(n)
+
+    if counts and REQUEST_VALIDATION_MODE == "reject":
+        detail = [{"row": i, "violations": v} for i, v in enumerate(row_violations) if v]
+        raise HTTPException(status_code=422, detail=detail)
+
+
+def batch_violations(columns: Mapping[str, np.ndarray], n_rows: int) -> List[List[str]]:
+    rows: List[List[str]] = [[] for _ in range(n_rows)]
+    if REQUEST_VALIDATOR is None:
+        return rows
+    masks = REQUEST_VALIDATOR.check_columns(columns)
+    for name, mask in masks.items():
+        for i in np.flatnonzero(mask):
+            rows[i].append(name)
+    return rows
 
 
 @app.get("/health")
@@ -151,20 +230,56 @@ def health() -> Dict[str, Any]:
     return {
         "status": "ok",
         "model_path": str(MODEL_PATH),
+        "model": MODEL.signature() if MODEL is not None else None,
+        "bundle": BUNDLE.describe() if BUNDLE is not None else None,
+        "threshold": THRESHOLD,
+        "numpy_backend": (
+            {**SMALL_MODEL.signature(), "max_rows": NUMPY_BACKEND_MAX_ROWS}
+            if SMALL_MODEL is not None
+            else None
+        ),
         "available_providers": ort.get_available_providers(),
+        "request_validation": {
+            "mode": REQUEST_VALIDATION_MODE,
+            "rules": REQUEST_VALIDATOR.rule_names if REQUEST_VALIDATOR is not None else [],
+        },
     }
 
 
 @app.post("/predict")
 def predict(payload: CreditFeatures) -> Dict[str, Any]:
-    if SESSION is None:
+    if MODEL is None:
         raise HTTPException(status_code=500, detail="ONNX session not initialized")
 
-    df = pd.DataFrame([payload.model_dump()])
-    df = compute_engineered(df)
+    record = payload.model_dump()
+    violations = REQUEST_VALIDATOR.check_record(record) if REQUEST_VALIDATOR is not None else []
+    apply_request_validation([violations])
 
-    inputs = to_onnx_inputs(df)
-    out = SESSION.run(None, inputs)
-    proba = extract_proba(out)
-    pred = int(proba >= 0.5)
-    return {"pred_class": pred, "pred_proba": proba}
+    columns = model_columns(records_to_columns([record]))
+    proba = float(scoring_model(1).predict_proba_columns(columns)[0])
+    pred = int(proba >= THRESHOLD)
+    response = {"pred_class": pred, "pred_proba": proba}
+    if REQUEST_VALIDATION_MODE == "flag":
+        response["violations"] = violations
+    return response
+
+
+@app.post("/predict/batch")
+def predict_batch(payload: CreditBatch) -> Dict[str, Any]:
+    if MODEL is None:
+        raise HTTPException(status_code=500, detail="ONNX session not initialized")
+    if not payload.records:
+        return {"predictions": []}
+
+    columns = records_to_columns([r.model_dump() for r in payload.records])
+    violations = batch_violations(columns, len(payload.records))
+    apply_request_validation(violations)
+
+    probas = scoring_model(len(payload.records)).predict_proba_columns(model_columns(columns))
+    predictions = []
+    for i, proba in enumerate(probas):
+        item = {"pred_class": int(proba >= THRESHOLD), "pred_proba": float(proba)}
+        if REQUEST_VALIDATION_MODE == "flag":
+            item["violations"] = violations[i]
+        predictions.append(item)
+    return {"predictions": predictions}
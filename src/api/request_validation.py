@@ -0,0 +1,105 @@
+"""Лёгкая проверка входящих запросов по expectation suite.
+
+Из suite берутся только колоночные ожидания по полям запроса и заранее
+превращаются в границы и frozenset допустимых значений. Одиночная запись
+проверяется простым проходом по правилам (единицы микросекунд), батч —
+векторно по NumPy-колонкам.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, FrozenSet, Iterable, List, Mapping, Optional
+
+import numpy as np
+
+from src.data.compiled_validation import ColumnCheck, compile_suite
+from src.data.validation import load_suite
+
+MODES = ("reject", "flag", "count", "off")
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    column: str
+    check: ColumnCheck
+    lo: float
+    hi: float
+    allowed: Optional[FrozenSet]
+
+    def violated(self, value) -> bool:
+        if value is None:
+            return self.check.kind == "not_null"
+        if self.check.kind == "not_null":
+            return False
+        if self.allowed is not None:
+            hit = value in self.allowed
+            return not hit if self.check.kind == "in_set" else hit
+        c = self.check
+        return (
+            value < self.lo
+            or value > self.hi
+            or (c.strict_min and value == self.lo)
+            or (c.strict_max and value == self.hi)
+        )
+
+
+def _rule_name(check: ColumnCheck) -> str:
+    return f"{check.expectation_type}:{check.column}"
+
+
+class RequestValidator:
+    def __init__(self, checks: Iterable[ColumnCheck], fields: Iterable[str]):
+        fields = set(fields)
+        self.rules: List[Rule] = []
+        for check in checks:
+            if check.column not in fields:
+                continue
+            allowed = None
+            if check.value_set is not None:
+                allowed = frozenset(check.value_set.tolist())
+            self.rules.append(
+                Rule(
+                    name=_rule_name(check),
+                    column=check.column,
+                    check=check,
+                    lo=-np.inf if check.min_value is None else check.min_value,
+                    hi=np.inf if check.max_value is None else check.max_value,
+                    allowed=allowed,
+                )
+            )
+
+    @classmethod
+    def from_suite_path(cls, suite_path: Path, fields: Iterable[str]) -> "RequestValidator":
+        return cls(compile_suite(load_suite(suite_path)).column_checks, fields)
+
+    @property
+    def rule_names(self) -> List[str]:
+        return [r.name for r in self.rules]
+
+    def check_record(self, record: Mapping) -> List[str]:
+        """Имена нарушенных ожиданий для одной записи."""
+        return [r.name for r in self.rules if r.violated(record.get(r.column))]
+
+    def check_columns(self, columns: Mapping[str, np.ndarray]) -> Dict[str, np.ndarray]:
+        """Векторная проверка батча: {имя ожидания: маска нарушивших строк}."""
+        out: Dict[str, np.ndarray] = {}
+        for r in self.rules:
+            values = columns.get(r.column)
+            if values is None:
+                continue
+            values = np.asarray(values)
+            if values.dtype == object:
+                nulls = np.array([v is None for v in values], dtype=bool)
+                if r.check.kind != "in_set" and r.check.kind != "not_in_set":
+                    values = np.where(nulls, np.nan, values).astype(float)
+            elif values.dtype.kind == "f":
+                nulls = np.isnan(values)
+            else:
+                nulls = np.zeros(len(values), dtype=bool)
+            mask = r.check.unexpected_mask(values, nulls)
+            if mask.any():
+                out[r.name] = mask
+        return out
@@ -0,0 +1,362 @@
+"""Типизированный колоночный формат processed-датасета (Parquet / Feather).
+
+CSV при каждом чтении заново парсится и заново угадывает типы. Здесь датасет
+один раз приводится к компактным типам (float32 для сумм, int8 для кодов и
+задержек, category для AGE_BIN), а описание схемы кладётся в метаданные файла.
+Читатели загружают только нужные колонки, файл открывается через memory map.
+"""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from src.features.engine import AGE_LABELS, MISSING_LABEL
+
+SCHEMA_VERSION = 1
+SCHEMA_METADATA_KEY = b"credit_schema"
+
+TARGET_COL = "default"
+CATEGORICAL_CODE_COLS = ("SEX", "EDUCATION", "MARRIAGE")
+CATEGORY_COLS = ("AGE_BIN",)
+SMALL_INT_COLS = ("AGE", "PAY_0", "PAY_2", "PAY_3", "PAY_4", "PAY_5", "PAY_6", TARGET_COL)
+
+# Потоковая запись: типы задаются спецификацией, а не значениями первого куска
+STREAM_INT_TYPES = {c: pa.int8() for c in CATEGORICAL_CODE_COLS + SMALL_INT_COLS}
+STREAM_INT_TYPES["AGE"] = pa.int16()
+STREAM_CATEGORIES = {"AGE_BIN": AGE_LABELS + (MISSING_LABEL,)}
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+FEATHER_SUFFIXES = {".feather", ".arrow", ".ipc"}
+
+# Партиционированный датасет: каталог с файлами партиций и манифестом
+PARTITION_MANIFEST = "manifest.json"
+
+
+def is_columnar_path(path: Path) -> bool:
+    return Path(path).suffix.lower() in PARQUET_SUFFIXES | FEATHER_SUFFIXES
+
+
+def is_partitioned_path(path: Path) -> bool:
+    path = Path(path)
+    return path.is_dir() and (path / PARTITION_MANIFEST).exists()
+
+
+def read_manifest(path: Path) -> Dict:
+    manifest_path = Path(path) / PARTITION_MANIFEST
+    if not manifest_path.exists():
+        return {"partitions": {}}
+    return json.loads(manifest_path.read_text(encoding="utf-8"))
+
+
+def partition_files(path: Path, partitions: Optional[Sequence[str]] = None) -> List[Path]:
+    """Файлы партиций из манифеста (в порядке ключей); ``partitions`` — выборка по ключам."""
+    path = Path(path)
+    entries = read_manifest(path).get("partitions", {})
+    keys = sorted(entries) if partitions is None else list(partitions)
+    missing = [k for k in keys if k not in entries]
+    if missing:
+        raise KeyError(f"Unknown partitions in {path}: {missing}")
+    return [path / entries[k]["file"] for k in keys]
+
+
+def _smallest_int(s: pd.Series) -> pd.Series:
+    """int8/int16/int32, если значения целые и без пропусков, иначе float32."""
+    values = pd.to_numeric(s, errors="coerce")
+    if values.isna().any() or not np.all(np.mod(values.to_numpy(), 1) == 0):
+        return values.astype(np.float32)
+    lo, hi = values.min(), values.max()
+    for dtype in (np.int8, np.int16, np.int32):
+        info = np.iinfo(dtype)
+        if info.min <= lo and hi <= info.max:
+            return values.astype(dtype)
+    return values.astype(np.float32)
+
+
+def to_storage_types(df: pd.DataFrame) -> pd.DataFrame:
+    """Приводит колонки к типам хранения колоночного артефакта."""
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in CATEGORY_COLS or not (
+            pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s)
+        ):
+            out[c] = s.astype(str).astype("category")
+        elif c in CATEGORICAL_CODE_COLS or c in SMALL_INT_COLS:
+            out[c] = _smallest_int(s)
+        else:
+            out[c] = s.astype(np.float32)
+    return pd.DataFrame(out, index=df.index)
+
+
+def _column_role(name: str) -> str:
+    if name == TARGET_COL:
+        return "target"
+    if name in CATEGORICAL_CODE_COLS or name in CATEGORY_COLS:
+        return "categorical"
+    return "numeric"
+
+
+def build_schema_metadata(df: pd.DataFrame, extra: Optional[Dict] = None) -> Dict:
+    columns = []
+    for c in df.columns:
+        entry = {"name": c, "dtype": str(df[c].dtype), "role": _column_role(c)}
+        if isinstance(df[c].dtype, pd.CategoricalDtype):
+            entry["categories"] = [str(v) for v in df[c].cat.categories]
+        columns.append(entry)
+    meta = {
+        "version": SCHEMA_VERSION,
+        "target": TARGET_COL if TARGET_COL in df.columns else None,
+        "rows": int(len(df)),
+        "columns": columns,
+    }
+    if extra:
+        meta.update(extra)
+    return meta
+
+
+def _to_arrow(df: pd.DataFrame, extra_meta: Optional[Dict]) -> pa.Table:
+    typed = to_storage_types(df)
+    table = pa.Table.from_pandas(typed, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[SCHEMA_METADATA_KEY] = json.dumps(
+        build_schema_metadata(typed, extra_meta), ensure_ascii=False
+    ).encode("utf-8")
+    return table.replace_schema_metadata(meta)
+
+
+def write_columnar(df: pd.DataFrame, path: Path, extra_meta: Optional[Dict] = None) -> Path:
+    """Пишет датасет в Parquet или Feather (по расширению пути).
+
+    Feather пишется без сжатия, чтобы при чтении memory map отдавал буферы без копий.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = _to_arrow(df, extra_meta)
+    suffix = path.suffix.lower()
+    if suffix in PARQUET_SUFFIXES:
+        pq.write_table(table, path, compression="snappy")
+    elif suffix in FEATHER_SUFFIXES:
+        feather.write_feather(table, path, compression="uncompressed")
+    else:
+        raise ValueError(f"Unsupported columnar format: {path}")
+    return path
+
+
+def _read_table(path: Path, columns: Optional[Sequence[str]] = None) -> pa.Table:
+    cols = list(columns) if columns is not None else None
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        return pq.read_table(path, columns=cols, memory_map=True)
+    return feather.read_table(path, columns=cols, memory_map=True)
+
+
+def read_schema(path: Path) -> Dict:
+    """Метаданные схемы из колоночного файла (без чтения данных)."""
+    path = Path(path)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        schema = pq.read_schema(path)
+    else:
+        with pa.memory_map(str(path), "r") as source:
+            schema = pa.ipc.open_file(source).schema
+    raw = (schema.metadata or {}).get(SCHEMA_METADATA_KEY)
+    return json.loads(raw) if raw else {}
+
+
+def read_dataset(
+    path: Path,
+    columns: Optional[Sequence[str]] = None,
+    partitions: Optional[Sequence[str]] = None,
+) -> pd.DataFrame:
+    """Единая точка чтения датасета: Parquet/Feather (memory map), CSV или
+    каталог партиций с манифестом.
+
+    ``columns`` задаёт набор и порядок загружаемых колонок, ``partitions`` —
+    какие партиции читать (по умолчанию все).
+    """
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"Missing dataset: {path}")
+
+    if is_partitioned_path(path):
+        tables = [_read_table(p, columns) for p in partition_files(path, partitions)]
+        if not tables:
+            return pd.DataFrame(columns=list(columns) if columns is not None else None)
+        # Типы хранения подбираются по партиции (int8/int16, разные словари категорий)
+        table = pa.concat_tables(tables, promote_options="permissive").unify_dictionaries()
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    if not is_columnar_path(path):
+        df = pd.read_csv(path, usecols=list(columns) if columns is not None else None)
+        return df[list(columns)] if columns is not None else df
+
+    table = _read_table(path, columns)
+    # self_destruct освобождает arrow-буферы по мере конвертации -> меньше пиковая память
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def dataset_columns(path: Path) -> List[str]:
+    """Имена колонок датасета без чтения данных."""
+    path = Path(path)
+    if is_partitioned_path(path):
+        files = partition_files(path)
+        return dataset_columns(files[0]) if files else []
+    if not is_columnar_path(path):
+        return list(pd.read_csv(path, nrows=0).columns)
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        return list(pq.read_schema(path).names)
+    with pa.memory_map(str(path), "r") as source:
+        return list(pa.ipc.open_file(source).schema.names)
+
+
+def iter_dataset_batches(
+    path: Path, batch_rows: int, columns: Optional[Sequence[str]] = None
+) -> Iterator[pd.DataFrame]:
+    """Читает датасет кусками не больше ``batch_rows`` строк (ограниченная память).
+
+    Индекс каждого куска продолжает нумерацию строк файла.
+    """
+    path = Path(path)
+    cols = list(columns) if columns is not None else None
+    offset = 0
+
+    if is_partitioned_path(path):
+        for part in partition_files(path):
+            for df in iter_dataset_batches(part, batch_rows, cols):
+                df.index = pd.RangeIndex(offset, offset + len(df))
+                offset += len(df)
+                yield df
+        return
+
+    if not is_columnar_path(path):
+        for chunk in pd.read_csv(path, usecols=cols, chunksize=batch_rows):
+            yield chunk[cols] if cols is not None else chunk
+        return
+
+    if path.suffix.lower() in PARQUET_SUFFIXES:
+        batches = pq.ParquetFile(path, memory_map=True).iter_batches(
+            batch_size=batch_rows, columns=cols
+        )
+        for batch in batches:
+            df = batch.to_pandas()
+            df.index = pd.RangeIndex(offset, offset + len(df))
+            offset += len(df)
+            yield df
+        return
+
+    with pa.memory_map(str(path), "r") as source:
+        reader = pa.ipc.open_file(source)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if cols is not None:
+                batch = batch.select(cols)
+            for start in range(0, batch.num_rows, batch_rows):
+                df = batch.slice(start, batch_rows).to_pandas()
+                df.index = pd.RangeIndex(offset, offset + len(df))
+                offset += len(df)
+                yield df
+
+
+def _stream_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Кусок в типах потоковой схемы: сужение целых делает arrow (с проверкой диапазона)."""
+    out = {}
+    for c in df.columns:
+        s = df[c]
+        if c in STREAM_CATEGORIES:
+            values = s.astype(str)
+            unknown = set(values.unique()) - set(STREAM_CATEGORIES[c])
+            if unknown:
+                raise ValueError(f"Unexpected {c} values: {sorted(unknown)}")
+            out[c] = pd.Categorical(values, categories=list(STREAM_CATEGORIES[c]))
+        elif c in CATEGORY_COLS or not (
+            pd.api.types.is_numeric_dtype(s) or pd.api.types.is_bool_dtype(s)
+        ):
+            out[c] = s.astype(str)
+        elif c in STREAM_INT_TYPES:
+            out[c] = pd.to_numeric(s)
+        else:
+            out[c] = s.astype(np.float32)
+    return pd.DataFrame(out, index=df.index)
+
+
+def stream_schema(frame: pd.DataFrame) -> pa.Schema:
+    """Схема потоковой записи: одна на весь поток, не зависит от значений кусков.
+
+    Ширина целых — из ``STREAM_INT_TYPES``, словари категорий — фиксированные
+    (``STREAM_CATEGORIES``), поэтому у всех кусков один словарь и Feather-файл
+    не получает замену словаря; прочие строковые колонки пишутся как string.
+    ``frame`` — кусок после ``_stream_frame``.
+    """
+    fields = []
+    for c in frame.columns:
+        if c in STREAM_CATEGORIES:
+            fields.append(pa.field(c, pa.dictionary(pa.int8(), pa.string())))
+        elif c in STREAM_INT_TYPES:
+            fields.append(pa.field(c, STREAM_INT_TYPES[c]))
+        elif pd.api.types.is_numeric_dtype(frame[c]):
+            fields.append(pa.field(c, pa.float32()))
+        else:
+            fields.append(pa.field(c, pa.string()))
+    return pa.schema(fields)
+
+
+class ChunkedColumnarWriter:
+    """Потоковая запись кусков DataFrame в один Parquet/Feather файл.
+
+    Схема задаётся по именам колонок первого куска через ``stream_schema``
+    (типы не угадываются по значениям), каждый кусок приводится к ней;
+    значение вне диапазона типа — ошибка, а не переполнение.
+    """
+
+    def __init__(self, path: Path, extra_meta: Optional[Dict] = None):
+        self.path = Path(path)
+        self.extra_meta = extra_meta
+        self.rows = 0
+        self._writer = None
+        self._schema: Optional[pa.Schema] = None
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+    def _open(self, frame: pd.DataFrame) -> None:
+        schema = stream_schema(frame)
+        empty = pa.Table.from_pandas(frame.iloc[:0], schema=schema, preserve_index=False)
+        # Число строк заранее неизвестно: в метаданных схемы оно не фиксируется
+        meta = dict(empty.schema.metadata or {})
+        meta[SCHEMA_METADATA_KEY] = json.dumps(
+            build_schema_metadata(empty.to_pandas(), {**(self.extra_meta or {}), "rows": None}),
+            ensure_ascii=False,
+        ).encode("utf-8")
+        self._schema = empty.schema.with_metadata(meta)
+        suffix = self.path.suffix.lower()
+        if suffix in PARQUET_SUFFIXES:
+            self._writer = pq.ParquetWriter(self.path, self._schema, compression="snappy")
+        elif suffix in FEATHER_SUFFIXES:
+            self._writer = pa.ipc.new_file(
+                str(self.path), self._schema, options=pa.ipc.IpcWriteOptions(compression=None)
+            )
+        else:
+            raise ValueError(f"Unsupported columnar format: {self.path}")
+
+    def write(self, df: pd.DataFrame) -> None:
+        frame = _stream_frame(df)
+        if self._schema is None:
+            self._open(frame)
+        table = pa.Table.from_pandas(frame, schema=self._schema, preserve_index=False)
+        self._writer.write_table(table.unify_dictionaries())
+        self.rows += table.num_rows
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    def __enter__(self) -> "ChunkedColumnarWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
@@ -0,0 +1,342 @@
+"""Компилируемый векторный валидатор для expectation suite (без Great Expectations).
+
+``compile_suite`` один раз разбирает suite в план: табличные проверки и
+колоночные проверки, сгруппированные по колонке. Каждая колонка извлекается
+в NumPy один раз, все её проверки считаются векторно. План умеет работать
+кусками (``validate_batches``/``validate_path``), так что память ограничена
+размером куска, а не размером файла. Результат — в формате GE-отчёта,
+плюс время на каждое ожидание и примеры строк-нарушителей.
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.data.columnar import dataset_columns, iter_dataset_batches
+
+SAMPLE_SIZE = 20
+DEFAULT_CHUNK_ROWS = 250_000
+
+COLUMN_EXPECTATIONS = {
+    "expect_column_values_to_not_be_null": "not_null",
+    "expect_column_values_to_be_in_set": "in_set",
+    "expect_column_values_to_not_be_in_set": "not_in_set",
+    "expect_column_values_to_be_between": "between",
+}
+TABLE_EXPECTATIONS = {
+    "expect_table_columns_to_match_ordered_list": "ordered_columns",
+    "expect_table_columns_to_match_set": "column_set",
+    "expect_table_column_count_to_equal": "column_count",
+    "expect_table_row_count_to_be_between": "row_count",
+    "expect_column_to_exist": "column_exists",
+}
+SUPPORTED_EXPECTATIONS = frozenset(COLUMN_EXPECTATIONS) | frozenset(TABLE_EXPECTATIONS)
+
+
+@dataclass(frozen=True)
+class ColumnCheck:
+    """Колоночное ожидание, приведённое к границам / множеству значений."""
+
+    index: int
+    expectation_type: str
+    kind: str
+    column: str
+    min_value: Optional[float] = None
+    max_value: Optional[float] = None
+    strict_min: bool = False
+    strict_max: bool = False
+    value_set: Optional[np.ndarray] = None
+    mostly: float = 1.0
+
+    def unexpected_mask(self, values: np.ndarray, nulls: np.ndarray) -> np.ndarray:
+        """Маска нарушений; пропуски (кроме not_null) не считаются, как в GE."""
+        if self.kind == "not_null":
+            return nulls
+        if self.kind in ("in_set", "not_in_set"):
+            hit = _isin(values, self.value_set)
+            bad = ~hit if self.kind == "in_set" else hit
+            return bad & ~nulls
+        bad = np.zeros(len(values), dtype=bool)
+        if self.min_value is not None:
+            bad |= values <= self.min_value if self.strict_min else values < self.min_value
+        if self.max_value is not None:
+            bad |= values >= self.max_value if self.strict_max else values > self.max_value
+        return bad & ~nulls
+
+
+@dataclass(frozen=True)
+class TableCheck:
+    index: int
+    expectation_type: str
+    kind: str
+    kwargs: Dict[str, Any]
+
+
+@dataclass
+class _Accumulator:
+    element_count: int = 0
+    missing_count: int = 0
+    unexpected_count: int = 0
+    elapsed_ns: int = 0
+    sample_index: List[int] = field(default_factory=list)
+    sample_values: List[Any] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def _isin(values: np.ndarray, value_set: np.ndarray) -> np.ndarray:
+    if values.dtype.kind in "iub" and value_set.dtype.kind in "iu" and len(value_set):
+        # Малые целочисленные коды: таблица поиска вместо сортировки
+        lo, hi = int(value_set.min()), int(value_set.max())
+        if hi - lo <= 4096:
+            lut = np.zeros(hi - lo + 1, dtype=bool)
+            lut[value_set - lo] = True
+            v = values.astype(np.int64, copy=False)
+            inside = (v >= lo) & (v <= hi)
+            out = np.zeros(len(v), dtype=bool)
+            out[inside] = lut[v[inside] - lo]
+            return out
+    return np.isin(values, value_set)
+
+
+def _value_set(raw: Sequence[Any]) -> np.ndarray:
+    arr = np.asarray(list(raw))
+    if arr.dtype.kind == "U":
+        return arr.astype(object)
+    return arr
+
+
+def compile_suite(suite_dict: dict) -> "CompiledSuite":
+    """Разбирает suite в план; неподдерживаемые типы — ValueError (а не молчаливый fail)."""
+    expectations = suite_dict.get("expectations", []) or []
+    unsupported = sorted(
+        {e.get("expectation_type") for e in expectations} - SUPPORTED_EXPECTATIONS, key=str
+    )
+    if unsupported:
+        raise ValueError(f"Unsupported expectation types for compiled engine: {unsupported}")
+
+    column_checks: List[ColumnCheck] = []
+    table_checks: List[TableCheck] = []
+    for i, exp in enumerate(expectations):
+        exp_type = exp["expectation_type"]
+        kwargs = exp.get("kwargs", {}) or {}
+        if exp_type in TABLE_EXPECTATIONS:
+            table_checks.append(TableCheck(i, exp_type, TABLE_EXPECTATIONS[exp_type], kwargs))
+            continue
+
+        kind = COLUMN_EXPECTATIONS[exp_type]
+        value_set = None
+        if kind in ("in_set", "not_in_set"):
+            value_set = _value_set(kwargs.get("value_set", []) or [])
+        column_checks.append(
+            ColumnCheck(
+                index=i,
+                expectation_type=exp_type,
+                kind=kind,
+                column=kwargs["column"],
+                min_value=kwargs.get("min_value"),
+                max_value=kwargs.get("max_value"),
+                strict_min=bool(kwargs.get("strict_min", False)),
+                strict_max=bool(kwargs.get("strict_max", False)),
+                value_set=value_set,
+                mostly=float(kwargs.get("mostly", 1.0) or 1.0),
+            )
+        )
+
+    return CompiledSuite(
+        name=suite_dict.get("expectation_suite_name", ""),
+        expectations=list(expectations),
+        column_checks=column_checks,
+        table_checks=table_checks,
+    )
+
+
+class _ColumnData:
+    """Колонка в NumPy: values + маска пропусков.
+
+    Для category проверки считаются по словарю категорий, а затем
+    раскладываются по кодам — без материализации строк на каждую строку.
+    """
+
+    def __init__(self, s: pd.Series):
+        self.codes: Optional[np.ndarray] = None
+        if isinstance(s.dtype, pd.CategoricalDtype):
+            self.codes = s.cat.codes.to_numpy()
+            self.values = np.asarray(s.cat.categories, dtype=object)
+            self.nulls = self.codes < 0
+            return
+        self.values = s.to_numpy()
+        if self.values.dtype.kind in "iub":
+            self.nulls = np.zeros(len(self.values), dtype=bool)
+        elif self.values.dtype.kind == "f":
+            self.nulls = np.isnan(self.values)
+        else:
+            self.nulls = pd.isna(self.values)
+
+    def unexpected(self, check: ColumnCheck) -> np.ndarray:
+        if self.codes is None:
+            return check.unexpected_mask(self.values, self.nulls)
+        if check.kind == "not_null":
+            return self.nulls
+        per_category = check.unexpected_mask(self.values, np.zeros(len(self.values), dtype=bool))
+        return per_category[self.codes] & ~self.nulls
+
+    def take(self, positions: np.ndarray) -> List[Any]:
+        if self.codes is None:
+            return self.values[positions].tolist()
+        return self.values[self.codes[positions]].tolist()
+
+
+@dataclass
+class CompiledSuite:
+    name: str
+    expectations: List[dict]
+    column_checks: List[ColumnCheck]
+    table_checks: List[TableCheck]
+
+    @property
+    def columns(self) -> List[str]:
+        """Колонки, которые нужно читать для колоночных проверок (в порядке suite)."""
+        return list(dict.fromkeys(c.column for c in self.column_checks))
+
+    def checks_by_column(self) -> Dict[str, List[ColumnCheck]]:
+        grouped: Dict[str, List[ColumnCheck]] = {}
+        for check in self.column_checks:
+            grouped.setdefault(check.column, []).append(check)
+        return grouped
+
+    def validate(self, df: pd.DataFrame, sample_size: int = SAMPLE_SIZE) -> dict:
+        return self.validate_batches([df], columns=list(df.columns), sample_size=sample_size)
+
+    def validate_path(
+        self, path: Path, chunk_rows: int = DEFAULT_CHUNK_ROWS, sample_size: int = SAMPLE_SIZE
+    ) -> dict:
+        columns = dataset_columns(path)
+        present = [c for c in self.columns if c in columns]
+        batches = iter_dataset_batches(path, chunk_rows, columns=present)
+        return self.validate_batches(batches, columns=columns, sample_size=sample_size)
+
+    def validate_batches(
+        self,
+        batches: Iterable[pd.DataFrame],
+        columns: Sequence[str],
+        sample_size: int = SAMPLE_SIZE,
+    ) -> dict:
+        t_start = time.perf_counter_ns()
+        grouped = self.checks_by_column()
+        acc = {c.index: _Accumulator() for c in self.column_checks}
+        for col, checks in grouped.items():
+            if col not in columns:
+                for check in checks:
+                    acc[check.index].error = f"Column {col!r} not found"
+
+        n_rows = 0
+        n_chunks = 0
+        for df in batches:
+            n_chunks += 1
+            n_rows += len(df)
+            row_index = df.index.to_numpy()
+            for col, checks in grouped.items():
+                if col not in df.columns:
+                    continue
+                t0 = time.perf_counter_ns()
+                data = _ColumnData(df[col])
+                n_nulls = int(np.count_nonzero(data.nulls))
+                extract_ns = time.perf_counter_ns() - t0
+                for check in checks:
+                    a = acc[check.index]
+                    t1 = time.perf_counter_ns()
+                    bad = data.unexpected(check)
+                    n_bad = int(np.count_nonzero(bad))
+                    a.element_count += len(df)
+                    a.missing_count += n_nulls
+                    a.unexpected_count += n_bad
+                    if n_bad and len(a.sample_index) < sample_size:
+                        take = np.flatnonzero(bad)[: sample_size - len(a.sample_index)]
+                        a.sample_index.extend(row_index[take].tolist())
+                        a.sample_values.extend(data.take(take))
+                    a.elapsed_ns += time.perf_counter_ns() - t1 + extract_ns // len(checks)
+
+        results: List[Optional[dict]] = [None] * len(self.expectations)
+        for check in self.column_checks:
+            results[check.index] = self._column_result(check, acc[check.index])
+        for check in self.table_checks:
+            t0 = time.perf_counter_ns()
+            success, observed = self._table_success(check, list(columns), n_rows)
+            results[check.index] = {
+                "expectation_config": self.expectations[check.index],
+                "success": bool(success),
+                "result": {"observed_value": observed},
+                "elapsed_ms": (time.perf_counter_ns() - t0) / 1e6,
+            }
+
+        success_count = sum(int(r["success"]) for r in results)
+        evaluated = len(results)
+        return {
+            "success": success_count == evaluated,
+            "statistics": {
+                "evaluated_expectations": evaluated,
+                "successful_expectations": success_count,
+                "unsuccessful_expectations": evaluated - success_count,
+                "success_percent": 100.0 * success_count / evaluated if evaluated else 100.0,
+            },
+            "results": results,
+            "meta": {
+                "engine": "compiled",
+                "expectation_suite_name": self.name,
+                "rows": n_rows,
+                "chunks": n_chunks,
+                "elapsed_ms": (time.perf_counter_ns() - t_start) / 1e6,
+            },
+        }
+
+    def _column_result(self, check: ColumnCheck, a: _Accumulator) -> dict:
+        config = self.expectations[check.index]
+        if a.error is not None:
+            return {
+                "expectation_config": config,
+                "success": False,
+                "exception_info": {"raised_exception": True, "exception_message": a.error},
+                "elapsed_ms": 0.0,
+            }
+        # Как в GE: not_null считается от всех строк, остальные — от непустых
+        base = a.element_count if check.kind == "not_null" else a.element_count - a.missing_count
+        unexpected_share = a.unexpected_count / base if base else 0.0
+        return {
+            "expectation_config": config,
+            "success": bool(1.0 - unexpected_share >= check.mostly),
+            "result": {
+                "element_count": a.element_count,
+                "missing_count": a.missing_count,
+                "unexpected_count": a.unexpected_count,
+                "unexpected_percent": 100.0 * unexpected_share,
+                "partial_unexpected_list": a.sample_values,
+                "partial_unexpected_index_list": a.sample_index,
+            },
+            "elapsed_ms": a.elapsed_ns / 1e6,
+        }
+
+    @staticmethod
+    def _table_success(check: TableCheck, columns: List[str], n_rows: int) -> Tuple[bool, Any]:
+        kw = check.kwargs
+        if check.kind == "ordered_columns":
+            return columns == list(kw.get("column_list") or []), columns
+        if check.kind == "column_set":
+            expected = set(kw.get("column_set") or [])
+            actual = set(columns)
+            if kw.get("exact_match", True):
+                return actual == expected, columns
+            return expected <= actual, columns
+        if check.kind == "column_count":
+            return len(columns) == int(kw["value"]), len(columns)
+        if check.kind == "column_exists":
+            return kw["column"] in columns, kw["column"] in columns
+        # row_count
+        lo, hi = kw.get("min_value"), kw.get("max_value")
+        ok = (lo is None or n_rows >= lo) and (hi is None or n_rows <= hi)
+        return ok, n_rows
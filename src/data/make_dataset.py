@@ -1,10 +1,18 @@
 import argparse
+import hashlib
+import json
+import re
+import time
 from pathlib import Path
+from typing import Optional
 
 import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
 import requests
 import yaml
 
+from src.data.columnar import write_columnar
 from src.features.build_features import build_features
 
 UCI_XLS_URL = (
@@ -12,6 +20,44 @@ UCI_XLS_URL = (
     "default%20of%20credit%20card%20clients.xls"
 )
 
+# Меняется вместе с логикой read_raw_xls: инвалидирует кэш сырого парсинга
+RAW_PARSER_VERSION = 1
+RAW_CACHE_METADATA_KEY = b"raw_cache"
+
+# Keep stable column order for GE suite
+PROCESSED_COLUMNS = [
+    "LIMIT_BAL",
+    "SEX",
+    "EDUCATION",
+    "MARRIAGE",
+    "AGE",
+    "PAY_0",
+    "PAY_2",
+    "PAY_3",
+    "PAY_4",
+    "PAY_5",
+    "PAY_6",
+    "BILL_AMT1",
+    "BILL_AMT2",
+    "BILL_AMT3",
+    "BILL_AMT4",
+    "BILL_AMT5",
+    "BILL_AMT6",
+    "PAY_AMT1",
+    "PAY_AMT2",
+    "PAY_AMT3",
+    "PAY_AMT4",
+    "PAY_AMT5",
+    "PAY_AMT6",
+    "default",
+    "BILL_AMT_SUM",
+    "PAY_AMT_SUM",
+    "PAY_RATIO",
+    "AGE_BIN",
+]
+ENGINEERED_COLUMNS = ["BILL_AMT_SUM", "PAY_AMT_SUM", "PAY_RATIO", "AGE_BIN"]
+RAW_COLUMNS = [c for c in PROCESSED_COLUMNS if c not in ENGINEERED_COLUMNS]
+
 
 def load_params() -> dict:
     with open("params.yaml", "r", encoding="utf-8") as f:
@@ -35,6 +81,63 @@ def read_raw_xls(xls_path: Path) -> pd.DataFrame:
     return df
 
 
+def file_sha256(path: Path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def read_raw_cached(xls_path: Path, cache_dir: Optional[Path]) -> pd.DataFrame:
+    """read_raw_xls с кэшем в Feather.
+
+    Ключ кэша — sha256 содержимого xls + RAW_PARSER_VERSION; при промахе
+    устаревшие записи для того же файла удаляются.
+    """
+    if cache_dir is None:
+        return read_raw_xls(xls_path)
+
+    key = f"{file_sha256(xls_path)[:16]}-p{RAW_PARSER_VERSION}"
+    cache_path = cache_dir / f"{xls_path.stem}-{key}.feather"
+
+    if cache_path.exists():
+        t0 = time.perf_counter()
+        table = feather.read_table(cache_path, memory_map=True)
+        df = table.to_pandas()
+        load_s = time.perf_counter() - t0
+        meta = json.loads((table.schema.metadata or {}).get(RAW_CACHE_METADATA_KEY, b"{}"))
+        parse_s = float(meta.get("parse_seconds", 0.0))
+        print(
+            f"Raw cache hit: {cache_path} (load {load_s:.2f}s vs parse {parse_s:.2f}s, "
+            f"saved {max(parse_s - load_s, 0.0):.2f}s)"
+        )
+        return df
+
+    t0 = time.perf_counter()
+    df = read_raw_xls(xls_path)
+    parse_s = time.perf_counter() - t0
+
+    # Только ключи этого файла: credit.xls не должен удалять кэш credit-2023.xls
+    own_key = re.compile(rf"{re.escape(xls_path.stem)}-[0-9a-f]{{16}}-p\d+\.feather")
+    for stale in cache_dir.glob(f"{xls_path.stem}-*.feather"):
+        if own_key.fullmatch(stale.name):
+            stale.unlink()
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    meta = dict(table.schema.metadata or {})
+    meta[RAW_CACHE_METADATA_KEY] = json.dumps(
+        {"key": key, "source": str(xls_path), "parse_seconds": parse_s}
+    ).encode("utf-8")
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    # Пишем во временный файл и переименовываем: прерванный запуск не оставит битый кэш
+    tmp_path = cache_path.with_suffix(".tmp")
+    feather.write_feather(table.replace_schema_metadata(meta), tmp_path)
+    tmp_path.replace(cache_path)
+    print(f"Raw cache miss: parsed {xls_path} in {parse_s:.2f}s, cached to {cache_path}")
+    return df
+
+
 def clean_and_prepare(df: pd.DataFrame, sample_rows: int = 0) -> pd.DataFrame:
     if sample_rows and sample_rows > 0:
         df = df.sample(n=min(sample_rows, len(df)), random_state=42)
@@ -46,60 +149,108 @@ def clean_and_prepare(df: pd.DataFrame, sample_rows: int = 0) -> pd.DataFrame:
     df = build_features(df)
 
     # Keep stable column order for GE suite
-    ordered_cols = [
-        "LIMIT_BAL",
-        "SEX",
-        "EDUCATION",
-        "MARRIAGE",
-        "AGE",
-        "PAY_0",
-        "PAY_2",
-        "PAY_3",
-        "PAY_4",
-        "PAY_5",
-        "PAY_6",
-        "BILL_AMT1",
-        "BILL_AMT2",
-        "BILL_AMT3",
-        "BILL_AMT4",
-        "BILL_AMT5",
-        "BILL_AMT6",
-        "PAY_AMT1",
-        "PAY_AMT2",
-        "PAY_AMT3",
-        "PAY_AMT4",
-        "PAY_AMT5",
-        "PAY_AMT6",
-        "default",
-        "BILL_AMT_SUM",
-        "PAY_AMT_SUM",
-        "PAY_RATIO",
-        "AGE_BIN",
-    ]
-    df = df[ordered_cols]
+    df = df[PROCESSED_COLUMNS]
     return df
 
 
+def prepare_partitioned(args: argparse.Namespace) -> None:
+    # Локальный импорт: partitions сам использует функции этого модуля
+    from src.data.columnar import read_dataset
+    from src.data.partitions import failed_partitions, prepare_partitions
+
+    out_dir = Path(args.partitioned_path)
+    t0 = time.perf_counter()
+    summary = prepare_partitions(
+        Path(args.raw_dir),
+        out_dir,
+        suite_path=Path(args.suite_path) if args.suite_path else None,
+        cache_dir=None if args.no_cache else Path(args.cache_dir),
+        force=args.force,
+    )
+    print(
+        f"Partitions in {out_dir}: built={summary['built']} validated={summary['validated']} "
+        f"unchanged={len(summary['unchanged'])} removed={summary['removed']} "
+        f"({time.perf_counter() - t0:.2f}s)"
+    )
+
+    failed = failed_partitions(out_dir)
+    for key, names in failed.items():
+        print(f"Validation failed for partition {key}: {names}")
+    if failed:
+        # Сводные файлы не трогаем: стадии ниже продолжат с последней валидной версией
+        raise SystemExit(1)
+
+    # Сводные файлы нужны стадиям, которые читают один файл (validate/train в dvc.yaml)
+    if args.processed_path or args.columnar_path:
+        df = read_dataset(out_dir)
+        if args.processed_path:
+            Path(args.processed_path).parent.mkdir(parents=True, exist_ok=True)
+            df.to_csv(Path(args.processed_path), index=False)
+            print(f"Saved processed data: {args.processed_path} (rows={len(df)})")
+        if args.columnar_path:
+            write_columnar(df, Path(args.columnar_path), extra_meta={"partitions": str(out_dir)})
+            print(f"Saved columnar data: {args.columnar_path}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser()
-    parser.add_argument("--raw-path", required=True)
-    parser.add_argument("--processed-path", required=True)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--raw-path")
+    source.add_argument(
+        "--raw-dir",
+        help="Каталог сырых партиций (xls/csv/parquet): инкрементальная подготовка по манифесту",
+    )
+    parser.add_argument("--processed-path", default=None)
+    parser.add_argument(
+        "--columnar-path",
+        default=None,
+        help="Типизированный Parquet/Feather артефакт (по умолчанию рядом с CSV, *.feather)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default="data/cache",
+        help="Кэш распарсенного xls (ключ: хэш файла + версия парсера)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Всегда парсить xls заново")
+    parser.add_argument(
+        "--partitioned-path",
+        default="data/processed/partitions",
+        help="(--raw-dir) Каталог партиций processed-датасета с manifest.json",
+    )
+    parser.add_argument(
+        "--suite-path",
+        default="data/expectations/credit_suite.json",
+        help="(--raw-dir) Suite для валидации новых/изменённых партиций; '' — без валидации",
+    )
+    parser.add_argument("--force", action="store_true", help="(--raw-dir) Пересобрать все партиции")
     args = parser.parse_args()
 
+    if args.raw_dir:
+        prepare_partitioned(args)
+        return
+    if not args.processed_path:
+        parser.error("--processed-path is required with --raw-path")
+
     params = load_params()
     sample_rows = int(params.get("prepare", {}).get("sample_rows", 0))
 
     raw_path = Path(args.raw_path)
     processed_path = Path(args.processed_path)
+    columnar_path = (
+        Path(args.columnar_path) if args.columnar_path else processed_path.with_suffix(".feather")
+    )
 
     download_xls(raw_path)
-    df_raw = read_raw_xls(raw_path)
+    df_raw = read_raw_cached(raw_path, None if args.no_cache else Path(args.cache_dir))
     df = clean_and_prepare(df_raw, sample_rows=sample_rows)
 
     processed_path.parent.mkdir(parents=True, exist_ok=True)
     df.to_csv(processed_path, index=False)
     print(f"Saved processed data: {processed_path} (rows={len(df)})")
 
+    write_columnar(df, columnar_path, extra_meta={"sample_rows": sample_rows})
+    print(f"Saved columnar data: {columnar_path}")
+
 
 if __name__ == "__main__":
     main()
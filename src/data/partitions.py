@@ -0,0 +1,175 @@
+"""Инкрементальная подготовка партиционированного датасета.
+
+Вызывается из ``src.data.make_dataset --raw-dir ...``. Сырые данные лежат
+каталогом партиций (например, по месяцам: ``2024-01.xls``, ``2024-02.csv``, ...).
+Для каждой партиции в манифесте хранится sha256 исходника и версия подготовки;
+очистка, инженерные признаки и валидация выполняются только для новых или
+изменившихся партиций. Результат — каталог ``<ключ>.feather`` + ``manifest.json``,
+который ``read_dataset`` читает целиком или выборочно по ключам партиций.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from src.data.columnar import (
+    FEATHER_SUFFIXES,
+    PARQUET_SUFFIXES,
+    PARTITION_MANIFEST,
+    read_dataset,
+    read_manifest,
+    write_columnar,
+)
+from src.data.compiled_validation import compile_suite
+from src.data.make_dataset import clean_and_prepare, file_sha256, read_raw_cached
+from src.data.validation import load_suite
+
+# Меняется вместе с clean_and_prepare / движком признаков: пересобирает все партиции
+PREPARE_VERSION = 1
+MANIFEST_VERSION = 1
+
+EXCEL_SUFFIXES = {".xls", ".xlsx"}
+RAW_PARTITION_SUFFIXES = EXCEL_SUFFIXES | {".csv"} | PARQUET_SUFFIXES | FEATHER_SUFFIXES
+
+# Ожидания уровня всего датасета, а не отдельной партиции
+DATASET_LEVEL_EXPECTATIONS = {"expect_table_row_count_to_be_between"}
+
+
+def discover_partitions(raw_dir: Path) -> Dict[str, Path]:
+    """{ключ партиции (имя файла без расширения): путь}."""
+    parts: Dict[str, Path] = {}
+    for path in sorted(Path(raw_dir).iterdir()):
+        if not path.is_file() or path.suffix.lower() not in RAW_PARTITION_SUFFIXES:
+            continue
+        if path.stem in parts:
+            raise ValueError(f"Duplicate partition key {path.stem!r}: {parts[path.stem]}, {path}")
+        parts[path.stem] = path
+    return parts
+
+
+def read_raw_partition(path: Path, cache_dir: Optional[Path]) -> pd.DataFrame:
+    if path.suffix.lower() in EXCEL_SUFFIXES:
+        return read_raw_cached(path, cache_dir)
+    df = read_dataset(path)
+    df = df.rename(columns={"default payment next month": "default"})
+    return df.drop(columns=["ID"], errors="ignore")
+
+
+def partition_suite(suite: dict) -> dict:
+    """Suite без ожиданий, которые имеют смысл только для всего датасета."""
+    expectations = [
+        e
+        for e in suite.get("expectations", [])
+        if e.get("expectation_type") not in DATASET_LEVEL_EXPECTATIONS
+    ]
+    return {**suite, "expectations": expectations}
+
+
+def _failed_expectations(result: dict) -> List[str]:
+    failed = []
+    for r in result.get("results", []):
+        if r.get("success", True):
+            continue
+        cfg = r.get("expectation_config", {})
+        column = (cfg.get("kwargs", {}) or {}).get("column")
+        failed.append(
+            f"{cfg.get('expectation_type')}:{column}" if column else cfg.get("expectation_type")
+        )
+    return failed
+
+
+def _write_manifest(out_dir: Path, manifest: dict) -> None:
+    manifest["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    tmp_path = out_dir / (PARTITION_MANIFEST + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(out_dir / PARTITION_MANIFEST)
+
+
+def prepare_partitions(
+    raw_dir: Path,
+    out_dir: Path,
+    suite_path: Optional[Path] = None,
+    cache_dir: Optional[Path] = None,
+    force: bool = False,
+) -> Dict[str, List[str]]:
+    """Обновляет партиционированный датасет; возвращает ключи по видам действий."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    sources = discover_partitions(Path(raw_dir))
+
+    manifest = read_manifest(out_dir)
+    entries: Dict[str, dict] = manifest.get("partitions", {})
+    if manifest.get("version") != MANIFEST_VERSION:
+        entries = {}
+    manifest = {"version": MANIFEST_VERSION, "prepare_version": PREPARE_VERSION}
+    manifest["partitions"] = entries
+
+    plan = None
+    suite_sha = None
+    if suite_path is not None:
+        suite_sha = file_sha256(Path(suite_path))
+        plan = compile_suite(partition_suite(load_suite(Path(suite_path))))
+
+    summary: Dict[str, List[str]] = {"built": [], "validated": [], "unchanged": [], "removed": []}
+
+    for key in sorted(set(entries) - set(sources)):
+        (out_dir / entries.pop(key)["file"]).unlink(missing_ok=True)
+        summary["removed"].append(key)
+
+    for key, src in sources.items():
+        entry = entries.get(key, {})
+        out_path = out_dir / f"{key}.feather"
+        source_sha = file_sha256(src)
+        fresh = (
+            not force
+            and entry.get("source_sha256") == source_sha
+            and entry.get("prepare_version") == PREPARE_VERSION
+            and out_path.exists()
+        )
+
+        if not fresh:
+            t0 = time.perf_counter()
+            df = clean_and_prepare(read_raw_partition(src, cache_dir))
+            write_columnar(df, out_path, extra_meta={"partition": key, "source_sha256": source_sha})
+            entry = {
+                "file": out_path.name,
+                "source": str(src),
+                "source_sha256": source_sha,
+                "prepare_version": PREPARE_VERSION,
+                "rows": int(len(df)),
+                "prepare_seconds": round(time.perf_counter() - t0, 3),
+            }
+            summary["built"].append(key)
+
+        validation = entry.get("validation", {})
+        if plan is not None and (not fresh or validation.get("suite_sha256") != suite_sha):
+            result = plan.validate_path(out_path)
+            entry["validation"] = {
+                "suite_sha256": suite_sha,
+                "success": bool(result["success"]),
+                "failed": _failed_expectations(result),
+            }
+            summary["validated"].append(key)
+        elif fresh:
+            summary["unchanged"].append(key)
+
+        entries[key] = entry
+        _write_manifest(out_dir, manifest)
+
+    _write_manifest(out_dir, manifest)
+    return summary
+
+
+def failed_partitions(out_dir: Path) -> Dict[str, List[str]]:
+    entries = read_manifest(Path(out_dir)).get("partitions", {})
+    return {
+        key: e["validation"]["failed"]
+        for key, e in entries.items()
+        if not e.get("validation", {}).get("success", True)
+    }
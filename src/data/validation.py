@@ -4,14 +4,24 @@ from pathlib import Path
 
 import pandas as pd
 
+from src.data.columnar import read_dataset
+from src.data.compiled_validation import (
+    DEFAULT_CHUNK_ROWS,
+    SUPPORTED_EXPECTATIONS,
+    compile_suite,
+)
 
-try:
-    import great_expectations as ge  # type: ignore
+ENGINES = ("auto", "compiled", "ge")
 
-    _GE_AVAILABLE = True
-except Exception:  # pragma: no cover
-    ge = None  # type: ignore
-    _GE_AVAILABLE = False
+
+def _import_ge():
+    # Great Expectations тяжёлый на импорт: подгружаем только когда он действительно нужен
+    try:
+        import great_expectations as ge  # type: ignore
+
+        return ge
+    except Exception:  # pragma: no cover
+        return None
 
 
 def load_suite(suite_path: Path) -> dict:
@@ -19,84 +29,92 @@ def load_suite(suite_path: Path) -> dict:
         return json.load(f)
 
 
-def validate_dataframe(df: pd.DataFrame, suite_dict: dict) -> dict:
-    if _GE_AVAILABLE:
-        validator = ge.from_pandas(df)
-        return validator.validate(expectation_suite=suite_dict)
-
-    expectations = suite_dict.get("expectations", []) or []
-    results = []
-    success_count = 0
-
-    for exp in expectations:
-        exp_type = exp.get("expectation_type")
-        kwargs = exp.get("kwargs", {}) or {}
-        ok = True
-
-        if exp_type == "expect_column_values_to_be_in_set":
-            col = kwargs.get("column")
-            allowed = set(kwargs.get("value_set", []) or [])
-            if col not in df.columns:
-                ok = False
-            else:
-                ok = bool(df[col].isin(list(allowed)).all())
-
-        elif exp_type == "expect_column_values_to_not_be_null":
-            col = kwargs.get("column")
-            ok = bool(col in df.columns and df[col].notna().all())
-
-        elif exp_type == "expect_column_values_to_be_between":
-            col = kwargs.get("column")
-            min_v = kwargs.get("min_value")
-            max_v = kwargs.get("max_value")
-            if col not in df.columns:
-                ok = False
-            else:
-                s = df[col]
-                if min_v is not None:
-                    ok = ok and bool((s >= min_v).all())
-                if max_v is not None:
-                    ok = ok and bool((s <= max_v).all())
-
-        else:
-            # Unknown expectation type in fallback mode
-            ok = False
-
-        results.append({"expectation_config": exp, "success": bool(ok)})
-        success_count += int(bool(ok))
-
-    evaluated = len(results)
-    overall_success = success_count == evaluated
-    return {
-        "success": bool(overall_success),
-        "statistics": {
-            "evaluated_expectations": evaluated,
-            "successful_expectations": success_count,
-            "unsuccessful_expectations": evaluated - success_count,
-        },
-        "results": results,
-    }
+def _resolve_engine(suite_dict: dict, engine: str) -> str:
+    if engine not in ENGINES:
+        raise ValueError(f"Unknown validation engine: {engine}")
+    if engine != "auto":
+        return engine
+    types = {e.get("expectation_type") for e in suite_dict.get("expectations", []) or []}
+    if types <= SUPPORTED_EXPECTATIONS:
+        return "compiled"
+    if _import_ge() is not None:
+        return "ge"
+    # compile_suite сообщит, какие типы не поддержаны
+    return "compiled"
+
+
+def _validate_with_ge(df: pd.DataFrame, suite_dict: dict) -> dict:
+    ge = _import_ge()
+    if ge is None:
+        raise RuntimeError("great_expectations is not installed")
+    validator = ge.from_pandas(df)
+    return validator.validate(expectation_suite=suite_dict)
+
+
+def validate_dataframe(df: pd.DataFrame, suite_dict: dict, engine: str = "auto") -> dict:
+    """Валидация датафрейма: compiled (векторный план) или GE.
+
+    ``auto`` выбирает compiled, если все типы ожиданий поддержаны, иначе GE.
+    """
+    if _resolve_engine(suite_dict, engine) == "ge":
+        return _validate_with_ge(df, suite_dict)
+    return compile_suite(suite_dict).validate(df)
+
+
+def validate_path(
+    data_path: Path, suite_dict: dict, engine: str = "auto", chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> dict:
+    """Валидация файла; compiled-движок читает только нужные колонки и кусками."""
+    if _resolve_engine(suite_dict, engine) == "ge":
+        return _validate_with_ge(read_dataset(data_path), suite_dict)
+    return compile_suite(suite_dict).validate_path(data_path, chunk_rows=chunk_rows)
+
+
+def _describe(r: dict) -> str:
+    cfg = r.get("expectation_config", {})
+    column = (cfg.get("kwargs", {}) or {}).get("column")
+    name = cfg.get("expectation_type", "")
+    return f"{name}({column})" if column else name
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--data-path", required=True)
     parser.add_argument("--suite-path", required=True)
+    parser.add_argument("--engine", choices=ENGINES, default="auto")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
     args = parser.parse_args()
 
-    df = pd.read_csv(Path(args.data_path))
     suite = load_suite(Path(args.suite_path))
-    result = validate_dataframe(df, suite)
+    result = validate_path(Path(args.data_path), suite, args.engine, args.chunk_rows)
 
     ok = bool(result.get("success", False))
     stats = result.get("statistics", {})
-    print(f"GE validation success={ok}; evaluated={stats.get('evaluated_expectations')}")
+    meta = result.get("meta", {})
+    print(
+        f"Validation success={ok}; evaluated={stats.get('evaluated_expectations')}; "
+        f"engine={meta.get('engine', 'ge')}"
+    )
+    if "elapsed_ms" in meta:
+        print(f"Rows={meta['rows']} chunks={meta['chunks']} total={meta['elapsed_ms']:.2f} ms")
+        for r in result.get("results", []):
+            print(f"  {r.get('elapsed_ms', 0.0):8.3f} ms  {_describe(r)}")
 
     if not ok:
         failed = [r for r in result.get("results", []) if not r.get("success", True)]
         print(f"Failed expectations: {len(failed)}")
         for r in failed[:5]:
-            print("-", r.get("expectation_config", {}).get("expectation_type"))
+            res = r.get("result", {}) or {}
+            detail = ""
+            if "unexpected_count" in res:
+                detail = (
+                    f": unexpected={res['unexpected_count']} "
+                    f"rows={res.get('partial_unexpected_index_list', [])[:5]} "
+                    f"values={res.get('partial_unexpected_list', [])[:5]}"
+                )
+            elif "observed_value" in res:
+                detail = f": observed={res['observed_value']}"
+            print("-", _describe(r) + detail)
         raise SystemExit(1)
 
 
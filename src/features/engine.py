@@ -0,0 +1,90 @@
+"""Единый векторный расчёт инженерных признаков для обучения и инференса.
+
+Работает на NumPy-массивах (1..N строк) без DataFrame: одинаково вызывается из
+prepare (``build_features``), API, дрифт-мониторинга и батчевого скоринга.
+
+Семантика (совпадает с тем, на чём обучались модели):
+- суммы BILL_AMT*/PAY_AMT* пропуски не учитывают (как ``DataFrame.sum``);
+- ``PAY_RATIO = PAY_AMT_SUM / BILL_AMT_SUM``, при нулевой сумме счетов — 0,
+  отрицательные значения обрезаются до 0;
+- ``AGE_BIN`` — полуинтервалы ``[a, b)``, вне диапазона и пропуск — ``"nan"``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+BILL_COLS = tuple(f"BILL_AMT{i}" for i in range(1, 7))
+PAY_AMT_COLS = tuple(f"PAY_AMT{i}" for i in range(1, 7))
+AGE_EDGES = np.array([0, 25, 35, 45, 55, 65, 200], dtype=np.float64)
+AGE_LABELS = ("<25", "25-34", "35-44", "45-54", "55-64", "65+")
+MISSING_LABEL = "nan"
+ENGINEERED_COLUMNS = ("BILL_AMT_SUM", "PAY_AMT_SUM", "PAY_RATIO", "AGE_BIN")
+
+# Последний элемент — метка для значений вне бинов
+_AGE_LUT = np.array(AGE_LABELS + (MISSING_LABEL,), dtype=object)
+
+
+def _row_sum(columns: Mapping[str, np.ndarray], names, n: int) -> np.ndarray:
+    out = np.zeros(n, dtype=np.float64)
+    for c in names:
+        if c not in columns:
+            continue
+        v = np.asarray(columns[c], dtype=np.float64).reshape(-1)
+        out += np.where(np.isnan(v), 0.0, v)
+    return out
+
+
+def pay_ratio(pay_sum: np.ndarray, bill_sum: np.ndarray) -> np.ndarray:
+    nonzero = bill_sum != 0
+    ratio = np.divide(pay_sum, bill_sum, out=np.zeros_like(pay_sum), where=nonzero)
+    ratio[np.isnan(ratio)] = 0.0
+    return np.maximum(ratio, 0.0)
+
+
+def age_bin(age: np.ndarray) -> np.ndarray:
+    """Метки возрастных бинов (object-массив строк)."""
+    age = np.asarray(age, dtype=np.float64).reshape(-1)
+    idx = np.searchsorted(AGE_EDGES, age, side="right") - 1
+    outside = (idx < 0) | (idx >= len(AGE_LABELS)) | np.isnan(age)
+    idx[outside] = len(AGE_LABELS)
+    return _AGE_LUT[idx]
+
+
+def engineer_columns(
+    columns: Mapping[str, np.ndarray], n_rows: Optional[int] = None
+) -> Dict[str, np.ndarray]:
+    """Инженерные признаки по словарю колонок {имя: 1-D массив}."""
+    if n_rows is None:
+        first = next(iter(columns.values()), None)
+        n_rows = 0 if first is None else len(np.asarray(first).reshape(-1))
+
+    bill_sum = _row_sum(columns, BILL_COLS, n_rows)
+    pay_sum = _row_sum(columns, PAY_AMT_COLS, n_rows)
+    age = columns.get("AGE")
+    return {
+        "BILL_AMT_SUM": bill_sum,
+        "PAY_AMT_SUM": pay_sum,
+        "PAY_RATIO": pay_ratio(pay_sum, bill_sum),
+        "AGE_BIN": age_bin(age if age is not None else np.full(n_rows, np.nan)),
+    }
+
+
+def engineer_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Копия ``df`` с пересчитанными инженерными колонками."""
+    names = [c for c in BILL_COLS + PAY_AMT_COLS + ("AGE",) if c in df.columns]
+    features = engineer_columns({c: df[c].to_numpy() for c in names}, n_rows=len(df))
+    out = df.copy()
+    for name, values in features.items():
+        out[name] = values
+    return out
+
+
+def with_engineered(df: pd.DataFrame) -> pd.DataFrame:
+    """Досчитывает недостающие инженерные колонки (сырой вход батча/дрифта)."""
+    if all(c in df.columns for c in ENGINEERED_COLUMNS):
+        return df
+    return engineer_frame(df)
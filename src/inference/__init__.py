@@ -0,0 +1 @@
+"""Общий рантайм инференса ONNX: загрузка модели, входы, декодирование вероятностей."""
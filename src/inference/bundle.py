@@ -0,0 +1,248 @@
+"""Бандл модели: один файл с манифестом и выровненными секциями для mmap.
+
+Раскладка::
+
+    [0:8]    MAGIC
+    [8:16]   длина манифеста, uint64 little-endian
+    [16:...] манифест (JSON, utf-8), дополнен нулями до ALIGN
+    секции   каждая с границы ALIGN: байты модели ORT, массивы NumPy-бэкенда
+
+В манифесте — схема входов (порядок признаков и типы ORT), карты категорий,
+порог, sha256 модели и секций, метаданные обучения и таблица секций
+(смещение, размер, dtype, shape).
+
+``ModelBundle.open`` отображает файл ``np.memmap(mode="r")``: веса
+``NumpyMLP`` — представления над страницами файла без копий, и все воркеры на
+узле делят одни и те же страницы page cache. Байты модели ORT копируются в
+``bytes`` при создании сессии: Python API ORT принимает только их, а
+``session.use_ort_model_bytes_directly`` из Python небезопасен (pybind
+передаёт в сессию временную копию буфера).
+
+Перезапись — через временный файл и ``os.replace``: уже открытые отображения
+продолжают видеть старый файл.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+from src.inference.model import OnnxModel
+from src.inference.numpy_mlp import NumpyMLP
+
+MAGIC = b"CRSBNDL1"
+ALIGN = 64
+FORMAT_VERSION = 1
+MODEL_SECTION = "model"
+
+
+def _sha256(buf) -> str:
+    return hashlib.sha256(memoryview(buf)).hexdigest()
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGN) * ALIGN
+
+
+def mlp_sections(mlp: NumpyMLP) -> Dict[str, np.ndarray]:
+    arrays = {
+        "mlp.fill": mlp.fill,
+        "mlp.w_num": mlp.w_num,
+        "mlp.b_first": mlp.b_first,
+        "mlp.table": mlp.table,
+    }
+    for i, (w, b) in enumerate(mlp.layers):
+        arrays[f"mlp.layer{i}.w"] = w
+        arrays[f"mlp.layer{i}.b"] = b
+    return arrays
+
+
+def mlp_manifest(mlp: NumpyMLP) -> Dict[str, Any]:
+    return {
+        "num_names": list(mlp.num_names),
+        "cat_names": list(mlp.cat_names),
+        "cat_index": mlp.cat_index,
+        "activation": mlp.activation,
+        "n_layers": len(mlp.layers),
+    }
+
+
+def write_bundle(
+    path: Path,
+    model_bytes: bytes,
+    model_format: str,
+    inputs: Sequence[Mapping[str, str]],
+    mlp: Optional[NumpyMLP] = None,
+    threshold: float = 0.5,
+    training: Optional[Mapping[str, Any]] = None,
+) -> Dict[str, Any]:
+    """Записать бандл атомарно; вернуть манифест."""
+    sections: Dict[str, Any] = {MODEL_SECTION: np.frombuffer(model_bytes, dtype=np.uint8)}
+    if mlp is not None:
+        sections.update(mlp_sections(mlp))
+
+    categories = {}
+    if mlp is not None:
+        categories = {
+            name: sorted(k for k in index if k != "nan")
+            for name, index in zip(mlp.cat_names, mlp.cat_index)
+        }
+    manifest: Dict[str, Any] = {
+        "format_version": FORMAT_VERSION,
+        "feature_order": [i["name"] for i in inputs],
+        "schema": {"inputs": [dict(i) for i in inputs], "categories": categories},
+        "threshold": float(threshold),
+        "model": {
+            "format": model_format,
+            "section": MODEL_SECTION,
+            "sha256": _sha256(model_bytes),
+        },
+        "numpy_mlp": mlp_manifest(mlp) if mlp is not None else None,
+        "training": dict(training or {}),
+        "sections": {},
+    }
+
+    # Смещения секций зависят от длины манифеста, а она — от смещений:
+    # считаем с запасом на цифры, пока длина не перестанет меняться
+    sections = {name: np.ascontiguousarray(arr) for name, arr in sections.items()}
+    table = {
+        name: {
+            "offset": 0,
+            "nbytes": int(arr.nbytes),
+            "dtype": arr.dtype.str,
+            "shape": list(arr.shape),
+            "sha256": _sha256(arr),
+        }
+        for name, arr in sections.items()
+    }
+    header_len = 0
+    while True:
+        offset = _aligned(16 + header_len)
+        for name, sec in table.items():
+            sec["offset"] = offset
+            offset = _aligned(offset + sec["nbytes"])
+        manifest["sections"] = table
+        encoded = json.dumps(manifest, ensure_ascii=False).encode("utf-8")
+        if len(encoded) <= header_len:
+            break
+        header_len = len(encoded) + 256
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<Q", len(encoded)) + encoded)
+        for name, arr in sections.items():
+            f.write(b"\0" * (table[name]["offset"] - f.tell()))
+            f.write(arr.tobytes())
+    os.replace(tmp, path)
+    return manifest
+
+
+def read_manifest(path: Path) -> Dict[str, Any]:
+    with open(path, "rb") as f:
+        head = f.read(16)
+        if len(head) < 16 or head[:8] != MAGIC:
+            raise ValueError(f"{path} is not a model bundle")
+        (length,) = struct.unpack("<Q", head[8:])
+        return json.loads(f.read(length).decode("utf-8"))
+
+
+def decision_threshold(model_path: Path, default: float = 0.5) -> float:
+    """Порог класса: из манифеста бандла, для прочих форматов — ``default``."""
+    if Path(model_path).suffix != ".bundle":
+        return default
+    return float(read_manifest(Path(model_path))["threshold"])
+
+
+class ModelBundle:
+    def __init__(self, path: Path, manifest: Dict[str, Any], buffer: np.ndarray):
+        self.path = Path(path)
+        self.manifest = manifest
+        self.buffer = buffer
+
+    @classmethod
+    def open(cls, path: Path) -> "ModelBundle":
+        path = Path(path)
+        manifest = read_manifest(path)
+        if manifest.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported bundle version {manifest.get('format_version')}")
+        return cls(path, manifest, np.memmap(path, dtype=np.uint8, mode="r"))
+
+    @property
+    def threshold(self) -> float:
+        return float(self.manifest["threshold"])
+
+    @property
+    def feature_order(self) -> list:
+        return list(self.manifest["feature_order"])
+
+    @property
+    def has_numpy_mlp(self) -> bool:
+        return self.manifest.get("numpy_mlp") is not None
+
+    def array(self, name: str) -> np.ndarray:
+        """Секция как read-only представление над отображением файла (без копии)."""
+        sec = self.manifest["sections"][name]
+        raw = self.buffer[sec["offset"] : sec["offset"] + sec["nbytes"]]
+        return np.asarray(raw).view(np.dtype(sec["dtype"])).reshape(sec["shape"])
+
+    def verify(self) -> None:
+        for name, sec in self.manifest["sections"].items():
+            if _sha256(np.ascontiguousarray(self.array(name))) != sec["sha256"]:
+                raise ValueError(f"{self.path}: section {name} checksum mismatch")
+
+    def onnx_model(
+        self,
+        threads: int = 0,
+        providers: Optional[Sequence[str]] = None,
+        io_binding: bool = False,
+    ) -> OnnxModel:
+        info = self.manifest["model"]
+        return OnnxModel(
+            self.path,
+            threads=threads,
+            providers=providers,
+            io_binding=io_binding,
+            model_bytes=self.array(info["section"]).tobytes(),
+            model_format=info["format"],
+        )
+
+    def numpy_model(self) -> Optional[NumpyMLP]:
+        meta = self.manifest.get("numpy_mlp")
+        if meta is None:
+            return None
+        layers = [
+            (self.array(f"mlp.layer{i}.w"), self.array(f"mlp.layer{i}.b"))
+            for i in range(meta["n_layers"])
+        ]
+        return NumpyMLP(
+            meta["num_names"],
+            meta["cat_names"],
+            self.array("mlp.fill"),
+            self.array("mlp.w_num"),
+            self.array("mlp.b_first"),
+            self.array("mlp.table"),
+            meta["cat_index"],
+            layers,
+            meta["activation"],
+            str(self.path),
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "size_bytes": int(self.buffer.nbytes),
+            "model_format": self.manifest["model"]["format"],
+            "model_sha256": self.manifest["model"]["sha256"],
+            "features": len(self.manifest["feature_order"]),
+            "threshold": self.threshold,
+            "numpy_mlp": self.has_numpy_mlp,
+            "sections": {n: s["nbytes"] for n, s in self.manifest["sections"].items()},
+        }
@@ -0,0 +1,26 @@
+"""Вероятность положительного класса из выхода ONNX-классификатора."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+
+
+def decode_probas(value: Any, positive_index: int = 1) -> np.ndarray:
+    """(N,) float64 из тензора ``(N, n_classes)``/``(N,)`` или выхода ZipMap.
+
+    ZipMap (``list[dict]``) читается одним проходом ``np.fromiter`` с ключом,
+    найденным один раз; ``OnnxModel`` по возможности вообще запрашивает тензор
+    вероятностей до ZipMap и эту ветку не использует.
+    """
+    if isinstance(value, list):
+        if not value:
+            return np.empty(0, dtype=np.float64)
+        first = value[0]
+        key = positive_index if positive_index in first else str(positive_index)
+        return np.fromiter((d[key] for d in value), dtype=np.float64, count=len(value))
+    arr = np.asarray(value)
+    if arr.ndim == 2 and arr.shape[1] > 1:
+        return arr[:, positive_index].astype(np.float64)
+    return arr.reshape(-1).astype(np.float64)
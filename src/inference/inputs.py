@@ -0,0 +1,62 @@
+"""Построение входов ONNX-сессии: по одному ``[N, 1]``-входу на признак."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Тип входа ORT -> dtype массива (строки — object-массив str)
+ORT_DTYPES = {
+    "tensor(float)": np.float32,
+    "tensor(double)": np.float64,
+    "tensor(int64)": np.int64,
+    "tensor(int32)": np.int32,
+    "tensor(string)": object,
+}
+
+
+def _convert(values: Any, dtype) -> np.ndarray:
+    col = np.asarray(values).reshape(-1, 1)
+    if dtype is object:
+        # Пропуск в категории -> "nan", как при обучении (astype(str))
+        return col.astype(str).astype(object)
+    return col.astype(dtype, copy=False)
+
+
+@dataclass(frozen=True)
+class InputBuilder:
+    """Имена и dtype входов, вычисленные один раз по сигнатуре сессии."""
+
+    names: Tuple[str, ...]
+    dtypes: Tuple[Any, ...]
+
+    @classmethod
+    def from_session(cls, session) -> "InputBuilder":
+        names, dtypes = [], []
+        for inp in session.get_inputs():
+            if inp.type not in ORT_DTYPES:
+                raise ValueError(f"Unsupported ONNX input {inp.name}: {inp.type}")
+            if len(inp.shape) != 2 or inp.shape[1] not in (1, None, "None"):
+                raise ValueError(f"ONNX input {inp.name} must be [N, 1], got {inp.shape}")
+            names.append(inp.name)
+            dtypes.append(ORT_DTYPES[inp.type])
+        return cls(tuple(names), tuple(dtypes))
+
+    @property
+    def has_strings(self) -> bool:
+        return any(d is object for d in self.dtypes)
+
+    def from_columns(self, columns: Mapping[str, Any]) -> Dict[str, np.ndarray]:
+        missing = [n for n in self.names if n not in columns]
+        if missing:
+            raise KeyError(f"Missing model inputs: {missing}")
+        return {n: _convert(columns[n], d) for n, d in zip(self.names, self.dtypes)}
+
+    def from_frame(self, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        missing = [n for n in self.names if n not in df.columns]
+        if missing:
+            raise KeyError(f"Missing model inputs: {missing}")
+        return {n: _convert(df[n].to_numpy(), d) for n, d in zip(self.names, self.dtypes)}
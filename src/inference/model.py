@@ -0,0 +1,176 @@
+"""Обёртка ONNX Runtime-сессии для скоринга.
+
+Сигнатура проверяется один раз при загрузке: входы ``[N, 1]`` известных
+типов (``InputBuilder``), выход вероятностей — тензор ``(N, n_classes)`` или
+ZipMap. Для ``.onnx`` с ZipMap вход ZipMap добавляется в выходы графа, и сессия
+запрашивает только этот тензор: ни словарей на строку, ни ветки меток.
+``.ort`` грузится без повторной оптимизации графа (``optimize_onnx`` уже
+оставил в нём тензорный выход).
+
+``load_scorer`` — общий вход для пакетного скоринга: ``.onnx``/``.ort``
+и бандл ``.bundle`` (``src.inference.bundle``) через ORT, иначе sklearn
+Pipeline из joblib.
+
+``io_binding=True`` — входы привязываются без копий в ``run``, вероятности
+пишутся в переиспользуемый буфер (по одному на поток и размер батча). ORT не
+умеет привязывать строковые тензоры, поэтому режим доступен только моделям с
+числовыми входами.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Mapping, Optional, Sequence
+
+import numpy as np
+import onnx
+import onnxruntime as ort
+import pandas as pd
+from onnx import helper
+
+from src.inference.decode import decode_probas
+from src.inference.inputs import InputBuilder
+
+MAX_BOUND_BATCH_SIZES = 8  # буферов IOBinding на поток
+
+
+def session_options(path: Path, threads: int = 0) -> ort.SessionOptions:
+    """``threads=0`` — выбор ORT; граф ``.ort`` уже оптимизирован офлайн."""
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    if threads:
+        opts.inter_op_num_threads = 1
+    if Path(path).suffix == ".ort":
+        opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_DISABLE_ALL
+    return opts
+
+
+def expose_probability_tensor(model: onnx.ModelProto) -> Optional[str]:
+    """Сделать вход ZipMap выходом графа; имя тензора или ``None`` без ZipMap."""
+    zipmap = next((n for n in model.graph.node if n.op_type == "ZipMap"), None)
+    if zipmap is None:
+        return None
+    name = zipmap.input[0]
+    if name not in {o.name for o in model.graph.output}:
+        labels = next(
+            (helper.get_attribute_value(a) for a in zipmap.attribute if a.name.startswith("class")),
+            [],
+        )
+        model.graph.output.append(
+            helper.make_tensor_value_info(name, onnx.TensorProto.FLOAT, [None, len(labels) or None])
+        )
+    return name
+
+
+def probability_output(session: ort.InferenceSession) -> Dict[str, Any]:
+    """Выход вероятностей: тензор float ``(N, k>1)`` предпочтительнее ZipMap."""
+    outputs = session.get_outputs()
+    for out in outputs:
+        if out.type == "tensor(float)" and len(out.shape) == 2 and out.shape[1] not in (1,):
+            return {"name": out.name, "kind": "tensor", "n_classes": out.shape[1]}
+    for out in outputs:
+        if out.type.startswith("seq(map("):
+            return {"name": out.name, "kind": "zipmap", "n_classes": None}
+    raise ValueError(f"No probability output among {[(o.name, o.type) for o in outputs]}")
+
+
+class OnnxModel:
+    def __init__(
+        self,
+        path: Path,
+        threads: int = 0,
+        providers: Optional[Sequence[str]] = None,
+        io_binding: bool = False,
+        model_bytes: Optional[bytes] = None,
+        model_format: Optional[str] = None,
+    ):
+        """``model_bytes`` — модель уже в памяти (бандл), ``path`` тогда только для имени."""
+        self.path = Path(path)
+        if model_bytes is None and not self.path.exists():
+            raise FileNotFoundError(f"Missing {self.path}. Train/convert ONNX first.")
+        fmt = "." + model_format if model_format else self.path.suffix
+        source: Any = str(self.path) if model_bytes is None else model_bytes
+        opts = session_options(self.path.with_suffix(fmt), threads)
+        if fmt == ".onnx":
+            model = (
+                onnx.load(str(self.path))
+                if model_bytes is None
+                else onnx.load_from_string(model_bytes)
+            )
+            if expose_probability_tensor(model) is not None:
+                source = model.SerializeToString()
+        self.session = ort.InferenceSession(
+            source, opts, providers=providers or ["CPUExecutionProvider"]
+        )
+        self.inputs = InputBuilder.from_session(self.session)
+        self.output = probability_output(self.session)
+        bindable = (
+            not self.inputs.has_strings
+            and self.output["kind"] == "tensor"
+            and isinstance(self.output["n_classes"], int)
+        )
+        if io_binding and not bindable:
+            raise ValueError(
+                "io_binding needs numeric inputs and a fixed-width tensor probability output: "
+                f"{self.path} has string inputs or only ZipMap"
+            )
+        self.io_binding = io_binding
+        self._local = threading.local()
+
+    def signature(self) -> Dict[str, Any]:
+        return {
+            "path": str(self.path),
+            "inputs": len(self.inputs.names),
+            "probability_output": self.output,
+            "io_binding": self.io_binding,
+            "providers": self.session.get_providers(),
+        }
+
+    def _run_bound(self, feeds: Mapping[str, np.ndarray]) -> np.ndarray:
+        local = self._local
+        if not hasattr(local, "binding"):
+            local.binding = self.session.io_binding()
+            local.buffers = {}
+        n = len(next(iter(feeds.values())))
+        buf = local.buffers.get(n)
+        if buf is None:
+            if len(local.buffers) >= MAX_BOUND_BATCH_SIZES:
+                local.buffers.pop(next(iter(local.buffers)))
+            shape = [n, self.output["n_classes"]]
+            buf = local.buffers[n] = ort.OrtValue.ortvalue_from_shape_and_type(
+                shape, np.float32, "cpu", 0
+            )
+        binding = local.binding
+        for name, arr in feeds.items():
+            binding.bind_cpu_input(name, arr)
+        binding.bind_ortvalue_output(self.output["name"], buf)
+        self.session.run_with_iobinding(binding)
+        return buf.numpy()
+
+    def run(self, feeds: Mapping[str, np.ndarray]) -> np.ndarray:
+        """(N,) вероятностей положительного класса по готовым входам."""
+        if self.io_binding:
+            return decode_probas(self._run_bound(feeds))
+        return decode_probas(self.session.run([self.output["name"]], dict(feeds))[0])
+
+    def predict_proba_columns(self, columns: Mapping[str, Any]) -> np.ndarray:
+        return self.run(self.inputs.from_columns(columns))
+
+    def predict_proba_frame(self, df: pd.DataFrame) -> np.ndarray:
+        return self.run(self.inputs.from_frame(df))
+
+
+def load_scorer(path: Path, threads: int = 0) -> Callable[[pd.DataFrame], np.ndarray]:
+    """DataFrame -> (N,) вероятностей положительного класса."""
+    path = Path(path)
+    if path.suffix == ".bundle":
+        from src.inference.bundle import ModelBundle
+
+        return ModelBundle.open(path).onnx_model(threads=threads).predict_proba_frame
+    if path.suffix in (".onnx", ".ort"):
+        return OnnxModel(path, threads=threads).predict_proba_frame
+    import joblib
+
+    pipe = joblib.load(path)
+    return lambda df: pipe.predict_proba(df)[:, 1]
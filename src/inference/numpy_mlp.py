@@ -0,0 +1,196 @@
+"""MLP-пайплайн ``nn_model.joblib`` на чистом NumPy для коротких запросов.
+
+На одной строке время ``InferenceSession.run`` — в основном фиксированная
+цена вызова и сборка ~27 входных тензоров, а не арифметика сети (64, 32).
+Здесь обученные шаги извлекаются один раз в непрерывные float32-массивы:
+
+- медианы импьютера подставляются на месте ``NaN``;
+- ``StandardScaler`` вкладывается в первый слой:
+  ``((x - m) / s) @ W = x @ (W / s) - (m / s) @ W``;
+- one-hot — не умножение на разреженный вектор, а выбор строки первого слоя
+  по индексу категории (неизвестная — нулевая строка, пропуск ``"nan"`` — мода,
+  как у импьютера);
+- дальше — ``matmul`` в заранее выделенные буферы (по одному набору на поток
+  и размер батча).
+
+Интерфейс — как у ``OnnxModel`` (``predict_proba_columns`` /
+``predict_proba_frame`` / ``signature``), API выбирает бэкенд по числу строк.
+"""
+
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.inference.model import MAX_BOUND_BATCH_SIZES
+
+ACTIVATIONS = {
+    "relu": lambda h: np.maximum(h, 0, out=h),
+    "tanh": lambda h: np.tanh(h, out=h),
+    "logistic": lambda h: np.divide(1.0, 1.0 + np.exp(-h, out=h), out=h),
+    "identity": lambda h: h,
+}
+
+
+class NumpyMLP:
+    def __init__(
+        self,
+        num_names: Sequence[str],
+        cat_names: Sequence[str],
+        fill: np.ndarray,
+        w_num: np.ndarray,
+        b_first: np.ndarray,
+        table: np.ndarray,
+        cat_index: Sequence[Dict[str, int]],
+        layers: Sequence[tuple],
+        activation: str,
+        path: str = "",
+    ):
+        self.num_names = tuple(num_names)
+        self.cat_names = tuple(cat_names)
+        self.fill = fill
+        self.w_num = w_num
+        self.b_first = b_first
+        self.table = table
+        self.cat_index = list(cat_index)
+        self.layers = list(layers)
+        self.activation = activation
+        self.path = path
+        self._act = ACTIVATIONS[activation]
+        self._zero_row = len(table) - 1
+        self._local = threading.local()
+
+    @classmethod
+    def from_pipeline(cls, pipe, path: str = "") -> "NumpyMLP":
+        """Pipeline ``train_nn_onnx``: ветки num (imputer+scaler), cat (imputer+OHE) и MLP."""
+        prep, mlp = pipe.steps[0][1], pipe.steps[-1][1]
+        if mlp.out_activation_ != "logistic" or mlp.activation not in ACTIVATIONS:
+            raise ValueError(
+                f"Unsupported MLP: activation={mlp.activation}, output={mlp.out_activation_}"
+            )
+        branches = {name: (trans, list(cols)) for name, trans, cols in prep.transformers_}
+        if [n for n, _, _ in prep.transformers_ if n != "remainder"] != ["num", "cat"]:
+            raise ValueError(f"Expected num/cat branches, got {list(branches)}")
+        (num_pipe, num_names), (cat_pipe, cat_names) = branches["num"], branches["cat"]
+        num_imputer, scaler = num_pipe.steps[0][1], num_pipe.steps[1][1]
+        cat_imputer, ohe = cat_pipe.steps[0][1], cat_pipe.steps[1][1]
+        if ohe.drop_idx_ is not None or ohe.handle_unknown != "ignore":
+            raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop")
+
+        n_num = len(num_names)
+        w1 = mlp.coefs_[0].astype(np.float64)
+        mean = getattr(scaler, "mean_", None)
+        scale = getattr(scaler, "scale_", None)
+        mean = np.zeros(n_num) if mean is None else mean
+        scale = np.ones(n_num) if scale is None else scale
+        w_num = w1[:n_num] / scale[:, None]
+        b_first = mlp.intercepts_[0] - (mean / scale) @ w1[:n_num]
+
+        # Строки one-hot части первого слоя + нулевая строка для неизвестных
+        table = np.vstack([w1[n_num:], np.zeros((1, w1.shape[1]))])
+        cat_index: List[Dict[str, int]] = []
+        offset = n_num
+        for j, cats in enumerate(ohe.categories_):
+            index = {str(c): offset - n_num + k for k, c in enumerate(cats)}
+            mode = str(cat_imputer.statistics_[j])
+            index[str(cat_imputer.missing_values)] = index.get(mode, len(table) - 1)
+            cat_index.append(index)
+            offset += len(cats)
+
+        f32 = np.float32
+        layers = [
+            (np.ascontiguousarray(w, dtype=f32), np.ascontiguousarray(b, dtype=f32))
+            for w, b in zip(mlp.coefs_[1:], mlp.intercepts_[1:])
+        ]
+        return cls(
+            num_names,
+            cat_names,
+            np.asarray(num_imputer.statistics_, dtype=f32),
+            np.ascontiguousarray(w_num, dtype=f32),
+            np.ascontiguousarray(b_first, dtype=f32),
+            np.ascontiguousarray(table, dtype=f32),
+            cat_index,
+            layers,
+            mlp.activation,
+            path,
+        )
+
+    @classmethod
+    def load(cls, path: Path) -> "NumpyMLP":
+        import joblib
+
+        return cls.from_pipeline(joblib.load(Path(path)), str(path))
+
+    @property
+    def input_names(self) -> tuple:
+        return self.num_names + self.cat_names
+
+    def signature(self) -> Dict[str, Any]:
+        return {
+            "path": self.path,
+            "backend": "numpy",
+            "inputs": len(self.input_names),
+            "layers": [self.w_num.shape[1], *(w.shape[1] for w, _ in self.layers)],
+        }
+
+    def _buffers(self, n: int) -> List[np.ndarray]:
+        local = self._local
+        if not hasattr(local, "buffers"):
+            local.buffers = {}
+        bufs = local.buffers.get(n)
+        if bufs is None:
+            if len(local.buffers) >= MAX_BOUND_BATCH_SIZES:
+                local.buffers.pop(next(iter(local.buffers)))
+            widths = [
+                len(self.num_names),
+                self.w_num.shape[1],
+                *(w.shape[1] for w, _ in self.layers),
+            ]
+            bufs = local.buffers[n] = [np.empty((n, w), dtype=np.float32) for w in widths]
+        return bufs
+
+    def predict_proba_columns(self, columns: Mapping[str, Any]) -> np.ndarray:
+        missing = [c for c in self.input_names if c not in columns]
+        if missing:
+            raise KeyError(f"Missing model inputs: {missing}")
+        n = len(np.asarray(columns[self.num_names[0]]).reshape(-1))
+        x, h, *hidden = self._buffers(n)
+
+        for i, name in enumerate(self.num_names):
+            x[:, i] = np.asarray(columns[name], dtype=np.float32).reshape(-1)
+        nan = np.isnan(x)
+        if nan.any():
+            x[nan] = np.broadcast_to(self.fill, x.shape)[nan]
+
+        np.matmul(x, self.w_num, out=h)
+        h += self.b_first
+        for name, index in zip(self.cat_names, self.cat_index):
+            # Как InputBuilder для ONNX: значение -> str, пропуск -> "nan"
+            values = np.asarray(columns[name]).reshape(-1).astype(str)
+            h += self.table[[index.get(v, self._zero_row) for v in values]]
+
+        for (w, b), out in zip(self.layers, hidden):
+            self._act(h)
+            np.matmul(h, w, out=out)
+            out += b
+            h = out
+        return 1.0 / (1.0 + np.exp(-h[:, 0].astype(np.float64)))
+
+    def probe_columns(self, n: int = 16, seed: int = 0) -> Dict[str, np.ndarray]:
+        """Строки около медиан и известные категории — сверка с другим бэкендом."""
+        rng = np.random.default_rng(seed)
+        cols: Dict[str, np.ndarray] = {
+            name: self.fill[i] + rng.normal(0, 1 + abs(float(self.fill[i])), n)
+            for i, name in enumerate(self.num_names)
+        }
+        for name, index in zip(self.cat_names, self.cat_index):
+            known = sorted(k for k in index if k != "nan")
+            cols[name] = np.asarray(known, dtype=object)[rng.integers(0, len(known), n)]
+        return cols
+
+    def predict_proba_frame(self, df: pd.DataFrame) -> np.ndarray:
+        return self.predict_proba_columns({c: df[c].to_numpy() for c in self.input_names})
@@ -0,0 +1 @@
+"""Нагрузочное тестирование API: payload'ы из данных, сценарии, формы нагрузки, SLO."""
@@ -0,0 +1,51 @@
+"""Конфигурация нагрузочного теста — секция ``loadtest`` в ``params.yaml``."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Tuple
+
+import yaml
+
+
+@dataclass
+class Slo:
+    p95_ms: float = 100.0
+    p99_ms: float = 250.0
+    error_rate: float = 0.01
+
+
+@dataclass
+class LoadTestConfig:
+    data_path: str = "data/processed/credit.csv"
+    generator_path: str = ""  # .npz генератора (src.data.synthetic): payload'ы из синтетики
+    sample_rows: int = 20_000
+    seed: int = 42
+    weights: Dict[str, int] = field(default_factory=lambda: {"single": 8, "batch": 2, "health": 1})
+    batch_size: Tuple[int, int] = (8, 64)
+    wait_seconds: Tuple[float, float] = (0.0, 0.05)
+    shape: str = "step"  # step | spike | none (пользователи из CLI locust)
+    step: Dict[str, float] = field(default_factory=dict)
+    spike: Dict[str, float] = field(default_factory=dict)
+    slo: Slo = field(default_factory=Slo)
+    # Переопределения SLO по имени запроса, например {"/predict/batch": {"p95_ms": 300}}
+    slo_overrides: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+    def slo_for(self, name: str) -> Slo:
+        return Slo(**{**self.slo.__dict__, **self.slo_overrides.get(name, {})})
+
+
+def load_config(path: Path = Path("params.yaml")) -> LoadTestConfig:
+    path = Path(path)
+    raw: Dict[str, Any] = {}
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            raw = (yaml.safe_load(f) or {}).get("loadtest", {}) or {}
+    raw = dict(raw)
+    if "slo" in raw:
+        raw["slo"] = Slo(**raw["slo"])
+    for key in ("batch_size", "wait_seconds"):
+        if key in raw:
+            raw[key] = tuple(raw[key])
+    return LoadTestConfig(**raw)
@@ -0,0 +1,69 @@
+"""Payload'ы запросов: строки реального датасета или синтетики вместо одной константы.
+
+Берутся только поля запроса (сырые признаки ``CreditFeatures``; инженерные API
+пересчитывает сам), строки с пропусками отбрасываются, значения приводятся к
+типам JSON (int/float Python). Выборка держится в памяти списком словарей —
+на запрос только ``random.choice``.
+"""
+
+from __future__ import annotations
+
+import random
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+from src.data.columnar import TARGET_COL
+from src.data.make_dataset import RAW_COLUMNS
+
+FIELDS = [c for c in RAW_COLUMNS if c != TARGET_COL]
+FLOAT_FIELDS = {c for c in FIELDS if c == "LIMIT_BAL" or c.startswith(("BILL_AMT", "PAY_AMT"))}
+
+
+def frame_to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    df = df[FIELDS].dropna()
+    cols = {
+        c: (df[c].astype(float) if c in FLOAT_FIELDS else df[c].round().astype("int64")).tolist()
+        for c in FIELDS
+    }
+    return [dict(zip(FIELDS, values)) for values in zip(*(cols[c] for c in FIELDS))]
+
+
+class PayloadSampler:
+    def __init__(self, records: List[Dict[str, Any]], seed: Optional[int] = None):
+        if not records:
+            raise ValueError("No payload records (empty dataset?)")
+        self.records = records
+        self._rng = random.Random(seed)
+
+    @classmethod
+    def from_dataset(cls, path: Path, rows: int = 20_000, seed: int = 42) -> "PayloadSampler":
+        from src.data.columnar import read_dataset
+
+        df = read_dataset(Path(path), columns=FIELDS)
+        if rows and len(df) > rows:
+            df = df.sample(n=rows, random_state=seed)
+        return cls(frame_to_records(df), seed)
+
+    @classmethod
+    def from_synthetic(
+        cls, generator_path: Path, rows: int = 20_000, seed: int = 42
+    ) -> "PayloadSampler":
+        from src.data.synthetic import SyntheticModel, generate_chunks
+
+        model = SyntheticModel.load(Path(generator_path))
+        df = pd.concat(generate_chunks(model, rows, seed=seed), ignore_index=True)
+        return cls(frame_to_records(df), seed)
+
+    @classmethod
+    def from_config(cls, cfg) -> "PayloadSampler":
+        if cfg.generator_path:
+            return cls.from_synthetic(Path(cfg.generator_path), cfg.sample_rows, cfg.seed)
+        return cls.from_dataset(Path(cfg.data_path), cfg.sample_rows, cfg.seed)
+
+    def record(self) -> Dict[str, Any]:
+        return self._rng.choice(self.records)
+
+    def batch(self, n: int) -> List[Dict[str, Any]]:
+        return self._rng.choices(self.records, k=n)
@@ -0,0 +1,79 @@
+"""Формы нагрузки: ступени и всплеск как расписание стадий.
+
+Чистая логика без locust: ``LoadShape.tick(run_time)`` возвращает
+``(users, spawn_rate)`` или ``None`` (тест окончен) — ровно то, что ждёт
+``LoadTestShape.tick`` в locustfile.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Stage:
+    duration: float  # секунд
+    users: int
+    spawn_rate: float
+
+
+class LoadShape:
+    def __init__(self, stages: List[Stage]):
+        self.stages = stages
+
+    @property
+    def duration(self) -> float:
+        return sum(s.duration for s in self.stages)
+
+    def tick(self, run_time: float) -> Optional[Tuple[int, float]]:
+        elapsed = 0.0
+        for stage in self.stages:
+            elapsed += stage.duration
+            if run_time < elapsed:
+                return stage.users, stage.spawn_rate
+        return None
+
+
+def step_shape(
+    start_users: int = 10,
+    step_users: int = 10,
+    steps: int = 5,
+    step_seconds: float = 30,
+    spawn_rate: float = 10,
+) -> LoadShape:
+    """Ступени: ``start_users``, +``step_users`` каждые ``step_seconds`` (``steps`` ступеней)."""
+    return LoadShape(
+        [
+            Stage(step_seconds, int(start_users + i * step_users), spawn_rate)
+            for i in range(int(steps))
+        ]
+    )
+
+
+def spike_shape(
+    base_users: int = 10,
+    spike_users: int = 100,
+    warmup_seconds: float = 30,
+    spike_seconds: float = 20,
+    recovery_seconds: float = 40,
+    spawn_rate: float = 50,
+) -> LoadShape:
+    """База -> всплеск -> снова база (видно, восстанавливается ли задержка)."""
+    return LoadShape(
+        [
+            Stage(warmup_seconds, int(base_users), spawn_rate),
+            Stage(spike_seconds, int(spike_users), spawn_rate),
+            Stage(recovery_seconds, int(base_users), spawn_rate),
+        ]
+    )
+
+
+def build_shape(kind: str, params: dict) -> Optional[LoadShape]:
+    if kind == "none":
+        return None
+    if kind == "step":
+        return step_shape(**params)
+    if kind == "spike":
+        return spike_shape(**params)
+    raise ValueError(f"Unknown load shape: {kind} (step | spike | none)")
@@ -0,0 +1,224 @@
+"""Разбор CSV locust (``--csv PREFIX``) в сопоставимую JSON-сводку и проверка SLO.
+
+Из ``PREFIX_stats.csv`` — итог по каждому запросу (p50/p95/p99, rps, доля
+ошибок), из ``PREFIX_stats_history.csv`` — ход теста: строки ``Aggregated``
+группируются в стадии по числу пользователей (ступени step/spike-формы), для
+каждой — rps, худшие оконные p95/p99 и доля ошибок за стадию. Из
+``PREFIX_failures.csv`` — ошибки по типам; ``HTTP 0`` означает, что ответа не
+было вовсе (сервер недоступен или неверный ``--host``), а не ошибку модели.
+
+SLO проверяются для каждого запроса; у ``Aggregated`` рядом с построчными
+итогами — только доля ошибок: его перцентили смешивают запросы с разными SLO
+(``/predict/batch`` со своим переопределением поднимал бы общий p95 выше лимита
+``/predict``). Если есть только история, ``Aggregated`` проверяется целиком. ``--slo-*``
+переопределяют ``params.yaml``. Код выхода 1, если SLO не выполнены.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import pandas as pd
+
+from src.loadtest.config import LoadTestConfig, Slo, load_config
+
+AGGREGATED = "Aggregated"
+NO_RESPONSE_HINT = "no HTTP response: server unreachable, wrong --host or connection reset"
+
+
+def _num(value: Any) -> Optional[float]:
+    v = pd.to_numeric(value, errors="coerce")
+    return None if pd.isna(v) else float(v)
+
+
+def _request_name(row: Mapping[str, Any]) -> str:
+    name = row.get("Name")
+    return AGGREGATED if name == AGGREGATED else f"{row.get('Type', '')} {name}".strip()
+
+
+def read_stats(path: Path) -> Dict[str, Dict[str, Any]]:
+    """Итог по каждому запросу из ``*_stats.csv``."""
+    out = {}
+    for row in pd.read_csv(path).to_dict("records"):
+        requests = int(row["Request Count"])
+        failures = int(row["Failure Count"])
+        out[_request_name(row)] = {
+            "requests": requests,
+            "failures": failures,
+            "error_rate": round(failures / requests, 6) if requests else 0.0,
+            "rps": _num(row.get("Requests/s")),
+            "avg_ms": _num(row.get("Average Response Time")),
+            "p50_ms": _num(row.get("50%")),
+            "p95_ms": _num(row.get("95%")),
+            "p99_ms": _num(row.get("99%")),
+            "max_ms": _num(row.get("Max Response Time")),
+        }
+    return out
+
+
+def read_history(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df = df[df["Name"] == AGGREGATED].copy()
+    for c in (
+        "Requests/s",
+        "Failures/s",
+        "95%",
+        "99%",
+        "Total Request Count",
+        "Total Failure Count",
+    ):
+        df[c] = pd.to_numeric(df[c], errors="coerce")
+    return df.sort_values("Timestamp").reset_index(drop=True)
+
+
+def history_stages(history: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Подряд идущие строки с одинаковым числом пользователей — одна стадия."""
+    if history.empty:
+        return []
+    stage_id = (history["User Count"] != history["User Count"].shift()).cumsum()
+    stages = []
+    prev_requests = prev_failures = 0.0
+    for _, g in history.groupby(stage_id, sort=True):
+        requests = float(g["Total Request Count"].iloc[-1]) - prev_requests
+        failures = float(g["Total Failure Count"].iloc[-1]) - prev_failures
+        prev_requests += requests
+        prev_failures += failures
+        seconds = int(g["Timestamp"].iloc[-1] - g["Timestamp"].iloc[0]) + 1
+        stages.append(
+            {
+                "users": int(g["User Count"].iloc[0]),
+                "start": int(g["Timestamp"].iloc[0]),
+                "seconds": seconds,
+                "requests": int(requests),
+                "failures": int(failures),
+                "error_rate": round(failures / requests, 6) if requests else 0.0,
+                # Оконный Requests/s у locust первые секунды равен 0 — rps по приросту счётчика
+                "rps": round(requests / seconds, 2),
+                "p95_ms_max": _num(g["95%"].max()),
+                "p99_ms_max": _num(g["99%"].max()),
+            }
+        )
+    return stages
+
+
+def read_failures(path: Path) -> List[Dict[str, Any]]:
+    out = []
+    for row in pd.read_csv(path).to_dict("records"):
+        item = {
+            "method": row["Method"],
+            "name": row["Name"],
+            "error": row["Error"],
+            "occurrences": int(row["Occurrences"]),
+        }
+        if "HTTP 0" in str(row["Error"]):
+            item["hint"] = NO_RESPONSE_HINT
+        out.append(item)
+    return out
+
+
+def evaluate_slo(requests: Mapping[str, Mapping[str, Any]], cfg: LoadTestConfig) -> Dict[str, Any]:
+    """Проверка p95/p99/доли ошибок по каждому запросу (у ``Aggregated`` при наличии
+    построчных итогов — только доли ошибок); запрос без трафика — провал."""
+    checks = []
+    per_request = any(name != AGGREGATED for name in requests)
+    for name, m in requests.items():
+        path = name.split(" ", 1)[-1]
+        slo: Slo = cfg.slo_for(path)
+        limits = {"p95_ms": slo.p95_ms, "p99_ms": slo.p99_ms, "error_rate": slo.error_rate}
+        if name == AGGREGATED and per_request:
+            limits = {"error_rate": slo.error_rate}
+        for metric, limit in limits.items():
+            value = m.get(metric)
+            passed = bool(m.get("requests")) and value is not None and value <= limit
+            checks.append(
+                {"name": name, "metric": metric, "value": value, "limit": limit, "passed": passed}
+            )
+    return {"passed": bool(checks) and all(c["passed"] for c in checks), "checks": checks}
+
+
+def summarize(prefix: str, cfg: LoadTestConfig) -> Dict[str, Any]:
+    """Сводка по файлам ``PREFIX_stats.csv``, ``_stats_history.csv``, ``_failures.csv``."""
+    files = {kind: Path(f"{prefix}_{kind}.csv") for kind in ("stats", "stats_history", "failures")}
+    summary: Dict[str, Any] = {"source": prefix}
+
+    history = read_history(files["stats_history"]) if files["stats_history"].exists() else None
+    if history is not None and not history.empty:
+        last = history.iloc[-1]
+        summary["duration_s"] = int(history["Timestamp"].iloc[-1] - history["Timestamp"].iloc[0])
+        summary["peak_users"] = int(history["User Count"].max())
+        summary["stages"] = history_stages(history)
+
+    if files["stats"].exists():
+        requests = read_stats(files["stats"])
+    elif history is not None and not history.empty:
+        # Без *_stats.csv итог берётся из последней строки истории (перцентили — худшие оконные)
+        total, failed = int(last["Total Request Count"]), int(last["Total Failure Count"])
+        requests = {
+            AGGREGATED: {
+                "requests": total,
+                "failures": failed,
+                "error_rate": round(failed / total, 6) if total else 0.0,
+                "rps": round(total / max(summary["duration_s"], 1), 2),
+                "p95_ms": _num(history["95%"].max()),
+                "p99_ms": _num(history["99%"].max()),
+            }
+        }
+    else:
+        raise FileNotFoundError(f"No {files['stats']} or {files['stats_history']}")
+    summary["requests"] = requests
+    summary["failures"] = read_failures(files["failures"]) if files["failures"].exists() else []
+    summary["slo"] = evaluate_slo(requests, cfg)
+    return summary
+
+
+def describe(summary: Dict[str, Any]) -> str:
+    lines = [f"{summary['source']}: SLO {'PASS' if summary['slo']['passed'] else 'FAIL'}"]
+    for name, m in summary["requests"].items():
+        lines.append(
+            f"  {name:<24} requests={m['requests']:<7} errors={m['error_rate']:.2%} "
+            f"p95={m['p95_ms']} ms p99={m['p99_ms']} ms"
+        )
+    for c in summary["slo"]["checks"]:
+        if not c["passed"]:
+            lines.append(f"  FAIL {c['name']} {c['metric']}={c['value']} > {c['limit']}")
+    for f in summary["failures"]:
+        hint = f" ({f['hint']})" if "hint" in f else ""
+        lines.append(f"  {f['occurrences']} x {f['method']} {f['name']}: {f['error']}{hint}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Сводка locust CSV и проверка SLO")
+    parser.add_argument("--prefix", required=True, help="префикс locust --csv (например cpu_run)")
+    parser.add_argument("--params-path", default="params.yaml")
+    parser.add_argument("--slo-p95-ms", type=float, default=None)
+    parser.add_argument("--slo-p99-ms", type=float, default=None)
+    parser.add_argument("--slo-error-rate", type=float, default=None)
+    parser.add_argument(
+        "--out-path", default=None, help="по умолчанию reports/loadtest_<prefix>.json"
+    )
+    args = parser.parse_args()
+
+    cfg = load_config(Path(args.params_path))
+    for attr, value in (
+        ("p95_ms", args.slo_p95_ms),
+        ("p99_ms", args.slo_p99_ms),
+        ("error_rate", args.slo_error_rate),
+    ):
+        if value is not None:
+            setattr(cfg.slo, attr, value)
+
+    summary = summarize(args.prefix, cfg)
+    out = Path(args.out_path or f"reports/loadtest_{Path(args.prefix).name}.json")
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(describe(summary))
+    print(f"Saved: {out}")
+    raise SystemExit(0 if summary["slo"]["passed"] else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,342 @@
+"""Единый бенчмарк инференса: бэкенды × размеры батча × потоки, JSON и сравнение с базой.
+
+Бэкенд задаётся как ``имя=[вид:]путь``; вид по умолчанию — по расширению:
+
+- ``sklearn`` — Pipeline из joblib (``predict_proba``);
+- ``onnx`` — ``.onnx``/``.ort`` через ``OnnxModel`` (fp32, INT8, оптимизированный);
+- ``bundle`` — ``.bundle`` (ORT-модель из бандла);
+- ``numpy`` — MLP из joblib на NumPy (``src.inference.numpy_mlp``).
+
+Время меряется от DataFrame до вероятностей (сборка входов включена — как в
+API и пакетном скоринге); батчи нарезаются заранее со случайных смещений.
+На каждую точку: p50/p95/p99/среднее, rows/s. Каждый бэкенд по умолчанию
+идёт в отдельном процессе (spawn): пиковый RSS (``ru_maxrss``) и прирост RSS
+от загрузки модели относятся только к нему.
+
+``compare`` сравнивает результаты с базовым JSON: регрессия — рост задержки
+или падение rows/s больше ``--tolerance`` (доля) и больше ``--min-delta-ms``
+по абсолютной величине (шум на микросекундных задержках не в счёт).
+"""
+
+import argparse
+import json
+import multiprocessing
+import platform
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from src.models.latency import measure_latency, peak_rss_mb
+
+KINDS = ("sklearn", "onnx", "bundle", "numpy")
+SUFFIX_KINDS = {".joblib": "sklearn", ".onnx": "onnx", ".ort": "onnx", ".bundle": "bundle"}
+LATENCY_METRICS = ("p50_ms", "p95_ms", "p99_ms")
+DEFAULT_BACKENDS = (
+    "sklearn=models/nn_model.joblib",
+    "numpy=numpy:models/nn_model.joblib",
+    "onnx_fp32=models/nn_model.onnx",
+    "onnx_ort=models/nn_model.ort",
+    "onnx_int8=models/nn_model_int8.onnx",
+    "bundle=models/nn_model.bundle",
+)
+
+
+def parse_backend(spec: str) -> Dict[str, str]:
+    """``имя=[вид:]путь`` -> {name, kind, path}."""
+    name, sep, rest = spec.partition("=")
+    if not sep:
+        name, rest = Path(spec).stem, spec
+    kind, sep, path = rest.partition(":")
+    if not sep or kind not in KINDS:
+        kind, path = SUFFIX_KINDS.get(Path(rest).suffix, ""), rest
+    if kind not in KINDS:
+        raise ValueError(f"Cannot infer backend kind for {spec!r}; use name=kind:path")
+    return {"name": name, "kind": kind, "path": path}
+
+
+def load_backend(kind: str, path: Path, threads: int) -> Callable[[pd.DataFrame], np.ndarray]:
+    if kind == "sklearn":
+        import joblib
+
+        pipe = joblib.load(path)
+        n_jobs = {k: 1 for k in pipe.get_params() if k.endswith("n_jobs")}
+        pipe.set_params(**n_jobs)
+        return lambda df: pipe.predict_proba(df)[:, 1]
+    if kind == "numpy":
+        from src.inference.numpy_mlp import NumpyMLP
+
+        return NumpyMLP.load(path).predict_proba_frame
+    if kind == "bundle":
+        from src.inference.bundle import ModelBundle
+
+        return ModelBundle.open(path).onnx_model(threads=threads).predict_proba_frame
+    from src.inference.model import OnnxModel
+
+    return OnnxModel(path, threads=threads).predict_proba_frame
+
+
+def bench_backend(
+    backend: Dict[str, str],
+    X: pd.DataFrame,
+    batch_sizes: Sequence[int],
+    threads: Sequence[int],
+    repeats: int,
+    warmup: int,
+    seed: int = 0,
+) -> List[Dict[str, Any]]:
+    """Все точки (threads × batch) одного бэкенда; модель грузится заново на каждое threads.
+
+    Замер — ``measure_latency`` с одним ``seed``: при любом числе потоков
+    бэкенд получает одни и те же батчи.
+    """
+    rss_before = peak_rss_mb()
+    rows = []
+    for t in threads:
+        with threadpool_limits(limits=t):
+            t0 = time.perf_counter()
+            score = load_backend(backend["kind"], Path(backend["path"]), t)
+            load_ms = (time.perf_counter() - t0) * 1000.0
+            stats = measure_latency(score, X, batch_sizes, repeats, warmup, seed)
+        for bs in batch_sizes:
+            rows.append(
+                {
+                    **backend,
+                    "threads": t,
+                    "batch_size": bs,
+                    "load_ms": round(load_ms, 3),
+                    **stats[int(bs)],
+                }
+            )
+        del score
+    peak = peak_rss_mb()
+    for row in rows:
+        row["peak_rss_mb"] = peak
+        row["model_rss_mb"] = (
+            round(peak - rss_before, 1) if peak is not None and rss_before is not None else None
+        )
+    return rows
+
+
+def run_suite(
+    backends: Sequence[Dict[str, str]],
+    X: pd.DataFrame,
+    batch_sizes: Sequence[int],
+    threads: Sequence[int],
+    repeats: int,
+    warmup: int,
+    isolate: bool = True,
+) -> Dict[str, Any]:
+    results: List[Dict[str, Any]] = []
+    skipped = []
+    for backend in backends:
+        if not Path(backend["path"]).exists():
+            skipped.append({**backend, "reason": "missing"})
+            continue
+        args = (backend, X, batch_sizes, threads, repeats, warmup)
+        if isolate:
+            ctx = multiprocessing.get_context("spawn")
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                results.extend(pool.submit(bench_backend, *args).result())
+        else:
+            results.extend(bench_backend(*args))
+        print(f"{backend['name']}: done")
+    return {"meta": environment(len(X)), "results": results, "skipped": skipped}
+
+
+def environment(rows: int) -> Dict[str, Any]:
+    import onnxruntime
+    import sklearn
+
+    return {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "cpu_count": multiprocessing.cpu_count(),
+        "onnxruntime": onnxruntime.__version__,
+        "sklearn": sklearn.__version__,
+        "data_rows": rows,
+    }
+
+
+def _key(row: Dict[str, Any]) -> tuple:
+    return row["name"], int(row["threads"]), int(row["batch_size"])
+
+
+def compare(
+    current: Dict[str, Any],
+    baseline: Dict[str, Any],
+    tolerance: float = 0.1,
+    min_delta_ms: float = 0.02,
+    metrics: Sequence[str] = ("p50_ms", "p95_ms", "rows_per_s"),
+) -> Dict[str, Any]:
+    """Регрессии текущего прогона относительно базового по совпадающим точкам."""
+    base = {_key(r): r for r in baseline["results"]}
+    regressions, checked = [], 0
+    for row in current["results"]:
+        ref = base.get(_key(row))
+        if ref is None:
+            continue
+        checked += 1
+        for metric in metrics:
+            old, new = ref.get(metric), row.get(metric)
+            if old is None or new is None or old <= 0:
+                continue
+            if metric in LATENCY_METRICS or metric == "mean_ms":
+                change = (new - old) / old
+                worse = change > tolerance and new - old > min_delta_ms
+            else:
+                change = (old - new) / old
+                worse = change > tolerance
+            if worse:
+                regressions.append(
+                    {
+                        "backend": row["name"],
+                        "threads": row["threads"],
+                        "batch_size": row["batch_size"],
+                        "metric": metric,
+                        "baseline": old,
+                        "current": new,
+                        "change": round(change, 4),
+                    }
+                )
+    return {
+        "tolerance": tolerance,
+        "min_delta_ms": min_delta_ms,
+        "points_compared": checked,
+        "regressions": regressions,
+    }
+
+
+def describe(report: Dict[str, Any]) -> str:
+    lines = [
+        f"{'backend':<12} {'thr':>3} {'batch':>6} {'p50 ms':>9} {'p95 ms':>9} "
+        f"{'p99 ms':>9} {'rows/s':>11} {'RSS MB':>7}"
+    ]
+    for r in report["results"]:
+        lines.append(
+            f"{r['name']:<12} {r['threads']:>3} {r['batch_size']:>6} {r['p50_ms']:>9.3f} "
+            f"{r['p95_ms']:>9.3f} {r['p99_ms']:>9.3f} {r['rows_per_s']:>11,.0f} "
+            f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '-':>7}"
+        )
+    for s in report.get("skipped", []):
+        lines.append(f"{s['name']}: skipped ({s['reason']}: {s['path']})")
+    return "\n".join(lines)
+
+
+def describe_comparison(cmp: Dict[str, Any]) -> str:
+    if not cmp["regressions"]:
+        return f"No regressions ({cmp['points_compared']} points, tolerance {cmp['tolerance']:.0%})"
+    lines = [f"{len(cmp['regressions'])} regression(s) (tolerance {cmp['tolerance']:.0%}):"]
+    for r in cmp["regressions"]:
+        lines.append(
+            f"  {r['backend']} threads={r['threads']} batch={r['batch_size']} {r['metric']}: "
+            f"{r['baseline']} -> {r['current']} ({r['change']:+.1%})"
+        )
+    return "\n".join(lines)
+
+
+def _ints(s: str) -> List[int]:
+    return [int(v) for v in s.split(",") if v]
+
+
+def load_frame(data_path: Path, rows: int, seed: int = 0) -> pd.DataFrame:
+    """Признаки как при обучении MLP (категории — строки, числа — float32)."""
+    from src.data.columnar import read_dataset
+    from src.models.train_nn_onnx import prepare_xy
+
+    X, _, _, _ = prepare_xy(read_dataset(data_path))
+    return X.sample(n=min(rows, len(X)), random_state=seed).reset_index(drop=True)
+
+
+def add_compare_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--tolerance", type=float, default=0.1, help="допустимое ухудшение, доля")
+    p.add_argument("--min-delta-ms", type=float, default=0.02)
+    p.add_argument("--metrics", default="p50_ms,p95_ms,rows_per_s")
+
+
+def add_run_args(p: argparse.ArgumentParser) -> None:
+    p.add_argument("--data-path", default="data/processed/credit.feather")
+    p.add_argument("--rows", type=int, default=5000, help="строк, из которых режутся батчи")
+    p.add_argument(
+        "--backends",
+        default=",".join(DEFAULT_BACKENDS),
+        help="имя=[sklearn|onnx|bundle|numpy:]путь через запятую; отсутствующие пропускаются",
+    )
+    p.add_argument("--batch-sizes", default="1,64,1024")
+    p.add_argument("--threads", default="1", help="число потоков, через запятую (свип)")
+    p.add_argument("--repeats", type=int, default=200)
+    p.add_argument("--warmup", type=int, default=20)
+    p.add_argument(
+        "--no-isolate", action="store_true", help="все бэкенды в текущем процессе (RSS общий)"
+    )
+    p.add_argument("--out-path", default="reports/benchmark.json")
+    p.add_argument("--baseline", default=None, help="сравнить с базовым JSON после прогона")
+
+
+def run_from_args(args) -> Dict[str, Any]:
+    backends = [parse_backend(s) for s in args.backends.split(",") if s]
+    X = load_frame(Path(args.data_path), args.rows)
+    report = run_suite(
+        backends,
+        X,
+        _ints(args.batch_sizes),
+        _ints(args.threads),
+        args.repeats,
+        args.warmup,
+        isolate=not args.no_isolate,
+    )
+    report["config"] = {
+        "batch_sizes": _ints(args.batch_sizes),
+        "threads": _ints(args.threads),
+        "repeats": args.repeats,
+        "warmup": args.warmup,
+    }
+    out = Path(args.out_path)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(describe(report))
+    print(f"Saved: {out}")
+    return report
+
+
+def finish_compare(report: Dict[str, Any], baseline_path: Path, args) -> int:
+    cmp = compare(
+        report,
+        json.loads(Path(baseline_path).read_text(encoding="utf-8")),
+        tolerance=args.tolerance,
+        min_delta_ms=args.min_delta_ms,
+        metrics=[m for m in args.metrics.split(",") if m],
+    )
+    print(describe_comparison(cmp))
+    return 1 if cmp["regressions"] else 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бенчмарк инференса и сравнение с базой")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_run = sub.add_parser("run", help="Прогнать свип и записать JSON")
+    add_run_args(p_run)
+    add_compare_args(p_run)
+    p_cmp = sub.add_parser("compare", help="Сравнить два готовых JSON")
+    p_cmp.add_argument("--current", required=True)
+    p_cmp.add_argument("--baseline", required=True)
+    add_compare_args(p_cmp)
+    args = parser.parse_args()
+
+    if args.cmd == "compare":
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+        raise SystemExit(finish_compare(current, Path(args.baseline), args))
+    report = run_from_args(args)
+    if args.baseline:
+        raise SystemExit(finish_compare(report, Path(args.baseline), args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Сборка бандла модели (``src.inference.bundle``) из обученных артефактов.
+
+Берёт ONNX/ORT-модель, sklearn Pipeline (для NumPy-бэкенда MLP, если он
+извлекается) и метаданные обучения ``*.meta.json``. Перед записью NumPy-бэкенд
+сверяется с ORT на пробных строках; после записи бандл открывается заново,
+проверяются контрольные суммы и сравнивается время загрузки с joblib.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+
+from src.inference.bundle import ModelBundle, write_bundle
+from src.inference.model import OnnxModel
+from src.inference.numpy_mlp import NumpyMLP
+from src.models.train_nn_onnx import read_meta
+
+PARITY_ATOL = 1e-4
+
+
+def _ms(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1e3
+
+
+def build(
+    model_path: Path,
+    out_path: Path,
+    joblib_path: Optional[Path] = None,
+    threshold: float = 0.5,
+) -> Dict[str, Any]:
+    model_path = Path(model_path)
+    onnx_model = OnnxModel(model_path)
+    inputs = [{"name": i.name, "type": i.type} for i in onnx_model.session.get_inputs()]
+
+    mlp: Optional[NumpyMLP] = None
+    training: Dict[str, Any] = {}
+    if joblib_path is not None and Path(joblib_path).exists():
+        training = read_meta(Path(joblib_path))
+        try:
+            mlp = NumpyMLP.from_pipeline(joblib.load(joblib_path))
+        except (ValueError, AttributeError, KeyError) as e:
+            print(f"No NumPy backend in bundle: {e}")
+    if mlp is not None:
+        probe = mlp.probe_columns(256)
+        diff = float(
+            np.max(
+                np.abs(mlp.predict_proba_columns(probe) - onnx_model.predict_proba_columns(probe))
+            )
+        )
+        if not diff <= PARITY_ATOL:
+            raise ValueError(f"NumPy backend differs from {model_path}: max |diff| = {diff:.2e}")
+
+    write_bundle(
+        out_path,
+        model_path.read_bytes(),
+        model_path.suffix.lstrip("."),
+        inputs,
+        mlp=mlp,
+        threshold=threshold,
+        training=training,
+    )
+    bundle = ModelBundle.open(out_path)
+    bundle.verify()
+
+    report: Dict[str, Any] = {**bundle.describe(), "load_ms": {}}
+    report["load_ms"]["bundle_open"] = _ms(lambda: ModelBundle.open(out_path).numpy_model())
+    report["load_ms"]["bundle_onnx"] = _ms(lambda: ModelBundle.open(out_path).onnx_model())
+    report["load_ms"]["onnx_file"] = _ms(lambda: OnnxModel(model_path))
+    if joblib_path is not None and Path(joblib_path).exists():
+        report["load_ms"]["joblib"] = _ms(lambda: joblib.load(joblib_path))
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Бандл модели: манифест + секции для mmap")
+    parser.add_argument("--model-path", default="models/nn_model.ort")
+    parser.add_argument(
+        "--joblib-path",
+        default="models/nn_model.joblib",
+        help="sklearn Pipeline для NumPy-бэкенда и *.meta.json рядом с ним",
+    )
+    parser.add_argument("--threshold", type=float, default=0.5)
+    parser.add_argument("--out-path", default="models/nn_model.bundle")
+    parser.add_argument("--report-path", default="reports/bundle.json")
+    args = parser.parse_args()
+
+    model_path = Path(args.model_path)
+    if not model_path.exists() and model_path.suffix == ".ort":
+        model_path = model_path.with_suffix(".onnx")
+    report = build(model_path, Path(args.out_path), Path(args.joblib_path), args.threshold)
+
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Bundle: {report['path']} ({report['size_bytes'] / 1024:.1f} KB)")
+    print(f"Model:  {report['model_format']} sha256={report['model_sha256'][:12]}")
+    print(f"NumPy backend: {report['numpy_mlp']}")
+    for name, ms in report["load_ms"].items():
+        print(f"Load {name}: {ms:.2f} ms")
+    print(f"Saved report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,336 @@
+"""Дистилляция ``models/model.joblib`` в компактную модель под бюджет задержки.
+
+Учитель — выбранный ``train.py`` пайплайн (часто тяжёлый ансамбль). Ученик —
+``StudentMLP``: MLP-регрессия на логиты вероятностей учителя (сопоставление
+логитов — предел дистилляции при высокой температуре), ``predict_proba`` —
+сигмоида выхода; размер ``0`` — без скрытых слоёв, т.е. логистическая модель.
+Мягкие метки учитель ставит на train-части и на синтетических строках
+(гауссова копула ``src.data.synthetic``, обученная только на train), так что
+ученик видит больше точек, чем исходных меток.
+
+Размеры из ``--sizes`` перебираются все: каждый ученик экспортируется в ONNX
+(препроцессор — как у ``train.py``, конвертер ученика — свой: Gemm/Relu +
+сигмоида), задержка меряется через ORT в одном потоке. Побеждает лучший
+ROC-AUC на реальных тестовых метках среди уложившихся в p95
+``--latency-target-ms`` на батче ``--target-batch-size``; если не уложился
+никто — самый быстрый. Отчёт: AUC учителя и ученика (разрыв), близость к
+учителю, задержка и ускорение относительно учителя в sklearn и в ORT (если
+есть ``--teacher-onnx-path``).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+from scipy.special import expit, logit
+from sklearn.base import BaseEstimator, ClassifierMixin
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+from sklearn.neural_network import MLPRegressor
+from sklearn.pipeline import Pipeline
+from skl2onnx import update_registered_converter
+from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+from onnx import TensorProto
+from threadpoolctl import threadpool_limits
+
+from src.data.columnar import read_dataset
+from src.data.synthetic import fit_synthetic, generate_chunks
+from src.inference.model import OnnxModel
+from src.models.latency import measure_latency, ort_latency
+from src.models.onnx_export import binary_classifier_outputs, export_pipeline
+from src.models.pipeline import Schema, build_preprocessor, get_feature_lists, split_xy
+from src.models.selection import benchmark_latency
+
+# Вероятности учителя обрезаются перед логитом: листья деревьев дают ровно 0 и 1
+TEACHER_CLIP = 1e-4
+
+
+def parse_sizes(spec: str) -> List[Tuple[int, ...]]:
+    """``"0,16,32x16"`` -> ``[(), (16,), (32, 16)]``."""
+    sizes = []
+    for item in spec.split(","):
+        item = item.strip()
+        if item:
+            sizes.append(() if item == "0" else tuple(int(u) for u in item.split("x")))
+    return sizes
+
+
+def size_name(hidden: Sequence[int]) -> str:
+    return "x".join(str(u) for u in hidden) or "logistic"
+
+
+class StudentMLP(ClassifierMixin, BaseEstimator):
+    """Бинарный классификатор, обученный на вероятностях учителя (``fit(X, p)``)."""
+
+    def __init__(
+        self,
+        hidden_layer_sizes: Tuple[int, ...] = (16,),
+        alpha: float = 1e-4,
+        max_iter: int = 100,
+        random_state: int = 42,
+    ):
+        self.hidden_layer_sizes = hidden_layer_sizes
+        self.alpha = alpha
+        self.max_iter = max_iter
+        self.random_state = random_state
+
+    def fit(self, X, p_teacher):
+        z = logit(np.clip(np.asarray(p_teacher, dtype=np.float64), TEACHER_CLIP, 1 - TEACHER_CLIP))
+        self.mlp_ = MLPRegressor(
+            hidden_layer_sizes=tuple(self.hidden_layer_sizes),
+            activation="relu",
+            alpha=self.alpha,
+            max_iter=self.max_iter,
+            early_stopping=True,
+            random_state=self.random_state,
+        ).fit(X, z)
+        self.classes_ = np.array([0, 1])
+        return self
+
+    @property
+    def n_params(self) -> int:
+        return int(sum(w.size + b.size for w, b in zip(self.mlp_.coefs_, self.mlp_.intercepts_)))
+
+    def decision_function(self, X) -> np.ndarray:
+        return self.mlp_.predict(X)
+
+    def predict_proba(self, X) -> np.ndarray:
+        p1 = expit(self.decision_function(X))
+        return np.column_stack([1.0 - p1, p1])
+
+    def predict(self, X) -> np.ndarray:
+        return (self.decision_function(X) >= 0).astype(int)
+
+
+def _convert_student(scope, operator, container) -> None:
+    mlp = operator.raw_operator.mlp_
+    x = operator.inputs[0].full_name
+    if operator.inputs[0].type.__class__.__name__ != "FloatTensorType":
+        cast = scope.get_unique_variable_name("student_input")
+        container.add_node("Cast", x, cast, to=TensorProto.FLOAT, op_version=13)
+        x = cast
+    n_layers = len(mlp.coefs_)
+    for i, (w, b) in enumerate(zip(mlp.coefs_, mlp.intercepts_)):
+        w_name = scope.get_unique_variable_name(f"student_w{i}")
+        container.add_initializer(
+            w_name, TensorProto.FLOAT, list(w.shape), w.astype(np.float32).ravel().tolist()
+        )
+        b_name = scope.get_unique_variable_name(f"student_b{i}")
+        container.add_initializer(
+            b_name, TensorProto.FLOAT, [b.size], b.astype(np.float32).tolist()
+        )
+        out = scope.get_unique_variable_name(f"student_layer{i}")
+        container.add_node("Gemm", [x, w_name, b_name], out, op_version=13)
+        if i < n_layers - 1:
+            relu = scope.get_unique_variable_name(f"student_relu{i}")
+            container.add_node("Relu", out, relu, op_version=14)
+            out = relu
+        x = out
+    binary_classifier_outputs(scope, operator, container, x, operator.raw_operator.classes_)
+
+
+def register_onnx_converter() -> None:
+    update_registered_converter(
+        StudentMLP,
+        "DistilledStudentMLP",
+        calculate_linear_classifier_output_shapes,
+        _convert_student,
+        options={"zipmap": [True, False, "columns"], "nocl": [True, False]},
+        overwrite=True,
+    )
+
+
+def transfer_set(
+    df_train: pd.DataFrame, X_train: pd.DataFrame, synthetic_rows: int, seed: int
+) -> pd.DataFrame:
+    """Train-часть + синтетика в тех же колонках и dtype (метки не нужны)."""
+    if synthetic_rows <= 0:
+        return X_train
+    generator = fit_synthetic(df_train)
+    synth = pd.concat(generate_chunks(generator, synthetic_rows, seed=seed), ignore_index=True)
+    synth = synth[list(X_train.columns)].astype(X_train.dtypes.to_dict())
+    return pd.concat([X_train, synth], ignore_index=True)
+
+
+def select_student(
+    candidates: List[Dict[str, Any]], target_ms: float, batch_size: int
+) -> Tuple[Dict[str, Any], bool]:
+    """Лучший AUC среди уложившихся в p95, при равенстве — меньший; иначе самый быстрый."""
+    p95 = [c["latency_onnx"][batch_size]["p95_ms"] for c in candidates]
+    ok = [c for c, ms in zip(candidates, p95) if ms <= target_ms]
+    if ok:
+        return max(ok, key=lambda c: (c["roc_auc"], -c["n_params"])), True
+    return candidates[int(np.argmin(p95))], False
+
+
+def _speedup(slow: Dict[int, Dict[str, float]], fast: Dict[int, Dict[str, float]]):
+    return {b: round(slow[b]["p50_ms"] / max(fast[b]["p50_ms"], 1e-9), 2) for b in slow}
+
+
+def run(args) -> Dict[str, Any]:
+    with open(args.params_path, "r", encoding="utf-8") as f:
+        train_params = (yaml.safe_load(f) or {}).get("train", {})
+    random_state = int(train_params.get("random_state", 42))
+    schema = Schema()
+    df = read_dataset(Path(args.data_path))
+    X, y = split_xy(df, schema)
+    cat_cols, num_cols = get_feature_lists(X, schema)
+    X_train, X_test, _, y_test = train_test_split(
+        X,
+        y,
+        test_size=float(train_params.get("test_size", 0.2)),
+        random_state=random_state,
+        stratify=y,
+    )
+
+    teacher = joblib.load(Path(args.teacher_path))
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    if args.target_batch_size not in batch_sizes:
+        batch_sizes.append(args.target_batch_size)
+    p_teacher_test = teacher.predict_proba(X_test)[:, 1]
+    teacher_auc = float(roc_auc_score(y_test, p_teacher_test))
+
+    X_transfer = transfer_set(df.loc[X_train.index], X_train, args.synthetic_rows, random_state)
+    p_transfer = teacher.predict_proba(X_transfer)[:, 1]
+    prep = build_preprocessor(cat_cols, num_cols).fit(X_train)
+    Xt = prep.transform(X_transfer)
+
+    register_onnx_converter()
+    candidates: List[Dict[str, Any]] = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for hidden in parse_sizes(args.sizes):
+            name = size_name(hidden)
+            student = StudentMLP(hidden, args.alpha, args.max_iter, random_state).fit(
+                Xt, p_transfer
+            )
+            pipe = Pipeline([("prep", prep), ("model", student)])
+            onnx_path = Path(tmp) / f"student_{name}.onnx"
+            exported = export_pipeline(pipe, X_test, cat_cols, onnx_path)
+            p_student = pipe.predict_proba(X_test)[:, 1]
+            with threadpool_limits(limits=1):
+                lat = ort_latency(
+                    OnnxModel(onnx_path, threads=1), X_test, batch_sizes, args.repeats
+                )
+            entry = {
+                "name": name,
+                "hidden_layer_sizes": list(hidden),
+                "n_params": student.n_params,
+                "n_iter": int(student.mlp_.n_iter_),
+                "roc_auc": round(float(roc_auc_score(y_test, p_student)), 5),
+                "fidelity_mean_abs_diff": round(
+                    float(np.abs(p_student - p_teacher_test).mean()), 5
+                ),
+                "size_bytes": exported["size_bytes"],
+                "onnx_max_abs_diff": exported["parity"]["max_abs_diff"],
+                "latency_onnx": lat,
+                "_path": onnx_path,
+                "_pipe": pipe,
+            }
+            candidates.append(entry)
+            p95 = lat[args.target_batch_size]["p95_ms"]
+            print(
+                f"  {name:>10}: auc={entry['roc_auc']:.4f} params={entry['n_params']} "
+                f"b{args.target_batch_size} p95={p95:.3f}ms"
+            )
+
+        best, target_met = select_student(
+            candidates, args.latency_target_ms, args.target_batch_size
+        )
+        out_path = Path(args.onnx_path)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copyfile(best["_path"], out_path)
+
+    with threadpool_limits(limits=1):
+        student = OnnxModel(out_path, threads=1)
+        student_frame = measure_latency(
+            student.predict_proba_frame, X_test, batch_sizes, args.repeats
+        )
+    teacher_sklearn = benchmark_latency(teacher, X_test, batch_sizes, args.repeats, warmup=5)
+    report: Dict[str, Any] = {
+        "teacher": {
+            "path": str(args.teacher_path),
+            "model": type(teacher.steps[-1][1]).__name__,
+            "roc_auc": round(teacher_auc, 5),
+            "latency_sklearn": teacher_sklearn,
+        },
+        "transfer_rows": {"train": int(len(X_train)), "synthetic": int(args.synthetic_rows)},
+        "target": {"batch_size": args.target_batch_size, "p95_ms": args.latency_target_ms},
+        "candidates": [{k: v for k, v in c.items() if not k.startswith("_")} for c in candidates],
+        "selected": best["name"],
+        "target_met": target_met,
+        "student": {
+            "path": str(out_path),
+            "roc_auc": best["roc_auc"],
+            "auc_gap": round(teacher_auc - best["roc_auc"], 5),
+            "latency_onnx": best["latency_onnx"],
+            "latency_frame": student_frame,
+        },
+        # sklearn-учитель от DataFrame против ученика в ORT от DataFrame
+        "speedup_p50_vs_sklearn": _speedup(teacher_sklearn, student_frame),
+    }
+    teacher_onnx = Path(args.teacher_onnx_path)
+    if teacher_onnx.exists():
+        with threadpool_limits(limits=1):
+            teacher_ort = ort_latency(
+                OnnxModel(teacher_onnx, threads=1), X_test, batch_sizes, args.repeats
+            )
+        report["teacher"]["latency_onnx"] = teacher_ort
+        report["speedup_p50_vs_onnx"] = _speedup(teacher_ort, best["latency_onnx"])
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Дистилляция models/model.joblib в компактный MLP / логистическую модель"
+    )
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--params-path", default="params.yaml")
+    parser.add_argument("--teacher-path", default="models/model.joblib")
+    parser.add_argument("--teacher-onnx-path", default="models/model.onnx")
+    parser.add_argument("--onnx-path", default="models/student.onnx")
+    parser.add_argument("--report-path", default="reports/distillation.json")
+    parser.add_argument("--synthetic-rows", type=int, default=100_000)
+    parser.add_argument(
+        "--sizes", default="0,8,16,32,16x8,32x16,64x32", help="скрытые слои (0 — логистическая)"
+    )
+    parser.add_argument("--alpha", type=float, default=1e-4)
+    parser.add_argument("--max-iter", type=int, default=100)
+    parser.add_argument("--latency-target-ms", type=float, default=0.2)
+    parser.add_argument("--target-batch-size", type=int, default=64)
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    report = run(args)
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    student = report["student"]
+    print(
+        f"Teacher {report['teacher']['model']}: auc={report['teacher']['roc_auc']:.4f} | "
+        f"student {report['selected']}: auc={student['roc_auc']:.4f} "
+        f"(gap {student['auc_gap']:+.4f})"
+    )
+    for key in ("speedup_p50_vs_sklearn", "speedup_p50_vs_onnx"):
+        if key in report:
+            print(f"  {key}: " + " ".join(f"b{b} x{v:.1f}" for b, v in report[key].items()))
+    if not report["target_met"]:
+        print(
+            f"WARNING: no student meets p95 <= {args.latency_target_ms}ms at batch "
+            f"{args.target_batch_size}, took the fastest"
+        )
+    print(f"Saved: {student['path']}, {report_path}")
+
+
+if __name__ == "__main__":
+    main()
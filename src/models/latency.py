@@ -0,0 +1,86 @@
+"""Общие замеры инференса: задержка вызова по размерам батча и пиковый RSS.
+
+Ими пользуются выбор модели, экспорт, оптимизация и квантование ONNX,
+дистилляция, потоковое обучение и единый бенчмарк — окна, ключи и перцентили
+в отчётах везде одинаковые.
+
+Батчи нарезаются заранее со случайных смещений (``seed``) и копируются:
+pandas кэширует доступ к колонкам фрейма, и повторно использованные срезы
+давали бы заниженное время. Первые ``warmup`` вызовов не учитываются.
+``ort_latency`` замеряет ``OnnxModel.run``: входы ORT собираются заранее, вне замера.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from typing import Any, Callable, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def latency_stats(times_ms: Sequence[float], batch_size: int) -> Dict[str, float]:
+    """p50/p95/p99/среднее (мс на вызов) и rows/s."""
+    ms = np.asarray(times_ms, dtype=np.float64)
+    return {
+        "p50_ms": round(float(np.percentile(ms, 50)), 4),
+        "p95_ms": round(float(np.percentile(ms, 95)), 4),
+        "p99_ms": round(float(np.percentile(ms, 99)), 4),
+        "mean_ms": round(float(ms.mean()), 4),
+        "rows_per_s": round(batch_size * 1000.0 / float(ms.mean()), 1),
+    }
+
+
+def measure_latency(
+    score: Callable[[Any], Any],
+    X: pd.DataFrame,
+    batch_sizes: Sequence[int],
+    repeats: int,
+    warmup: int = 5,
+    seed: int = 42,
+    prepare: Optional[Callable[[pd.DataFrame], Any]] = None,
+) -> Dict[int, Dict[str, float]]:
+    """Задержка ``score(batch)`` по размерам батча.
+
+    ``prepare`` — преобразование батча вне замера (например, сборка входов ORT),
+    иначе ``score`` получает DataFrame.
+    """
+    rng = np.random.default_rng(seed)
+    out: Dict[int, Dict[str, float]] = {}
+    for bs in batch_sizes:
+        starts = rng.integers(0, max(1, len(X) - bs + 1), size=warmup + repeats)
+        batches = [X.iloc[s : s + bs].copy() for s in starts]
+        if prepare is not None:
+            batches = [prepare(b) for b in batches]
+        times = []
+        for i, batch in enumerate(batches):
+            t0 = time.perf_counter()
+            score(batch)
+            if i >= warmup:
+                times.append((time.perf_counter() - t0) * 1000.0)
+        out[int(bs)] = latency_stats(times, min(int(bs), len(X)))
+    return out
+
+
+def ort_latency(
+    model: Any, X: pd.DataFrame, batch_sizes: Sequence[int], repeats: int, seed: int = 0
+) -> Dict[int, Dict[str, float]]:
+    """Задержка ``OnnxModel.run``: входы ORT собираются ``InputBuilder`` заранее, вне замера."""
+    return measure_latency(
+        model.run, X, batch_sizes, repeats, seed=seed, prepare=model.inputs.from_frame
+    )
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Пиковый RSS процесса (МБ) или None, если платформа не даёт его без psutil."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux отдаёт КБ, macOS — байты
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
@@ -0,0 +1,560 @@
+"""ONNX-экспорт выбранного ``train.py`` пайплайна и сравнение sklearn / ORT.
+
+Пайплайн ``build_preprocessor`` + модель конвертируется skl2onnx целиком
+(logreg, RF, GB, SVC — штатные конвертеры, HGB — свой, см. ниже). Входы — по
+одному ``[N, 1]`` на признак (``onnx_input_types``), вероятности — тензор без
+ZipMap.
+
+Категориальная ветка (``SimpleImputer(most_frequent)`` + ``OneHotEncoder``)
+штатно не конвертируется: skl2onnx склеивает её входы в один тензор, а целые
+категории и строковый ``AGE_BIN`` в один тип не сводятся; строковый импьютер
+к тому же не умеет пропуск ``NaN``. На время конвертации ветка заменяется
+``ImputedOneHotEncoder`` со своим конвертером: каждая колонка кодируется
+отдельно (``ai.onnx.ml.OneHotEncoder``), пропуск строки (``"nan"``, как его
+отдаёт ``InputBuilder``) заменяется модой. Целый вход пропусков не содержит.
+Числовая ветка масштабируется как sklearn на float32-признаках
+(``Float32StandardScaler``), иначе деревья расходятся у порогов.
+
+Штатный конвертер skl2onnx (1.17) категориальные сплиты HGB молча
+превращает в числовые пороги — вероятности расходятся полностью. Поэтому HGB
+конвертируется своим: ``TreeEnsembleRegressor`` + сигмоида, где сплит
+«категория из множества S» разворачивается в цепочку ``BRANCH_EQ`` по
+значениям кода (поддерево копируется на каждую ветку). Неизвестные и
+пропущенные категории идут туда же, куда их отправляет sklearn (ветка пропусков).
+
+Паритет проверяется на тестовой части; задержка сравнивается «от DataFrame
+до вероятностей» в одном потоке с обеих сторон, как в API.
+"""
+
+from __future__ import annotations
+
+import argparse
+import copy
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import yaml
+from onnx import TensorProto
+from skl2onnx import convert_sklearn, update_registered_converter
+from skl2onnx.common.data_types import FloatTensorType, Int64TensorType, StringTensorType
+from skl2onnx.common.shape_calculator import calculate_linear_classifier_output_shapes
+from sklearn.ensemble import HistGradientBoostingClassifier
+from sklearn.impute import SimpleImputer
+from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from threadpoolctl import threadpool_limits
+
+from src.data.columnar import read_dataset
+from src.inference.model import OnnxModel
+from src.models.latency import measure_latency
+from src.models.pipeline import Schema, get_feature_lists, split_xy
+from src.models.selection import benchmark_latency
+
+ONNX_TARGET_OPSET = {"": 15, "ai.onnx.ml": 3}
+PARITY_ATOL = 1e-4
+
+
+class ImputedOneHotEncoder(OneHotEncoder):
+    """Обученные ``SimpleImputer`` + ``OneHotEncoder`` одним шагом (только для экспорта).
+
+    Наследник ``OneHotEncoder``: для таких шагов skl2onnx не склеивает входы.
+    """
+
+    @classmethod
+    def from_branch(cls, branch: Pipeline) -> "ImputedOneHotEncoder":
+        imputer, encoder = branch.steps[0][1], branch.steps[1][1]
+        obj = cls()
+        obj.__dict__.update(encoder.__dict__)
+        obj.imputer_ = imputer
+        return obj
+
+    def transform(self, X):
+        return super().transform(self.imputer_.transform(X))
+
+
+class Float32StandardScaler(StandardScaler):
+    """Обученный ``StandardScaler`` с конвертером, повторяющим float32-путь sklearn.
+
+    На float32-признаках (``credit.feather``) sklearn вычитает и делит на месте:
+    каждая операция — в double с округлением результата до float32. Штатный
+    ``Scaler`` считает ``(x - mean) * (1 / scale)`` во float32 и расходится на
+    ulp у трети значений — у порога дерева этого хватает, чтобы уйти в
+    соседний лист.
+    """
+
+    @classmethod
+    def from_scaler(cls, scaler: StandardScaler) -> "Float32StandardScaler":
+        obj = cls()
+        obj.__dict__.update(scaler.__dict__)
+        return obj
+
+
+def _is_branch(trans, first, second) -> bool:
+    return (
+        isinstance(trans, Pipeline)
+        and len(trans.steps) == 2
+        and isinstance(trans.steps[0][1], first)
+        and type(trans.steps[1][1]) is second
+    )
+
+
+def _onnx_branch(trans):
+    if _is_branch(trans, SimpleImputer, OneHotEncoder):
+        return ImputedOneHotEncoder.from_branch(trans)
+    if _is_branch(trans, SimpleImputer, StandardScaler):
+        (imp_name, imputer), (sc_name, scaler) = trans.steps
+        return Pipeline([(imp_name, imputer), (sc_name, Float32StandardScaler.from_scaler(scaler))])
+    return trans
+
+
+def onnx_ready(pipe: Pipeline) -> Pipeline:
+    """Копия пайплайна, где ветки ``build_preprocessor`` заменены экспортными.
+
+    Обученные объекты не копируются; HGB-пайплайн возвращается как есть.
+    """
+    (prep_name, prep), model_step = pipe.steps
+    transformers = getattr(prep, "transformers_", [])
+    if all(_onnx_branch(t) is t for _, t, _ in transformers):
+        return pipe
+    prep = copy.copy(prep)
+    prep.transformers_ = [(name, _onnx_branch(t), cols) for name, t, cols in transformers]
+    return Pipeline([(prep_name, prep), model_step])
+
+
+def onnx_input_types(X: pd.DataFrame, cat_cols: Sequence[str]):
+    """Целые категории -> Int64, строковые (AGE_BIN) -> String, числа -> Float."""
+    types = []
+    for c in X.columns:
+        if c in cat_cols and pd.api.types.is_integer_dtype(X[c]):
+            types.append((c, Int64TensorType([None, 1])))
+        elif c in cat_cols:
+            types.append((c, StringTensorType([None, 1])))
+        else:
+            types.append((c, FloatTensorType([None, 1])))
+    return types
+
+
+def binary_classifier_outputs(scope, operator, container, logit: str, classes) -> None:
+    """Логит ``(N, 1)`` -> выходы классификатора: метка и вероятности ``(N, 2)``."""
+    p1 = scope.get_unique_variable_name("p1")
+    container.add_node("Sigmoid", logit, p1, op_version=13)
+    one = scope.get_unique_variable_name("one")
+    container.add_initializer(one, TensorProto.FLOAT, [], [1.0])
+    p0 = scope.get_unique_variable_name("p0")
+    container.add_node("Sub", [one, p1], p0, op_version=14)
+    probabilities = operator.outputs[1].full_name
+    container.add_node("Concat", [p0, p1], probabilities, axis=1, op_version=13)
+
+    idx = scope.get_unique_variable_name("argmax")
+    container.add_node("ArgMax", probabilities, idx, axis=1, keepdims=0, op_version=13)
+    labels = scope.get_unique_variable_name("classes")
+    container.add_initializer(labels, TensorProto.INT64, [2], [int(c) for c in classes])
+    container.add_node("Gather", [labels, idx], operator.outputs[0].full_name, op_version=13)
+
+
+def _imputed_onehot_shape(operator) -> None:
+    width = sum(len(c) for c in operator.raw_operator.categories_)
+    operator.outputs[0].type = FloatTensorType([None, width])
+
+
+def _convert_imputed_onehot(scope, operator, container) -> None:
+    op = operator.raw_operator
+    if op.drop_idx_ is not None or op.handle_unknown != "ignore":
+        raise ValueError("Only OneHotEncoder(handle_unknown='ignore') without drop")
+    if len(operator.inputs) != len(op.categories_):
+        raise RuntimeError(f"Expected one [N, 1] input per column, got {len(operator.inputs)}")
+    encoded = []
+    for i, (var, cats) in enumerate(zip(operator.inputs, op.categories_)):
+        x = var.full_name
+        if isinstance(var.type, StringTensorType):
+            fill = scope.get_unique_variable_name(f"mode{i}")
+            container.add_initializer(
+                fill, TensorProto.STRING, [1], [str(op.imputer_.statistics_[i])]
+            )
+            is_missing = scope.get_unique_variable_name(f"missing{i}")
+            container.add_node(
+                "LabelEncoder",
+                x,
+                is_missing,
+                op_domain="ai.onnx.ml",
+                op_version=2,
+                keys_strings=["nan"],
+                values_int64s=[1],
+                default_int64=0,
+            )
+            mask = scope.get_unique_variable_name(f"mask{i}")
+            container.add_node("Cast", is_missing, mask, to=TensorProto.BOOL, op_version=13)
+            imputed = scope.get_unique_variable_name(f"imputed{i}")
+            container.add_node("Where", [mask, fill, x], imputed, op_version=9)
+            x, attr = imputed, {"cats_strings": [str(c) for c in cats]}
+        else:
+            attr = {"cats_int64s": [int(c) for c in cats]}
+        out = scope.get_unique_variable_name(f"onehot{i}")
+        container.add_node(
+            "OneHotEncoder",
+            x,
+            out,
+            op_domain="ai.onnx.ml",
+            op_version=1,
+            name=scope.get_unique_operator_name("OneHotEncoder"),
+            zeros=1,
+            **attr,
+        )
+        encoded.append(out)
+
+    # (N, 1, k_i) -> (N, 1, sum k) -> (N, sum k)
+    joined = scope.get_unique_variable_name("onehot_concat")
+    container.add_node("Concat", encoded, joined, axis=2, op_version=13)
+    shape = scope.get_unique_variable_name("onehot_shape")
+    width = sum(len(c) for c in op.categories_)
+    container.add_initializer(shape, TensorProto.INT64, [2], [-1, width])
+    container.add_node("Reshape", [joined, shape], operator.outputs[0].full_name, op_version=13)
+
+
+def _float32_scaler_shape(operator) -> None:
+    operator.outputs[0].type = FloatTensorType([None, operator.raw_operator.n_features_in_])
+
+
+def _convert_float32_scaler(scope, operator, container) -> None:
+    op = operator.raw_operator
+    x = operator.inputs[0].full_name
+    steps = []
+    if op.with_mean:
+        steps.append(("Sub", op.mean_))
+    if op.with_std:
+        steps.append(("Div", op.scale_))
+    for i, (op_type, values) in enumerate(steps):
+        x64 = scope.get_unique_variable_name("scaler_double")
+        container.add_node("Cast", x, x64, to=TensorProto.DOUBLE, op_version=13)
+        const = scope.get_unique_variable_name(f"scaler_{op_type.lower()}")
+        container.add_initializer(
+            const, TensorProto.DOUBLE, [len(values)], np.asarray(values, np.float64).tolist()
+        )
+        res = scope.get_unique_variable_name(f"scaler_{op_type.lower()}_out")
+        container.add_node(op_type, [x64, const], res, op_version=14 if op_type == "Sub" else 13)
+        x = (
+            operator.outputs[0].full_name
+            if i == len(steps) - 1
+            else scope.get_unique_variable_name("scaler_float")
+        )
+        container.add_node("Cast", res, x, to=TensorProto.FLOAT, op_version=13)
+    if not steps:
+        container.add_node("Identity", x, operator.outputs[0].full_name)
+
+
+def _bitset_members(bitset: np.ndarray) -> List[int]:
+    words = np.asarray(bitset, dtype=np.uint32)
+    return [c for c in range(32 * len(words)) if (int(words[c // 32]) >> (c % 32)) & 1]
+
+
+def _feature_layout(model: HistGradientBoostingClassifier) -> Tuple[np.ndarray, Dict[int, list]]:
+    """Индекс входной колонки для признака дерева и известные значения категорий.
+
+    При категориальных признаках HGB сам перекодирует вход (категории — первыми),
+    и дерево ссылается на признаки уже в этом порядке.
+    """
+    n = model.n_features_in_
+    pre = getattr(model, "_preprocessor", None)
+    if pre is None:
+        return np.arange(n), {}
+    is_cat = np.asarray(model.is_categorical_, dtype=bool)
+    order = np.concatenate([np.flatnonzero(is_cat), np.flatnonzero(~is_cat)])
+    known: Dict[int, list] = {}
+    encoder = pre.named_transformers_["encoder"]
+    for internal_idx, cats in enumerate(encoder.categories_):
+        cats = [c for c in cats if not (isinstance(c, float) and np.isnan(c))]
+        known[internal_idx] = [float(c) for c in cats]
+    return order, known
+
+
+class _TreeBuilder:
+    """Узлы ``TreeEnsembleRegressor`` из предикторов HGB."""
+
+    def __init__(self, order: np.ndarray, known: Dict[int, list]):
+        self.order = order
+        self.known = known
+        self.attrs: Dict[str, list] = {
+            k: []
+            for k in (
+                "nodes_treeids",
+                "nodes_nodeids",
+                "nodes_featureids",
+                "nodes_values",
+                "nodes_modes",
+                "nodes_truenodeids",
+                "nodes_falsenodeids",
+                "nodes_missing_value_tracks_true",
+                "nodes_hitrates",
+                "target_treeids",
+                "target_nodeids",
+                "target_ids",
+                "target_weights",
+            )
+        }
+
+    def add_tree(self, tree_id: int, predictor) -> None:
+        # Узлы нумеруются с 0 в каждом дереве, позиция в списках атрибутов — сквозная
+        self._pos: Dict[int, int] = {}
+        self._emit(tree_id, predictor, 0)
+
+    def _new(self, tree_id: int, mode: str, feature: int = 0, value: float = 0.0) -> int:
+        a = self.attrs
+        nid = len(self._pos)
+        self._pos[nid] = len(a["nodes_nodeids"])
+        a["nodes_treeids"].append(tree_id)
+        a["nodes_nodeids"].append(nid)
+        a["nodes_featureids"].append(int(feature))
+        a["nodes_values"].append(float(value))
+        a["nodes_modes"].append(mode)
+        a["nodes_truenodeids"].append(0)
+        a["nodes_falsenodeids"].append(0)
+        a["nodes_missing_value_tracks_true"].append(0)
+        a["nodes_hitrates"].append(1.0)
+        return nid
+
+    def _link(self, nid: int, true_id: int, false_id: int, missing_true: bool) -> None:
+        pos = self._pos[nid]
+        self.attrs["nodes_truenodeids"][pos] = true_id
+        self.attrs["nodes_falsenodeids"][pos] = false_id
+        self.attrs["nodes_missing_value_tracks_true"][pos] = int(missing_true)
+
+    def _emit(self, tree_id: int, predictor, idx: int) -> int:
+        node = predictor.nodes[idx]
+        if node["is_leaf"]:
+            nid = self._new(tree_id, "LEAF")
+            self.attrs["target_treeids"].append(tree_id)
+            self.attrs["target_nodeids"].append(nid)
+            self.attrs["target_ids"].append(0)
+            self.attrs["target_weights"].append(float(node["value"]))
+            return nid
+
+        internal = int(node["feature_idx"])
+        feature = int(self.order[internal])
+        missing_left = bool(node["missing_go_to_left"])
+        if not node["is_categorical"]:
+            nid = self._new(tree_id, "BRANCH_LEQ", feature, node["num_threshold"])
+            left = self._emit(tree_id, predictor, int(node["left"]))
+            right = self._emit(tree_id, predictor, int(node["right"]))
+            self._link(nid, left, right, missing_left)
+            return nid
+
+        values = self.known[internal]
+        left_codes = set(_bitset_members(predictor.raw_left_cat_bitsets[node["bitset_idx"]]))
+        left_values = [v for code, v in enumerate(values) if code in left_codes]
+        right_values = [v for code, v in enumerate(values) if code not in left_codes]
+        # Пропуски и неизвестные категории идут по ветке пропусков: цепочка проверяет
+        # известные значения противоположной стороны, «иначе» — сторона пропусков
+        if missing_left:
+            chain, chain_child, else_child = right_values, int(node["right"]), int(node["left"])
+        else:
+            chain, chain_child, else_child = left_values, int(node["left"]), int(node["right"])
+        if not chain:
+            return self._emit(tree_id, predictor, else_child)
+
+        first = None
+        prev = None
+        for value in chain:
+            nid = self._new(tree_id, "BRANCH_EQ", feature, value)
+            if prev is None:
+                first = nid
+            else:
+                self._link(prev[0], prev[1], nid, False)
+            prev = (nid, self._emit(tree_id, predictor, chain_child))
+        self._link(prev[0], prev[1], self._emit(tree_id, predictor, else_child), False)
+        return first
+
+
+def hgb_tree_attributes(model: HistGradientBoostingClassifier) -> Dict[str, list]:
+    if model.n_trees_per_iteration_ != 1:
+        raise ValueError("Only binary HistGradientBoostingClassifier is supported")
+    order, known = _feature_layout(model)
+    builder = _TreeBuilder(order, known)
+    for tree_id, predictors in enumerate(model._predictors):
+        builder.add_tree(tree_id, predictors[0])
+    return builder.attrs
+
+
+def _convert_hgb_classifier(scope, operator, container) -> None:
+    model = operator.raw_operator
+    attrs = hgb_tree_attributes(model)
+    X = operator.inputs[0].full_name
+    if operator.inputs[0].type.__class__.__name__ != "FloatTensorType":
+        cast = scope.get_unique_variable_name("hgb_input")
+        container.add_node("Cast", X, cast, to=TensorProto.FLOAT, op_version=13)
+        X = cast
+
+    raw = scope.get_unique_variable_name("hgb_raw")
+    container.add_node(
+        "TreeEnsembleRegressor",
+        X,
+        raw,
+        op_domain="ai.onnx.ml",
+        op_version=1,
+        name=scope.get_unique_operator_name("TreeEnsembleRegressor"),
+        n_targets=1,
+        aggregate_function="SUM",
+        post_transform="NONE",
+        base_values=[float(np.ravel(model._baseline_prediction)[0])],
+        **attrs,
+    )
+    binary_classifier_outputs(scope, operator, container, raw, model.classes_)
+
+
+def register_onnx_converters() -> None:
+    update_registered_converter(
+        HistGradientBoostingClassifier,
+        "SklearnHistGradientBoostingClassifier",
+        calculate_linear_classifier_output_shapes,
+        _convert_hgb_classifier,
+        options={"zipmap": [True, False, "columns"], "nocl": [True, False]},
+        overwrite=True,
+    )
+    update_registered_converter(
+        ImputedOneHotEncoder,
+        "ImputedOneHotEncoder",
+        _imputed_onehot_shape,
+        _convert_imputed_onehot,
+        overwrite=True,
+    )
+    update_registered_converter(
+        Float32StandardScaler,
+        "Float32StandardScaler",
+        _float32_scaler_shape,
+        _convert_float32_scaler,
+        overwrite=True,
+    )
+
+
+def parity(p_ref: np.ndarray, p_onnx: np.ndarray, atol: float = PARITY_ATOL) -> Dict[str, Any]:
+    diff = np.abs(p_ref - p_onnx) if len(p_ref) else np.zeros(1)
+    return {
+        "rows": int(len(p_ref)),
+        "max_abs_diff": float(diff.max()),
+        "mean_abs_diff": float(diff.mean()),
+        "mismatch_rate": round(float(np.mean(diff > atol)), 6),
+        "passed": bool(diff.max() <= atol),
+    }
+
+
+def export_pipeline(
+    pipe: Pipeline, X_sample: pd.DataFrame, cat_cols: Sequence[str], out_path: Path
+) -> Dict[str, Any]:
+    """Конвертировать, сохранить и проверить паритет на ``X_sample``.
+
+    Не прошедшая проверку модель удаляется, поднимается ``ValueError``.
+    """
+    register_onnx_converters()
+    ready = onnx_ready(pipe)
+    onx = convert_sklearn(
+        ready,
+        initial_types=onnx_input_types(X_sample, cat_cols),
+        target_opset=ONNX_TARGET_OPSET,
+        options={id(ready.steps[-1][1]): {"zipmap": False}},
+    )
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_bytes(onx.SerializeToString())
+
+    check = parity(
+        pipe.predict_proba(X_sample)[:, 1], OnnxModel(out_path).predict_proba_frame(X_sample)
+    )
+    if not check["passed"]:
+        out_path.unlink()
+        raise ValueError(
+            f"ONNX parity check failed: max |diff| = {check['max_abs_diff']:.2e}, "
+            f"{check['mismatch_rate']:.2%} rows above {PARITY_ATOL:g}"
+        )
+    return {"path": str(out_path), "size_bytes": out_path.stat().st_size, "parity": check}
+
+
+def compare_runtimes(
+    pipe: Pipeline, onnx_path: Path, X: pd.DataFrame, batch_sizes: Sequence[int], repeats: int
+) -> Dict[str, Any]:
+    sk = benchmark_latency(pipe, X, batch_sizes, repeats, warmup=5)
+    with threadpool_limits(limits=1):
+        ort = OnnxModel(onnx_path, threads=1)
+        ort_lat = measure_latency(ort.predict_proba_frame, X, batch_sizes, repeats)
+    return {
+        "sklearn": sk,
+        "onnxruntime": ort_lat,
+        "speedup_p50": {b: round(sk[b]["p50_ms"] / max(ort_lat[b]["p50_ms"], 1e-9), 2) for b in sk},
+    }
+
+
+def export_selected(
+    pipe: Pipeline,
+    X_test: pd.DataFrame,
+    cat_cols: Sequence[str],
+    onnx_path: Path,
+    report_path: Path,
+    batch_sizes: Sequence[int] = (1, 64, 1024),
+    repeats: int = 200,
+) -> Dict[str, Any]:
+    """Экспорт + паритет + сравнение sklearn / ORT, отчёт в JSON."""
+    report: Dict[str, Any] = {"model": type(pipe.steps[-1][1]).__name__}
+    report.update(export_pipeline(pipe, X_test, cat_cols, onnx_path))
+    report["latency"] = compare_runtimes(pipe, Path(onnx_path), X_test, batch_sizes, repeats)
+    report_path = Path(report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    return report
+
+
+def describe(report: Dict[str, Any]) -> str:
+    p = report["parity"]
+    lat = report["latency"]
+    speed = " ".join(
+        f"b{b} {lat['sklearn'][b]['p50_ms']:.2f}->{lat['onnxruntime'][b]['p50_ms']:.2f}ms "
+        f"(x{lat['speedup_p50'][b]:.1f})"
+        for b in lat["sklearn"]
+    )
+    return (
+        f"ONNX {report['model']}: {report['path']} max|diff|={p['max_abs_diff']:.2e} "
+        f"| p50 sklearn->ORT {speed}"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="ONNX-экспорт models/model.joblib: паритет и задержка sklearn / ORT"
+    )
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--model-path", default="models/model.joblib")
+    parser.add_argument("--onnx-path", default="models/model.onnx")
+    parser.add_argument("--report-path", default="reports/model_onnx.json")
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    args = parser.parse_args()
+
+    with open("params.yaml", "r", encoding="utf-8") as f:
+        train_params = (yaml.safe_load(f) or {}).get("train", {})
+    schema = Schema()
+    X, y = split_xy(read_dataset(Path(args.data_path)), schema)
+    cat_cols, _ = get_feature_lists(X, schema)
+    _, X_test, _, _ = train_test_split(
+        X,
+        y,
+        test_size=float(train_params.get("test_size", 0.2)),
+        random_state=int(train_params.get("random_state", 42)),
+        stratify=y,
+    )
+    report = export_selected(
+        joblib.load(Path(args.model_path)),
+        X_test,
+        cat_cols,
+        Path(args.onnx_path),
+        Path(args.report_path),
+        [int(b) for b in args.batch_sizes.split(",")],
+        args.repeats,
+    )
+    print(describe(report))
+    print(f"Saved: {args.report_path}")
+
+
+if __name__ == "__main__":
+    main()
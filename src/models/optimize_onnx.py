@@ -0,0 +1,408 @@
+"""Офлайн-оптимизация ONNX-графа MLP-пайплайна и сохранение в ORT-формате.
+
+skl2onnx конвертирует ColumnTransformer «как есть»: Concat всех категорий и
+тут же ArrayFeatureExtractor/Gather по одному столбцу, константные
+LabelEncoder, Cast в тот же тип, MatMul+Add вместо Gemm. ORT при каждом
+создании сессии заново оптимизирует граф и большую часть этого не трогает
+(ml-операторы не сворачиваются). Здесь граф переписывается один раз:
+
+* свёртка констант (узлы, все входы которых — инициализаторы);
+* срез Concat по константному индексу заменяется исходным столбцом;
+* Cast в собственный тип удаляется;
+* MatMul + Add(смещение) -> Gemm (ORT дальше сливает Gemm+Relu в FusedGemm);
+* удаляются мёртвые узлы и инициализаторы.
+
+Затем ORT применяет свои оптимизации уровня ``--level`` и сохраняет модель в
+ORT-формате (``.ort``): при загрузке граф уже не оптимизируется и не
+парсится protobuf. Отчёт: паритет вероятностей с исходной моделью, число
+узлов, размер, время загрузки и задержка до/после.
+"""
+
+import argparse
+import json
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import onnx
+import onnxruntime as ort
+from onnx import helper, numpy_helper
+from onnx.reference import ReferenceEvaluator
+
+from src.data.columnar import read_dataset
+from src.inference.model import OnnxModel, expose_probability_tensor
+from src.models.latency import ort_latency
+from src.models.train_nn_onnx import prepare_xy
+
+LEVELS = {
+    "basic": ort.GraphOptimizationLevel.ORT_ENABLE_BASIC,
+    "extended": ort.GraphOptimizationLevel.ORT_ENABLE_EXTENDED,
+    # all добавляет аппаратно-зависимые преобразования: .ort годен только для этого же CPU
+    "all": ort.GraphOptimizationLevel.ORT_ENABLE_ALL,
+}
+PARITY_ATOL = 1e-5
+
+
+def _consumers(graph: onnx.GraphProto) -> Dict[str, List[onnx.NodeProto]]:
+    out: Dict[str, List[onnx.NodeProto]] = {}
+    for node in graph.node:
+        for name in node.input:
+            out.setdefault(name, []).append(node)
+    return out
+
+
+def _rename_input(graph: onnx.GraphProto, old: str, new: str) -> None:
+    for node in graph.node:
+        for i, name in enumerate(node.input):
+            if name == old:
+                node.input[i] = new
+
+
+def _bypass(graph: onnx.GraphProto, node: onnx.NodeProto, source: str) -> bool:
+    """Убрать узел с единственным выходом, заменив выход на ``source``."""
+    target = node.output[0]
+    outputs = {o.name for o in graph.output}
+    if target in outputs:
+        # Выход графа сохраняет имя: переименовываем выход узла-источника
+        producer = next((n for n in graph.node if source in n.output), None)
+        if producer is None or source in outputs:
+            return False
+        producer.output[list(producer.output).index(source)] = target
+        _rename_input(graph, source, target)
+    else:
+        _rename_input(graph, target, source)
+    graph.node.remove(node)
+    return True
+
+
+# ml-операторы без функции вывода форм в onnx: выход — float той же формы, что вход
+SHAPE_PRESERVING_ML = ("Imputer", "Scaler")
+
+
+def _shapes(model: onnx.ModelProto) -> Dict[str, onnx.TypeProto]:
+    probe = onnx.ModelProto()
+    probe.CopyFrom(model)
+    while True:
+        g = onnx.shape_inference.infer_shapes(probe, strict_mode=False).graph
+        known = {v.name: v.type for v in list(g.input) + list(g.value_info) + list(g.output)}
+        added = 0
+        for node in probe.graph.node:
+            if node.op_type not in SHAPE_PRESERVING_ML or node.output[0] in known:
+                continue
+            dims = _dims(known.get(node.input[0]))
+            if dims is None:
+                continue
+            probe.graph.value_info.append(
+                helper.make_tensor_value_info(node.output[0], onnx.TensorProto.FLOAT, dims)
+            )
+            added += 1
+        if not added:
+            return known
+
+
+def _dims(tp: Optional[onnx.TypeProto]) -> Optional[List[Optional[int]]]:
+    if tp is None or not tp.tensor_type.HasField("shape"):
+        return None
+    return [d.dim_value if d.HasField("dim_value") else None for d in tp.tensor_type.shape.dim]
+
+
+def _attr(node: onnx.NodeProto, name: str, default=None):
+    for a in node.attribute:
+        if a.name == name:
+            return helper.get_attribute_value(a)
+    return default
+
+
+def fold_constants(model: onnx.ModelProto) -> int:
+    graph = model.graph
+    consts = {i.name: i for i in graph.initializer}
+    outputs = {o.name for o in graph.output}
+    folded = 0
+    for node in list(graph.node):
+        if not node.input or any(name not in consts for name in node.input):
+            continue
+        if any(name in outputs for name in node.output):
+            continue
+        single = helper.make_model(
+            helper.make_graph(
+                [node],
+                "fold",
+                [],
+                [
+                    helper.make_tensor_value_info(o, onnx.TensorProto.UNDEFINED, None)
+                    for o in node.output
+                ],
+                [consts[name] for name in node.input],
+            ),
+            opset_imports=model.opset_import,
+        )
+        try:
+            values = ReferenceEvaluator(single).run(None, {})
+        except Exception:  # оператор без эталонной реализации не сворачиваем
+            continue
+        for name, value in zip(node.output, values):
+            value = np.asarray(value)
+            if value.dtype.kind in "US":  # строковые тензоры ONNX — dtype object
+                value = value.astype(object)
+            tensor = numpy_helper.from_array(value, name)
+            graph.initializer.append(tensor)
+            consts[name] = tensor
+        graph.node.remove(node)
+        folded += 1
+    return folded
+
+
+def bypass_concat_slices(model: onnx.ModelProto) -> int:
+    """``ArrayFeatureExtractor/Gather(Concat([x0..xk], axis=1), [i])`` -> ``xi``."""
+    graph = model.graph
+    shapes = _shapes(model)
+    consts = {i.name: numpy_helper.to_array(i) for i in graph.initializer}
+    producers = {o: n for n in graph.node for o in n.output}
+    done = 0
+    for node in list(graph.node):
+        if node.op_type == "Gather" and _attr(node, "axis", 0) != 1:
+            continue
+        if node.op_type not in ("ArrayFeatureExtractor", "Gather"):
+            continue
+        data, index = node.input
+        concat = producers.get(data)
+        if concat is None or concat.op_type != "Concat" or _attr(concat, "axis") not in (1, -1):
+            continue
+        idx = consts.get(index)
+        if idx is None or idx.size != 1:
+            continue
+        widths = [(_dims(shapes.get(x)) or [None, None])[-1] for x in concat.input]
+        if any(w != 1 for w in widths):
+            continue
+        source = concat.input[int(idx.ravel()[0])]
+        if _dims(shapes.get(source)) != _dims(shapes.get(node.output[0])):
+            continue
+        done += _bypass(graph, node, source)
+    return done
+
+
+def remove_identity_casts(model: onnx.ModelProto) -> int:
+    graph = model.graph
+    shapes = _shapes(model)
+    done = 0
+    for node in list(graph.node):
+        if node.op_type != "Cast":
+            continue
+        src = shapes.get(node.input[0])
+        if src is None or src.tensor_type.elem_type != _attr(node, "to"):
+            continue
+        done += _bypass(graph, node, node.input[0])
+    return done
+
+
+def fuse_matmul_add(model: onnx.ModelProto) -> int:
+    graph = model.graph
+    shapes = _shapes(model)
+    consts = {i.name: i for i in graph.initializer}
+    consumers = _consumers(graph)
+    outputs = {o.name for o in graph.output}
+    done = 0
+    for node in list(graph.node):
+        if node.op_type != "MatMul" or node.input[1] not in consts:
+            continue
+        users = consumers.get(node.output[0], [])
+        if len(users) != 1 or users[0].op_type != "Add" or node.output[0] in outputs:
+            continue
+        add = users[0]
+        bias = next((x for x in add.input if x != node.output[0]), None)
+        a_dims = _dims(shapes.get(node.input[0]))
+        w = consts[node.input[1]]
+        if bias not in consts or a_dims is None or len(a_dims) != 2 or len(w.dims) != 2:
+            continue
+        if int(np.prod(consts[bias].dims)) != w.dims[1]:
+            continue
+        gemm = helper.make_node(
+            "Gemm", [node.input[0], node.input[1], bias], list(add.output), name=node.name or None
+        )
+        position = list(graph.node).index(node)
+        graph.node.remove(node)
+        graph.node.remove(add)
+        graph.node.insert(position, gemm)
+        done += 1
+    return done
+
+
+def prune(model: onnx.ModelProto) -> int:
+    graph = model.graph
+    needed = {o.name for o in graph.output}
+    kept = []
+    for node in reversed(list(graph.node)):
+        if any(o in needed for o in node.output):
+            kept.append(node)
+            needed.update(node.input)
+    removed = len(graph.node) - len(kept)
+    del graph.node[:]
+    graph.node.extend(reversed(kept))
+    unused = [i for i in graph.initializer if i.name not in needed]
+    for init in unused:
+        graph.initializer.remove(init)
+    return removed
+
+
+PASSES = (
+    ("fold_constants", fold_constants),
+    ("bypass_concat_slices", bypass_concat_slices),
+    ("remove_identity_casts", remove_identity_casts),
+    ("fuse_matmul_add", fuse_matmul_add),
+    ("prune", prune),
+)
+
+
+def rewrite_graph(model: onnx.ModelProto, max_rounds: int = 5) -> Dict[str, int]:
+    """Применить проходы до неподвижной точки; число срабатываний по проходу."""
+    stats: Counter = Counter()
+    for _ in range(max_rounds):
+        changed = 0
+        for name, fn in PASSES:
+            n = fn(model)
+            stats[name] += n
+            changed += n
+        if not changed:
+            break
+    # Типы промежуточных тензоров (в т.ч. после ml-операторов) — для калибровки квантизации
+    io = {v.name for v in list(model.graph.input) + list(model.graph.output)}
+    del model.graph.value_info[:]
+    for name, tp in _shapes(model).items():
+        if name not in io and tp.HasField("tensor_type"):
+            model.graph.value_info.append(helper.make_value_info(name, tp))
+    onnx.checker.check_model(model)
+    return dict(stats)
+
+
+def optimizer_options(level: str = "extended") -> ort.SessionOptions:
+    opts = ort.SessionOptions()
+    opts.graph_optimization_level = LEVELS[level]
+    opts.intra_op_num_threads = 1
+    return opts
+
+
+def save_optimized(model_bytes: bytes, out_path: Path, level: str, fmt: str) -> None:
+    opts = optimizer_options(level)
+    opts.optimized_model_filepath = str(out_path)
+    if fmt == "ORT":
+        opts.add_session_config_entry("session.save_model_format", "ORT")
+    ort.InferenceSession(model_bytes, opts, providers=["CPUExecutionProvider"])
+
+
+def count_nodes(model: onnx.ModelProto) -> Dict[str, Any]:
+    ops = Counter(n.op_type for n in model.graph.node)
+    return {"nodes": len(model.graph.node), "ops": dict(sorted(ops.items()))}
+
+
+def load_time_ms(path: Path, repeats: int) -> float:
+    """Время создания ``OnnxModel`` (как при старте API)."""
+    times = []
+    for _ in range(repeats):
+        t0 = time.perf_counter()
+        OnnxModel(path, threads=1)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    return round(float(np.median(times)), 3)
+
+
+def describe_model(
+    path: Path, graph: onnx.ModelProto, X, batch_sizes, repeats: int, load_repeats: int
+) -> Dict[str, Any]:
+    return {
+        "path": str(path),
+        **count_nodes(graph),
+        "size_bytes": path.stat().st_size,
+        "load_ms": load_time_ms(path, load_repeats),
+        "latency": ort_latency(OnnxModel(path, threads=1), X, batch_sizes, repeats),
+    }
+
+
+def optimize(
+    onnx_path: Path,
+    out_path: Path,
+    X,
+    level: str = "extended",
+    batch_sizes: Sequence[int] = (1, 64),
+    repeats: int = 200,
+    load_repeats: int = 20,
+    atol: float = PARITY_ATOL,
+) -> Dict[str, Any]:
+    original = onnx.load(str(onnx_path))
+    rewritten = onnx.ModelProto()
+    rewritten.CopyFrom(original)
+    passes = rewrite_graph(rewritten)
+    # .ort нельзя править при загрузке: тензор вероятностей до ZipMap выводим заранее
+    expose_probability_tensor(rewritten)
+    rewritten_bytes = rewritten.SerializeToString()
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    fmt = "ORT" if out_path.suffix == ".ort" else "ONNX"
+    save_optimized(rewritten_bytes, out_path, level, fmt)
+    # Число узлов после оптимизаций ORT: .ort не читается пакетом onnx, смотрим ONNX-копию
+    with tempfile.TemporaryDirectory() as tmp:
+        final_onnx = Path(tmp) / "optimized.onnx"
+        save_optimized(rewritten_bytes, final_onnx, level, "ONNX")
+        final_graph = onnx.load(str(final_onnx))
+
+    before = OnnxModel(onnx_path, threads=1).predict_proba_frame(X)
+    after = OnnxModel(out_path, threads=1).predict_proba_frame(X)
+    diff = float(np.max(np.abs(before - after)))
+    if diff > atol:
+        out_path.unlink()
+        raise ValueError(f"Optimized model differs from {onnx_path}: max |diff|={diff:.2e}")
+
+    return {
+        "level": level,
+        "format": fmt,
+        "passes": passes,
+        "parity_rows": int(len(X)),
+        "max_abs_diff": diff,
+        "before": describe_model(onnx_path, original, X, batch_sizes, repeats, load_repeats),
+        "after": describe_model(out_path, final_graph, X, batch_sizes, repeats, load_repeats),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Офлайн-оптимизация ONNX -> ORT-формат")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--onnx-path", default="models/nn_model.onnx")
+    parser.add_argument("--out-path", default="models/nn_model.ort")
+    parser.add_argument("--level", choices=sorted(LEVELS), default="extended")
+    parser.add_argument("--parity-rows", type=int, default=5000)
+    parser.add_argument("--batch-sizes", default="1,64")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--report-path", default="reports/onnx_optimization.json")
+    args = parser.parse_args()
+
+    X, _, _, _ = prepare_xy(read_dataset(Path(args.data_path)))
+    X = X.sample(n=min(args.parity_rows, len(X)), random_state=0).reset_index(drop=True)
+    report = optimize(
+        Path(args.onnx_path),
+        Path(args.out_path),
+        X,
+        level=args.level,
+        batch_sizes=[int(b) for b in args.batch_sizes.split(",")],
+        repeats=args.repeats,
+    )
+
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    b, a = report["before"], report["after"]
+    print(f"Passes: {report['passes']}")
+    print(f"Parity ({report['parity_rows']} rows): max |diff| = {report['max_abs_diff']:.2e}")
+    print(f"Nodes: {b['nodes']} -> {a['nodes']}")
+    print(f"Size:  {b['size_bytes'] / 1024:.1f} KB -> {a['size_bytes'] / 1024:.1f} KB")
+    print(f"Load:  {b['load_ms']:.2f} ms -> {a['load_ms']:.2f} ms")
+    for bs in b["latency"]:
+        print(
+            f"b{bs}: p50 {b['latency'][bs]['p50_ms']:.3f} -> {a['latency'][bs]['p50_ms']:.3f} ms, "
+            f"p95 {b['latency'][bs]['p95_ms']:.3f} -> {a['latency'][bs]['p95_ms']:.3f} ms"
+        )
+    print(f"Saved: {args.out_path}, {report_path}")
+
+
+if __name__ == "__main__":
+    main()
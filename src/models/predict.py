@@ -1,28 +1,262 @@
+"""Пакетный скоринг: потоковое чтение кусками, параллельно по процессам, с продолжением.
+
+Вход (CSV, Parquet/Feather или каталог партиций) читается кусками по
+``--chunk-rows`` строк (``iter_dataset_batches``), так что файл может быть
+больше памяти. Куски раздаются пулу процессов; каждый воркер один раз
+загружает модель (``load_scorer``: joblib, ONNX/ORT или бандл) и пишет
+результат куска в свой Parquet-файл ``part-NNNNN.parquet`` (через временный
+файл и ``os.replace`` — недописанных частей не бывает). В очереди не больше
+двух кусков на воркер: память ограничена независимо от размера входа.
+
+В ``_checkpoint.json`` выходного каталога — отпечаток задания (вход: размер и
+mtime, модель: sha256, размер куска) и готовые куски. Повторный запуск с тем
+же заданием пропускает готовые куски и досчитывает остальные; другое задание
+в том же каталоге — ошибка (``--overwrite`` начинает заново).
+"""
+
 import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
 
-import joblib
+import numpy as np
 import pandas as pd
+from threadpoolctl import threadpool_limits
 
+from src.data.columnar import iter_dataset_batches
+from src.features.engine import with_engineered
+from src.inference.bundle import decision_threshold
+from src.inference.model import load_scorer
+from src.models.scheduler import resolve_cpu_budget
+
+CHECKPOINT = "_checkpoint.json"
+IN_FLIGHT_PER_WORKER = 2
+
+# Модель воркера: загружается один раз в initializer пула
+_WORKER: Dict[str, Any] = {}
+
+
+def part_name(index: int) -> str:
+    return f"part-{index:05d}.parquet"
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--model-path", required=True)
-    parser.add_argument("--input-csv", required=True)
-    parser.add_argument("--output-csv", required=True)
-    args = parser.parse_args()
 
-    model = joblib.load(Path(args.model_path))
-    df = pd.read_csv(Path(args.input_csv))
-    proba = model.predict_proba(df)[:, 1]
-    pred = (proba >= 0.5).astype(int)
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
 
-    out = df.copy()
-    out["pred_class"] = pred
+
+def job_fingerprint(input_path: Path, model_path: Path, chunk_rows: int) -> Dict[str, Any]:
+    """Что определяет разбиение на куски и их результат."""
+    input_path, model_path = Path(input_path), Path(model_path)
+    if input_path.is_dir():
+        files = sorted(p for p in input_path.rglob("*") if p.is_file())
+        stats = [
+            (str(p.relative_to(input_path)), p.stat().st_size, p.stat().st_mtime_ns) for p in files
+        ]
+        input_sig = hashlib.sha256(json.dumps(stats).encode()).hexdigest()
+    else:
+        st = input_path.stat()
+        input_sig = f"{st.st_size}:{st.st_mtime_ns}"
+    return {
+        "input_path": str(input_path),
+        "input_signature": input_sig,
+        "model_path": str(model_path),
+        "model_sha256": file_sha256(model_path),
+        "chunk_rows": int(chunk_rows),
+    }
+
+
+def read_checkpoint(out_dir: Path) -> Optional[Dict[str, Any]]:
+    path = Path(out_dir) / CHECKPOINT
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else None
+
+
+def write_checkpoint(out_dir: Path, checkpoint: Dict[str, Any]) -> None:
+    path = Path(out_dir) / CHECKPOINT
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_text(json.dumps(checkpoint, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def score_frame(
+    df: pd.DataFrame, score: Callable[[pd.DataFrame], np.ndarray], threshold: float
+) -> pd.DataFrame:
+    out = with_engineered(df)
+    if out is df:
+        out = df.copy()
+    proba = score(out)
+    out["pred_class"] = (proba >= threshold).astype(np.int8)
     out["pred_proba"] = proba
-    Path(args.output_csv).parent.mkdir(parents=True, exist_ok=True)
-    out.to_csv(Path(args.output_csv), index=False)
-    print(f"Saved predictions to {args.output_csv}")
+    return out
+
+
+def write_part(out: pd.DataFrame, path: Path) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    out.to_parquet(tmp, index=False)
+    os.replace(tmp, path)
+
+
+def _init_worker(model_path: str, threads: int) -> None:
+    _WORKER["threads"] = threads
+    _WORKER["score"] = load_scorer(Path(model_path), threads=threads)
+    _WORKER["threshold"] = decision_threshold(Path(model_path))
+
+
+def _score_chunk(index: int, df: pd.DataFrame, out_dir: str) -> Tuple[int, int, float]:
+    start = time.perf_counter()
+    with threadpool_limits(limits=_WORKER["threads"]):
+        out = score_frame(df, _WORKER["score"], _WORKER["threshold"])
+    write_part(out, Path(out_dir) / part_name(index))
+    return index, len(df), time.perf_counter() - start
+
+
+def run(
+    input_path: Path,
+    model_path: Path,
+    out_dir: Path,
+    chunk_rows: int = 50_000,
+    workers: int = 0,
+    threads: int = 1,
+    overwrite: bool = False,
+    max_chunks: int = 0,
+) -> Dict[str, Any]:
+    """Скорит вход в ``out_dir``; ``max_chunks`` — остановиться после N новых кусков."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    fingerprint = job_fingerprint(input_path, model_path, chunk_rows)
+
+    checkpoint = read_checkpoint(out_dir)
+    if checkpoint is not None and (overwrite or checkpoint["job"] != fingerprint):
+        if not overwrite:
+            changed = [k for k in fingerprint if checkpoint["job"].get(k) != fingerprint[k]]
+            raise ValueError(
+                f"{out_dir} has a checkpoint of another job (differs in {changed}); "
+                "use --overwrite to start over"
+            )
+        for part in out_dir.glob("part-*.parquet"):
+            part.unlink()
+        checkpoint = None
+    if checkpoint is None:
+        checkpoint = {"job": fingerprint, "done": {}, "complete": False, "runs": []}
+        write_checkpoint(out_dir, checkpoint)
+    done: Dict[str, Any] = checkpoint["done"]
+
+    workers = resolve_cpu_budget(workers)
+    chunks = (
+        (i, df)
+        for i, df in enumerate(iter_dataset_batches(Path(input_path), chunk_rows))
+        if str(i) not in done
+    )
+    rows = submitted = 0
+    exhausted = False
+    t0 = time.perf_counter()
+
+    def record(index: int, n: int, seconds: float) -> None:
+        nonlocal rows
+        done[str(index)] = {"file": part_name(index), "rows": n, "seconds": round(seconds, 4)}
+        rows += n
+        write_checkpoint(out_dir, checkpoint)
+
+    def next_chunk():
+        nonlocal submitted, exhausted
+        if max_chunks and submitted >= max_chunks:
+            return None
+        item = next(chunks, None)
+        if item is None:
+            exhausted = True
+        else:
+            submitted += 1
+        return item
+
+    if workers == 1:
+        _init_worker(str(model_path), threads)
+        while (item := next_chunk()) is not None:
+            record(*_score_chunk(item[0], item[1], str(out_dir)))
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_worker, initargs=(str(model_path), threads)
+        ) as pool:
+            running = set()
+            while True:
+                while len(running) < workers * IN_FLIGHT_PER_WORKER:
+                    item = next_chunk()
+                    if item is None:
+                        break
+                    running.add(pool.submit(_score_chunk, item[0], item[1], str(out_dir)))
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    record(*future.result())
+
+    seconds = time.perf_counter() - t0
+    run_stats = {
+        "rows": rows,
+        "chunks": len(done),
+        "seconds": round(seconds, 3),
+        "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+        "workers": workers,
+        "threads_per_worker": threads,
+    }
+    checkpoint["runs"].append(run_stats)
+    checkpoint["complete"] = exhausted
+    checkpoint["total_rows"] = sum(p["rows"] for p in done.values())
+    write_checkpoint(out_dir, checkpoint)
+    return {**run_stats, "complete": exhausted, "total_rows": checkpoint["total_rows"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Пакетный скоринг кусками в Parquet-части")
+    parser.add_argument(
+        "--model-path",
+        required=True,
+        help="sklearn Pipeline (.joblib), ONNX (.onnx / .ort) или бандл (.bundle)",
+    )
+    parser.add_argument(
+        "--input-path",
+        "--input-csv",
+        dest="input_path",
+        required=True,
+        help="CSV, Parquet/Feather или каталог партиций",
+    )
+    parser.add_argument("--output-dir", help="каталог part-*.parquet и чекпоинта (обязателен)")
+    parser.add_argument("--output-csv", help="устарел: заменён --output-dir, завершается с ошибкой")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=0, help="процессов (0 — все ядра)")
+    parser.add_argument("--threads", type=int, default=1, help="потоков ORT/BLAS на процесс")
+    parser.add_argument(
+        "--overwrite", action="store_true", help="начать заново поверх чужого чекпоинта"
+    )
+    args = parser.parse_args()
+    if args.output_csv:
+        parser.error(
+            "--output-csv is no longer supported: use --output-dir, predictions are written "
+            "as part-*.parquet files with a resumable checkpoint"
+        )
+    if not args.output_dir:
+        parser.error("the following arguments are required: --output-dir")
+
+    res = run(
+        Path(args.input_path),
+        Path(args.model_path),
+        Path(args.output_dir),
+        chunk_rows=args.chunk_rows,
+        workers=args.workers,
+        threads=args.threads,
+        overwrite=args.overwrite,
+    )
+    print(
+        f"Scored {res['rows']} rows in {res['seconds']:.2f}s ({res['rows_per_s']} rows/s, "
+        f"{res['workers']} workers); total {res['total_rows']} rows in {res['chunks']} parts"
+    )
+    print(f"Saved predictions to {args.output_dir}")
 
 
 if __name__ == "__main__":
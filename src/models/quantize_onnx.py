@@ -0,0 +1,277 @@
+"""INT8-квантизация MLP ONNX: динамическая и статическая (QDQ) с калибровкой.
+
+Динамическая (``quantize_dynamic``) квантует только веса, масштаб активаций
+считается на каждом вызове. Статическая фиксирует масштабы активаций заранее
+по калибровочной выборке — стратифицированному сэмплу train-части
+``credit`` (``--calibration-rows``), метод калибровки ``--calibration-method``.
+Квантуются MatMul/Gemm графа после ``optimize_onnx.rewrite_graph`` (MatMul+Add
+уже слиты в Gemm, ORT исполняет QDQ-пару как QGemm); чувствительные слои
+исключаются по имени узла (``--exclude-nodes``, список — ``--list-nodes``).
+
+Гейт — на всей тестовой части (тот же сплит, что у ``train_nn_onnx``):
+падение ROC-AUC относительно fp32 и дрейф вероятностей (mean / p99 / max
+|diff|). Модель, не прошедшая гейт, удаляется, скрипт завершается с ошибкой.
+Задержка fp32 / dynamic / static сравнивается по размерам батча.
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import onnx
+import pandas as pd
+from onnxruntime.quantization import (
+    CalibrationDataReader,
+    CalibrationMethod,
+    QuantFormat,
+    QuantType,
+    quantize_dynamic,
+    quantize_static,
+)
+from sklearn.metrics import roc_auc_score
+from sklearn.model_selection import train_test_split
+
+from src.data.columnar import read_dataset
+from src.inference.inputs import InputBuilder
+from src.inference.model import OnnxModel
+from src.models.latency import ort_latency
+from src.models.optimize_onnx import rewrite_graph
+from src.models.train_nn_onnx import RANDOM_STATE, prepare_xy, split
+
+CALIBRATION_METHODS = {
+    "minmax": CalibrationMethod.MinMax,
+    "entropy": CalibrationMethod.Entropy,
+    "percentile": CalibrationMethod.Percentile,
+}
+QUANTIZED_OPS = ["MatMul", "Gemm"]
+MODES = ("dynamic", "static")
+
+
+class FrameCalibrationReader(CalibrationDataReader):
+    """Батчи одинакового размера: гистограммные калибраторы не принимают хвост."""
+
+    def __init__(self, X: pd.DataFrame, inputs: InputBuilder, batch_rows: int = 200):
+        batch_rows = max(1, min(batch_rows, len(X)))
+        starts = range(0, len(X) - batch_rows + 1, batch_rows)
+        self._batches = iter([inputs.from_frame(X.iloc[s : s + batch_rows]) for s in starts])
+
+    def get_next(self) -> Optional[Dict[str, np.ndarray]]:
+        return next(self._batches, None)
+
+
+def calibration_sample(X: pd.DataFrame, y: pd.Series, rows: int) -> pd.DataFrame:
+    if rows >= len(X):
+        return X
+    sample, _ = train_test_split(X, train_size=rows, random_state=RANDOM_STATE, stratify=y)
+    return sample
+
+
+def quantizable_nodes(model: onnx.ModelProto) -> List[Dict[str, str]]:
+    return [
+        {"name": n.name, "op_type": n.op_type, "input": n.input[0]}
+        for n in model.graph.node
+        if n.op_type in QUANTIZED_OPS
+    ]
+
+
+def rewritten_model(onnx_path: Path) -> onnx.ModelProto:
+    model = onnx.load(str(onnx_path))
+    rewrite_graph(model)
+    return model
+
+
+def quantize_static_model(
+    model: onnx.ModelProto,
+    out_path: Path,
+    X_calib: pd.DataFrame,
+    inputs: InputBuilder,
+    method: str = "minmax",
+    exclude: Sequence[str] = (),
+    batch_rows: int = 200,
+) -> None:
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "fp32.onnx"
+        onnx.save(model, str(src))
+        quantize_static(
+            str(src),
+            str(out_path),
+            FrameCalibrationReader(X_calib, inputs, batch_rows),
+            quant_format=QuantFormat.QDQ,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8,
+            calibrate_method=CALIBRATION_METHODS[method],
+            op_types_to_quantize=QUANTIZED_OPS,
+            nodes_to_exclude=list(exclude),
+        )
+
+
+def quantize_dynamic_model(model: onnx.ModelProto, out_path: Path, exclude: Sequence[str] = ()):
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        src = Path(tmp) / "fp32.onnx"
+        onnx.save(model, str(src))
+        quantize_dynamic(
+            str(src),
+            str(out_path),
+            weight_type=QuantType.QInt8,
+            op_types_to_quantize=QUANTIZED_OPS,
+            nodes_to_exclude=list(exclude),
+        )
+
+
+def quality_gate(
+    p_ref: np.ndarray,
+    p_q: np.ndarray,
+    y: np.ndarray,
+    max_auc_drop: float,
+    max_mean_abs_diff: float,
+    max_p99_abs_diff: float,
+) -> Dict[str, Any]:
+    diff = np.abs(p_ref - p_q)
+    auc_ref = float(roc_auc_score(y, p_ref))
+    auc_q = float(roc_auc_score(y, p_q))
+    checks = {
+        "auc_drop": auc_ref - auc_q <= max_auc_drop,
+        "mean_abs_diff": float(diff.mean()) <= max_mean_abs_diff,
+        "p99_abs_diff": float(np.percentile(diff, 99)) <= max_p99_abs_diff,
+    }
+    return {
+        "roc_auc_fp32": round(auc_ref, 5),
+        "roc_auc": round(auc_q, 5),
+        "auc_drop": round(auc_ref - auc_q, 5),
+        "mean_abs_diff": round(float(diff.mean()), 6),
+        "p99_abs_diff": round(float(np.percentile(diff, 99)), 6),
+        "max_abs_diff": round(float(diff.max()), 6),
+        "failed_checks": [k for k, ok in checks.items() if not ok],
+        "passed": all(checks.values()),
+    }
+
+
+def run(args) -> Dict[str, Any]:
+    onnx_path = Path(args.onnx_path)
+    if not onnx_path.exists():
+        raise FileNotFoundError(f"Missing {onnx_path}. Convert ONNX first.")
+    X, y, _, _ = prepare_xy(read_dataset(Path(args.data_path)))
+    X_train, X_test, y_train, y_test = split(X, y)
+    fp32 = OnnxModel(onnx_path, threads=1)
+    model = rewritten_model(onnx_path)
+    exclude = [n for n in args.exclude_nodes.split(",") if n]
+    unknown = set(exclude) - {n["name"] for n in quantizable_nodes(model)}
+    if unknown:
+        raise ValueError(f"--exclude-nodes: no such MatMul/Gemm nodes {sorted(unknown)}")
+
+    outputs = {"dynamic": Path(args.dynamic_out_path), "static": Path(args.out_path)}
+    modes = MODES if args.mode == "both" else (args.mode,)
+    X_calib = calibration_sample(X_train, y_train, args.calibration_rows)
+    for mode in modes:
+        if mode == "static":
+            quantize_static_model(
+                model,
+                outputs[mode],
+                X_calib,
+                fp32.inputs,
+                args.calibration_method,
+                exclude,
+                args.batch_rows,
+            )
+        else:
+            quantize_dynamic_model(model, outputs[mode], exclude)
+
+    feeds = fp32.inputs.from_frame(X_test)
+    p_ref = fp32.run(feeds)
+    batch_sizes = [int(b) for b in args.batch_sizes.split(",")]
+    report: Dict[str, Any] = {
+        "calibration": {
+            "method": args.calibration_method,
+            "rows": int(len(X_calib)),
+            "excluded_nodes": exclude,
+        },
+        "test_rows": int(len(X_test)),
+        "models": {
+            "fp32": {
+                "path": str(onnx_path),
+                "size_bytes": onnx_path.stat().st_size,
+                "latency": ort_latency(fp32, X_test, batch_sizes, args.repeats),
+            }
+        },
+    }
+    for mode in modes:
+        path = outputs[mode]
+        quantized = OnnxModel(path, threads=1)
+        gate = quality_gate(
+            p_ref,
+            quantized.run(feeds),
+            y_test.to_numpy(),
+            args.max_auc_drop,
+            args.max_mean_abs_diff,
+            args.max_p99_abs_diff,
+        )
+        report["models"][mode] = {
+            "path": str(path),
+            "size_bytes": path.stat().st_size,
+            "gate": gate,
+            "latency": ort_latency(quantized, X_test, batch_sizes, args.repeats),
+        }
+        if not gate["passed"]:
+            path.unlink()
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="INT8-квантизация MLP ONNX с гейтом качества")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--onnx-path", default="models/nn_model.onnx")
+    parser.add_argument("--out-path", default="models/nn_model_int8_static.onnx")
+    parser.add_argument("--dynamic-out-path", default="models/nn_model_int8.onnx")
+    parser.add_argument("--mode", choices=[*MODES, "both"], default="both")
+    parser.add_argument(
+        "--calibration-method", choices=sorted(CALIBRATION_METHODS), default="minmax"
+    )
+    parser.add_argument("--calibration-rows", type=int, default=2000)
+    parser.add_argument("--batch-rows", type=int, default=200, help="строк в батче калибровки")
+    parser.add_argument(
+        "--exclude-nodes", default="", help="узлы MatMul/Gemm, оставляемые в fp32 (через запятую)"
+    )
+    parser.add_argument("--list-nodes", action="store_true", help="показать квантуемые узлы")
+    parser.add_argument("--max-auc-drop", type=float, default=0.005)
+    parser.add_argument("--max-mean-abs-diff", type=float, default=0.02)
+    parser.add_argument("--max-p99-abs-diff", type=float, default=0.05)
+    parser.add_argument("--batch-sizes", default="1,64,1024")
+    parser.add_argument("--repeats", type=int, default=200)
+    parser.add_argument("--report-path", default="reports/quantization.json")
+    args = parser.parse_args()
+
+    if args.list_nodes:
+        for node in quantizable_nodes(rewritten_model(Path(args.onnx_path))):
+            print(f"{node['name']}\t{node['op_type']}\t(input: {node['input']})")
+        return
+
+    report = run(args)
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    models = report["models"]
+    for name, entry in models.items():
+        lat = " ".join(f"b{b} p50={v['p50_ms']:.3f}ms" for b, v in entry["latency"].items())
+        line = f"{name:>8}: {entry['size_bytes'] / 1024:.1f} KB {lat}"
+        if "gate" in entry:
+            g = entry["gate"]
+            line += (
+                f" | auc={g['roc_auc']:.4f} (drop {g['auc_drop']:+.4f}) "
+                f"mean|diff|={g['mean_abs_diff']:.4f} p99|diff|={g['p99_abs_diff']:.4f} "
+                + ("OK" if g["passed"] else f"FAILED {g['failed_checks']}")
+            )
+        print(line)
+    print(f"Saved: {report_path}")
+    failed = [name for name, e in models.items() if not e.get("gate", {"passed": True})["passed"]]
+    if failed:
+        raise SystemExit(f"Quantization gate failed for: {', '.join(failed)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Параллельный запуск независимых задач обучения в общем бюджете CPU.
+
+Каждая задача объявляет, сколько ядер она способна занять (``demand``:
+1 для однопоточных моделей, бюджет — для поиска гиперпараметров и лесов).
+Планировщик раздаёт ядра так, чтобы сумма ``n_jobs`` запущенных задач не
+превышала бюджет: вложенный параллелизм (RandomizedSearchCV внутри пула)
+не переподписывает машину. Задачи стартуют от самой дорогой к дешёвой;
+BLAS/OpenMP в процессе задачи ограничиваются тем же числом потоков.
+"""
+
+from __future__ import annotations
+
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from joblib import cpu_count, parallel_config
+from threadpoolctl import threadpool_limits
+
+
+@dataclass
+class Job:
+    key: str
+    fn: Callable[..., Any]
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    demand: int = 1  # сколько ядер задача может использовать
+    cost: float = 1.0  # относительная оценка длительности (порядок запуска)
+
+
+@dataclass
+class JobResult:
+    key: str
+    value: Any
+    n_jobs: int
+    start_s: float  # от начала расписания
+    end_s: float
+
+    @property
+    def seconds(self) -> float:
+        return self.end_s - self.start_s
+
+
+def resolve_cpu_budget(cpu_budget: int) -> int:
+    """0 или отрицательное — все доступные ядра."""
+    return cpu_budget if cpu_budget > 0 else cpu_count()
+
+
+def _call(fn: Callable[..., Any], kwargs: Dict[str, Any], n_jobs: int) -> Any:
+    with threadpool_limits(limits=n_jobs):
+        return fn(n_jobs=n_jobs, **kwargs)
+
+
+def _call_in_worker(fn: Callable[..., Any], kwargs: Dict[str, Any], n_jobs: int) -> Any:
+    # Вложенный joblib (n_jobs у поиска) — потоками: loky-пул внутри воркера
+    # оставлял бы процессы, мешающие пулу верхнего уровня завершиться
+    with parallel_config(backend="threading"):
+        return _call(fn, kwargs, n_jobs)
+
+
+def _allot(job: Job, free: int, reserve: int) -> int:
+    # Оставляем по ядру ожидающим однопоточным задачам, чтобы дорогая не заняла всё;
+    # многопоточные задачи могут подождать освобождения ядер
+    return max(1, min(job.demand, free - reserve))
+
+
+def run_jobs(
+    jobs: List[Job],
+    cpu_budget: int = 0,
+    max_parallel: int = 0,
+    on_done: Optional[Callable[[JobResult], None]] = None,
+) -> List[JobResult]:
+    """Выполняет задачи; результаты — в исходном порядке ``jobs``.
+
+    ``max_parallel=1`` — последовательный запуск в текущем процессе, каждой
+    задаче достаётся весь бюджет (прежнее поведение train.main).
+    """
+    budget = resolve_cpu_budget(cpu_budget)
+    limit = min(max_parallel if max_parallel > 0 else budget, budget, max(len(jobs), 1))
+    order = sorted(jobs, key=lambda j: -j.cost)
+    results: Dict[str, JobResult] = {}
+    t0 = time.perf_counter()
+
+    if limit == 1:
+        for job in order:
+            n_jobs = min(job.demand, budget)
+            start = time.perf_counter() - t0
+            value = _call(job.fn, job.kwargs, n_jobs)
+            res = JobResult(job.key, value, n_jobs, start, time.perf_counter() - t0)
+            results[job.key] = res
+            if on_done is not None:
+                on_done(res)
+        return [results[j.key] for j in jobs]
+
+    pending = list(order)
+    running: Dict[Any, tuple] = {}
+    free = budget
+    with ProcessPoolExecutor(max_workers=limit) as pool:
+        while pending or running:
+            while pending and free > 0 and len(running) < limit:
+                job = pending.pop(0)
+                singles = sum(1 for j in pending if j.demand == 1)
+                reserve = min(singles, limit - len(running) - 1)
+                n_jobs = _allot(job, free, reserve)
+                free -= n_jobs
+                future = pool.submit(_call_in_worker, job.fn, job.kwargs, n_jobs)
+                running[future] = (job, n_jobs, time.perf_counter() - t0)
+
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                job, n_jobs, start = running.pop(future)
+                free += n_jobs
+                res = JobResult(job.key, future.result(), n_jobs, start, time.perf_counter() - t0)
+                results[job.key] = res
+                if on_done is not None:
+                    on_done(res)
+
+    return [results[j.key] for j in jobs]
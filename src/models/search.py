@@ -0,0 +1,158 @@
+"""Режимы поиска гиперпараметров для ``src.models.train``.
+
+``random`` — прежний ``RandomizedSearchCV`` (n_iter кандидатов x cv фолдов на
+полном train). ``halving`` — successive halving: все кандидаты сначала
+оцениваются на малом ресурсе (подвыборка строк или число деревьев), в
+следующий раунд проходит лучшая ``1/factor`` часть с ресурсом в ``factor``
+раз больше. Бюджет задаётся в эквивалентах полных фитов (``budget_fits``,
+по умолчанию как у random: n_iter * cv); число кандидатов подбирается так,
+чтобы суммарная стоимость раундов в него укладывалась. Warm start (явные
+кандидаты из истории) — ``GridSearchCV``, в сводке ``mode="warm_grid"``.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import GridSearchCV, HalvingRandomSearchCV, RandomizedSearchCV
+
+SEARCH_MODES = ("random", "halving")
+HALVING_RESOURCES = ("n_samples", "n_estimators")
+
+
+@dataclass(frozen=True)
+class SearchConfig:
+    mode: str = "random"
+    n_iter: int = 10
+    cv: int = 3
+    resource: str = "n_samples"  # n_samples | n_estimators (для ансамблей)
+    factor: int = 3
+    min_resources: int = 0  # 0 — max_resources / factor**2 (три раунда)
+    budget_fits: float = 0.0  # 0 — n_iter * cv, как у random
+    random_state: int = 42
+    history_path: str = ""  # история поиска (src.models.search_history), "" — не вести
+    warm_start: bool = False
+    warm_min_drift: float = 0.05
+    warm_max_drift: float = 0.5
+    warm_min_fraction: float = 0.2
+
+    def __post_init__(self) -> None:
+        if self.mode not in SEARCH_MODES:
+            raise ValueError(f"search.mode must be one of {SEARCH_MODES}, got {self.mode!r}")
+        if self.resource not in HALVING_RESOURCES:
+            raise ValueError(f"search.resource must be one of {HALVING_RESOURCES}")
+
+    @classmethod
+    def from_params(cls, train_params: Dict[str, Any]) -> "SearchConfig":
+        search = dict(train_params.get("search", {}) or {})
+        search.setdefault("n_iter", int(train_params.get("n_iter_search", 10)))
+        return cls(**search)
+
+    @property
+    def budget(self) -> float:
+        return self.budget_fits if self.budget_fits > 0 else float(self.n_iter * self.cv)
+
+    @property
+    def full_candidates(self) -> int:
+        """Сколько кандидатов на полном ресурсе укладывается в бюджет."""
+        return max(1, int(round(self.budget / self.cv)))
+
+
+def _halving_plan(max_resources: int, cfg: SearchConfig) -> Tuple[int, int]:
+    """(min_resources, n_candidates) под бюджет ``cfg.budget`` полных фитов."""
+    r0 = cfg.min_resources or max(1, max_resources // cfg.factor**2)
+    r0 = min(r0, max_resources)
+    rounds = 1 + int(math.floor(math.log(max_resources / r0, cfg.factor) + 1e-9))
+    # Каждый раунд стоит ~ n_candidates * r0 / R * cv полных фитов
+    n_candidates = int(cfg.budget * max_resources / (rounds * r0 * cfg.cv))
+    return r0, max(cfg.factor, n_candidates)
+
+
+def build_search(
+    pipe,
+    param_distributions: Dict[str, Any],
+    cfg: SearchConfig,
+    n_samples: int,
+    n_jobs: int = -1,
+    candidates: Optional[List[Dict[str, Any]]] = None,
+):
+    """Объект поиска для пайплайна с шагом ``model``.
+
+    ``candidates`` — явный список конфигураций (warm start): каждая
+    оценивается на полном ресурсе, режим ``mode`` не используется.
+    """
+    if candidates:
+        return GridSearchCV(
+            estimator=pipe,
+            param_grid=[{k: [v] for k, v in c.items()} for c in candidates],
+            scoring="roc_auc",
+            cv=cfg.cv,
+            n_jobs=n_jobs,
+        )
+    if cfg.mode == "random":
+        return RandomizedSearchCV(
+            estimator=pipe,
+            param_distributions=param_distributions,
+            n_iter=cfg.n_iter,
+            scoring="roc_auc",
+            cv=cfg.cv,
+            n_jobs=n_jobs,
+            random_state=cfg.random_state,
+        )
+
+    distributions = dict(param_distributions)
+    resource = "n_samples"
+    max_resources = n_samples
+    model = pipe.named_steps["model"]
+    if cfg.resource == "n_estimators" and "n_estimators" in model.get_params():
+        # Ресурс — число деревьев: из сетки его убираем, максимум берём из неё
+        grid = distributions.pop("model__n_estimators", [model.get_params()["n_estimators"]])
+        resource = "model__n_estimators"
+        max_resources = int(max(grid))
+
+    min_resources, n_candidates = _halving_plan(max_resources, cfg)
+    return HalvingRandomSearchCV(
+        estimator=pipe,
+        param_distributions=distributions,
+        n_candidates=n_candidates,
+        factor=cfg.factor,
+        resource=resource,
+        max_resources=max_resources,
+        min_resources=min_resources,
+        scoring="roc_auc",
+        cv=cfg.cv,
+        n_jobs=n_jobs,
+        random_state=cfg.random_state,
+    )
+
+
+def search_summary(search, seconds: Optional[float] = None) -> Dict[str, Any]:
+    """Сколько кандидатов/раундов реально отработало и во что это обошлось."""
+    info: Dict[str, Any] = {"n_splits": int(search.n_splits_)}
+    if isinstance(search, HalvingRandomSearchCV):
+        full = float(search.max_resources_)
+        info.update(
+            mode="halving",
+            resource=search.resource,
+            n_candidates=[int(c) for c in search.n_candidates_],
+            n_resources=[int(r) for r in search.n_resources_],
+            full_fit_equivalents=round(
+                sum(c * r / full for c, r in zip(search.n_candidates_, search.n_resources_))
+                * search.n_splits_,
+                2,
+            ),
+        )
+    else:
+        # GridSearchCV строится только для warm start (явные кандидаты)
+        n = len(search.cv_results_["params"])
+        info.update(
+            mode="warm_grid" if isinstance(search, GridSearchCV) else "random",
+            n_candidates=[n],
+            full_fit_equivalents=float(n * search.n_splits_),
+        )
+    if seconds is not None:
+        info["seconds"] = round(seconds, 3)
+    return info
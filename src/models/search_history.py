@@ -0,0 +1,229 @@
+"""История поиска гиперпараметров и warm start следующего retrain.
+
+После каждого поиска сохраняются лучшие конфигурации (параметры + CV-score)
+и «отпечаток» обучающих данных: размер, доля target, сводные статистики
+числовых колонок и частоты категорий. Следующий запуск сравнивает отпечатки:
+если данные почти не сдвинулись, поиск стартует с лучших прошлых конфигураций
+и их соседей по сетке, а бюджет уменьшается; чем больше сдвиг, тем ближе
+бюджет к полному, при большом сдвиге поиск идёт с нуля.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import math
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+HISTORY_VERSION = 1
+MAX_RUNS_PER_EXPERIMENT = 10
+TOP_CONFIGS = 5
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+def _jsonable(value: Any) -> Any:
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def data_fingerprint(
+    X: pd.DataFrame, y: Optional[pd.Series] = None, categorical_cols: Sequence[str] = ()
+) -> Dict[str, Any]:
+    numeric: Dict[str, Dict[str, Any]] = {}
+    categorical: Dict[str, Dict[str, float]] = {}
+    for c in X.columns:
+        s = X[c]
+        if pd.api.types.is_numeric_dtype(s) and c not in categorical_cols:
+            v = s.to_numpy(dtype=float)
+            numeric[c] = {
+                "mean": float(np.nanmean(v)),
+                "std": float(np.nanstd(v)),
+                "q": [float(q) for q in np.nanquantile(v, QUANTILES)],
+            }
+        else:
+            freq = s.astype(str).value_counts(normalize=True)
+            categorical[c] = {str(k): round(float(p), 6) for k, p in freq.items()}
+    fp: Dict[str, Any] = {"rows": int(len(X)), "numeric": numeric, "categorical": categorical}
+    if y is not None:
+        fp["target_rate"] = float(np.mean(y))
+    fp["sha256"] = hashlib.sha256(json.dumps(fp, sort_keys=True).encode("utf-8")).hexdigest()
+    return fp
+
+
+def fingerprint_distance(prev: Dict[str, Any], cur: Dict[str, Any]) -> float:
+    """Наибольший сдвиг по колонкам: для чисел — в единицах прошлого std,
+    для категорий — total variation distance. Новые/пропавшие колонки — inf."""
+    if prev.get("sha256") == cur.get("sha256"):
+        return 0.0
+    if set(prev["numeric"]) != set(cur["numeric"]) or set(prev["categorical"]) != set(
+        cur["categorical"]
+    ):
+        return math.inf
+
+    shifts = [0.0]
+    for c, p in prev["numeric"].items():
+        q = cur["numeric"][c]
+        scale = p["std"] if p["std"] > 0 else 1.0
+        shifts.append(abs(q["mean"] - p["mean"]) / scale)
+        shifts.extend(abs(a - b) / scale for a, b in zip(q["q"], p["q"]))
+    for c, p in prev["categorical"].items():
+        q = cur["categorical"][c]
+        keys = set(p) | set(q)
+        shifts.append(0.5 * sum(abs(p.get(k, 0.0) - q.get(k, 0.0)) for k in keys))
+    if "target_rate" in prev and "target_rate" in cur:
+        rate = prev["target_rate"]
+        scale = math.sqrt(rate * (1 - rate)) or 1.0
+        shifts.append(abs(cur["target_rate"] - rate) / scale)
+    return float(max(shifts))
+
+
+def load_history(path: Path) -> Dict[str, Any]:
+    path = Path(path)
+    if not path.exists():
+        return {"version": HISTORY_VERSION, "experiments": {}}
+    history = json.loads(path.read_text(encoding="utf-8"))
+    if history.get("version") != HISTORY_VERSION:
+        return {"version": HISTORY_VERSION, "experiments": {}}
+    return history
+
+
+def save_history(path: Path, history: Dict[str, Any]) -> None:
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(history, ensure_ascii=False, indent=2), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+def top_configs(cv_results: Dict[str, Any], k: int = TOP_CONFIGS) -> List[Dict[str, Any]]:
+    """Лучшие конфигурации из ``cv_results_`` (для halving — только последний раунд)."""
+    scores = np.asarray(cv_results["mean_test_score"], dtype=float)
+    idx = np.arange(len(scores))
+    if "iter" in cv_results:
+        idx = idx[np.asarray(cv_results["iter"]) == np.max(cv_results["iter"])]
+    idx = [i for i in idx if np.isfinite(scores[i])]
+    idx = sorted(idx, key=lambda i: -scores[i])[:k]
+    return [
+        {
+            "params": {p: _jsonable(v) for p, v in cv_results["params"][i].items()},
+            "score": float(scores[i]),
+        }
+        for i in idx
+    ]
+
+
+def record_search(
+    history: Dict[str, Any],
+    run_name: str,
+    fingerprint: Dict[str, Any],
+    configs: List[Dict[str, Any]],
+    search_info: Dict[str, Any],
+) -> None:
+    runs = history["experiments"].setdefault(run_name, [])
+    runs.append(
+        {
+            "at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "fingerprint": fingerprint,
+            "configs": configs,
+            "search": search_info,
+        }
+    )
+    del runs[:-MAX_RUNS_PER_EXPERIMENT]
+
+
+@dataclass
+class WarmStart:
+    candidates: List[Dict[str, Any]]
+    drift: float
+    budget_fraction: float
+
+
+def _same(a: Any, b: Any) -> bool:
+    if isinstance(a, float) and isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9)
+    return a == b
+
+
+def _index_of(values: List[Any], value: Any) -> Optional[int]:
+    for i, v in enumerate(values):
+        if _same(_jsonable(v), value):
+            return i
+    return None
+
+
+def _neighbourhood(param_distributions: Dict[str, Any], seeds: List[Dict[str, Any]]):
+    """Сетка, суженная до значений рядом (±1 позиция) с лучшими прошлыми."""
+    shrunk: Dict[str, List[Any]] = {}
+    for name, values in param_distributions.items():
+        values = list(values)
+        keep = set()
+        for seed in seeds:
+            i = _index_of(values, seed.get(name))
+            if i is not None:
+                keep.update(j for j in (i - 1, i, i + 1) if 0 <= j < len(values))
+        shrunk[name] = [_jsonable(values[j]) for j in sorted(keep)] or [
+            _jsonable(v) for v in values
+        ]
+    return shrunk
+
+
+def plan_warm_start(
+    runs: List[Dict[str, Any]],
+    fingerprint: Dict[str, Any],
+    param_distributions: Dict[str, Any],
+    full_candidates: int,
+    min_drift: float = 0.05,
+    max_drift: float = 0.5,
+    min_fraction: float = 0.2,
+    random_state: int = 42,
+) -> Optional[WarmStart]:
+    """Кандидаты warm start или None, если истории нет или данные сдвинулись сильно.
+
+    Доля бюджета линейно растёт от ``min_fraction`` (сдвиг <= ``min_drift``)
+    до 1 (сдвиг ``max_drift``); дальше — холодный поиск.
+    """
+    if not runs or not runs[-1].get("configs"):
+        return None
+    last = runs[-1]
+    drift = fingerprint_distance(last["fingerprint"], fingerprint)
+    if drift >= max_drift:
+        return None
+
+    t = min(max((drift - min_drift) / (max_drift - min_drift), 0.0), 1.0)
+    fraction = min_fraction + (1.0 - min_fraction) * t
+    n_candidates = max(1, int(math.ceil(full_candidates * fraction)))
+
+    names = set(param_distributions)
+    seeds = [{k: v for k, v in c["params"].items() if k in names} for c in last["configs"]][
+        : max(1, min(n_candidates, TOP_CONFIGS))
+    ]
+    grid = _neighbourhood(param_distributions, seeds)
+    rng = np.random.default_rng(random_state)
+
+    def complete(cand: Dict[str, Any]) -> Dict[str, Any]:
+        # Параметры, которых не было в прошлом поиске (например, ресурс halving)
+        return {k: cand[k] if k in cand else v[int(rng.integers(len(v)))] for k, v in grid.items()}
+
+    candidates: List[Dict[str, Any]] = []
+    for seed in seeds:
+        cand = complete(seed)
+        if cand not in candidates:
+            candidates.append(cand)
+
+    total = int(np.prod([len(v) for v in grid.values()])) if grid else 0
+    attempts = 0
+    while len(candidates) < min(n_candidates, total) and attempts < 50 * n_candidates:
+        attempts += 1
+        cand = complete({})
+        if cand not in candidates:
+            candidates.append(cand)
+    if not candidates or not grid:
+        return None
+    return WarmStart(candidates=candidates, drift=drift, budget_fraction=fraction)
@@ -0,0 +1,178 @@
+"""Выбор модели с учётом задержки инференса (SLO) для ``src.models.train``.
+
+Каждый кандидат после обучения замеряется на serving-размерах батча
+(``selection.batch_sizes``: 1 — ``/predict``, больше — ``/predict/batch``):
+p50/p95/p99 задержки одного вызова ``predict_proba`` в одном потоке и размер
+сериализованной модели. Побеждает лучший ROC-AUC среди кандидатов, чей p95
+укладывается в SLO на каждом размере батча; если SLO не выполняет никто —
+самый быстрый кандидат (с пометкой в отчёте). Фронт Парето AUC/задержка
+пишется в ``reports/`` и MLflow.
+"""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import joblib
+import matplotlib.pyplot as plt
+import pandas as pd
+from threadpoolctl import threadpool_limits
+
+from src.models.latency import measure_latency
+
+
+@dataclass(frozen=True)
+class SelectionConfig:
+    batch_sizes: Sequence[int] = (1, 64)
+    # p95 задержки вызова (мс) по размеру батча; пусто — выбор только по AUC
+    latency_slo_ms: Dict[int, float] = field(default_factory=dict)
+    max_size_mb: float = 0.0  # 0 — без ограничения
+    repeats: int = 50
+    warmup: int = 5
+    random_state: int = 42
+
+    def __post_init__(self):
+        # Батч из SLO, который не меряется, валил бы всех кандидатов (и latency_key)
+        missing = sorted(set(self.latency_slo_ms) - set(self.batch_sizes))
+        if missing:
+            object.__setattr__(self, "batch_sizes", tuple(self.batch_sizes) + tuple(missing))
+
+    @classmethod
+    def from_params(cls, train_params: Dict[str, Any]) -> "SelectionConfig":
+        cfg = dict(train_params.get("selection", {}) or {})
+        if "batch_sizes" in cfg:
+            cfg["batch_sizes"] = tuple(int(b) for b in cfg["batch_sizes"])
+        cfg["latency_slo_ms"] = {
+            int(b): float(ms) for b, ms in (cfg.get("latency_slo_ms") or {}).items()
+        }
+        return cls(**cfg)
+
+
+def model_size_bytes(model) -> int:
+    buf = io.BytesIO()
+    joblib.dump(model, buf)
+    return buf.getbuffer().nbytes
+
+
+def benchmark_latency(
+    model, X: pd.DataFrame, batch_sizes: Sequence[int], repeats: int, warmup: int, seed: int = 42
+) -> Dict[int, Dict[str, float]]:
+    """Задержка ``predict_proba`` (мс на вызов) по размерам батча."""
+    original = {k: v for k, v in model.get_params().items() if k.endswith("n_jobs")}
+    # Serving-процесс API однопоточный: RF с n_jobs=-1 иначе мерился бы на всех ядрах
+    model.set_params(**{k: 1 for k in original})
+    try:
+        with threadpool_limits(limits=1):
+            return measure_latency(model.predict_proba, X, batch_sizes, repeats, warmup, seed)
+    finally:
+        model.set_params(**original)
+
+
+def meets_slo(candidate: Dict[str, Any], cfg: SelectionConfig) -> bool:
+    for bs, slo in cfg.latency_slo_ms.items():
+        lat = candidate["latency"].get(bs)
+        if lat is None or lat["p95_ms"] > slo:
+            return False
+    if cfg.max_size_mb > 0 and candidate["size_mb"] > cfg.max_size_mb:
+        return False
+    return True
+
+
+def latency_key(candidate: Dict[str, Any], cfg: SelectionConfig) -> float:
+    """Задержка для фронта Парето: p95 на батче из SLO (иначе — на наибольшем)."""
+    bs = max(cfg.latency_slo_ms) if cfg.latency_slo_ms else max(candidate["latency"])
+    return candidate["latency"][bs]["p95_ms"]
+
+
+def pareto_front(candidates: List[Dict[str, Any]], cfg: SelectionConfig) -> List[str]:
+    """Кандидаты, которых никто не превосходит сразу по AUC и задержке."""
+    front = []
+    for c in candidates:
+        dominated = any(
+            o["roc_auc"] >= c["roc_auc"]
+            and latency_key(o, cfg) <= latency_key(c, cfg)
+            and (o["roc_auc"] > c["roc_auc"] or latency_key(o, cfg) < latency_key(c, cfg))
+            for o in candidates
+        )
+        if not dominated:
+            front.append(c["run_name"])
+    return front
+
+
+def select_model(candidates: List[Dict[str, Any]], cfg: SelectionConfig) -> Dict[str, Any]:
+    """Отчёт выбора; ``candidates`` — в порядке экспериментов (при равном AUC — первый)."""
+    for c in candidates:
+        c["slo_met"] = meets_slo(c, cfg)
+    feasible = [c for c in candidates if c["slo_met"]]
+    if feasible:
+        best = max(feasible, key=lambda c: c["roc_auc"])
+    else:
+        best = min(candidates, key=lambda c: latency_key(c, cfg))
+    best_auc = max(candidates, key=lambda c: c["roc_auc"])
+    return {
+        "batch_sizes": list(cfg.batch_sizes),
+        "latency_slo_ms": {str(k): v for k, v in cfg.latency_slo_ms.items()},
+        "max_size_mb": cfg.max_size_mb,
+        "selected": best["run_name"],
+        "slo_met": bool(best["slo_met"]),
+        "best_auc_run": best_auc["run_name"],
+        "auc_given_up": round(best_auc["roc_auc"] - best["roc_auc"], 4),
+        "pareto_front": pareto_front(candidates, cfg),
+        "candidates": candidates,
+    }
+
+
+def plot_pareto(report: Dict[str, Any], cfg: SelectionConfig, out_path: Path) -> None:
+    candidates = report["candidates"]
+    front = set(report["pareto_front"])
+    x = [latency_key(c, cfg) for c in candidates]
+    y = [c["roc_auc"] for c in candidates]
+    plt.figure()
+    plt.scatter(x, y, c=["tab:red" if c["run_name"] in front else "tab:gray" for c in candidates])
+    for c, xi, yi in zip(candidates, x, y):
+        label = c["run_name"] + (" *" if c["run_name"] == report["selected"] else "")
+        plt.annotate(label, (xi, yi), textcoords="offset points", xytext=(4, 4), fontsize=8)
+    if cfg.latency_slo_ms:
+        plt.axvline(cfg.latency_slo_ms[max(cfg.latency_slo_ms)], linestyle="--", color="tab:blue")
+    plt.xscale("log")
+    bs = max(cfg.latency_slo_ms) if cfg.latency_slo_ms else max(cfg.batch_sizes)
+    plt.xlabel(f"p95 latency, ms (batch={bs})")
+    plt.ylabel("ROC-AUC")
+    plt.title("AUC vs latency (red — Pareto front, * — selected)")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    plt.savefig(out_path, dpi=150, bbox_inches="tight")
+    plt.close()
+
+
+def candidate_entry(
+    run_name: str, model, roc_auc: float, X: pd.DataFrame, cfg: SelectionConfig
+) -> Dict[str, Any]:
+    size = model_size_bytes(model)
+    return {
+        "run_name": run_name,
+        "roc_auc": round(float(roc_auc), 4),
+        "size_mb": round(size / 2**20, 3),
+        "latency": benchmark_latency(
+            model, X, cfg.batch_sizes, cfg.repeats, cfg.warmup, cfg.random_state
+        ),
+    }
+
+
+def describe(report: Dict[str, Any]) -> List[str]:
+    lines = []
+    for c in report["candidates"]:
+        lat = ", ".join(f"b{bs} p95={v['p95_ms']:.2f}ms" for bs, v in c["latency"].items())
+        flag = "ok" if c["slo_met"] else "SLO!"
+        lines.append(
+            f"  {c['run_name']}: auc={c['roc_auc']:.4f} {lat} size={c['size_mb']:.2f}MB {flag}"
+        )
+    return lines
+
+
+def slo_summary(cfg: SelectionConfig) -> Optional[str]:
+    if not cfg.latency_slo_ms:
+        return None
+    return ", ".join(f"b{bs} p95<={ms}ms" for bs, ms in sorted(cfg.latency_slo_ms.items()))
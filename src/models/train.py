@@ -1,19 +1,53 @@
 import argparse
+import json
+import tempfile
+import time
+from dataclasses import dataclass, field, replace
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 
 import joblib
+from joblib import Memory
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import yaml
-from sklearn.ensemble import GradientBoostingClassifier, RandomForestClassifier
+from sklearn.base import clone
+from sklearn.ensemble import (
+    GradientBoostingClassifier,
+    HistGradientBoostingClassifier,
+    RandomForestClassifier,
+)
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score, roc_curve
-from sklearn.model_selection import RandomizedSearchCV, train_test_split
+from sklearn.model_selection import train_test_split
 from sklearn.pipeline import Pipeline
 from sklearn.svm import SVC
 
+from src.data.columnar import read_dataset
+from src.models.hgb import build_hgb, build_native_preprocessor, categorical_mask
+from src.models.onnx_export import describe as describe_onnx
+from src.models.onnx_export import export_selected
 from src.models.pipeline import Schema, build_preprocessor, get_feature_lists, split_xy
+from src.models.search import SEARCH_MODES, SearchConfig, build_search, search_summary
+from src.models.selection import (
+    SelectionConfig,
+    candidate_entry,
+    describe,
+    plot_pareto,
+    select_model,
+    slo_summary,
+)
+from src.models.search_history import (
+    WarmStart,
+    data_fingerprint,
+    load_history,
+    plan_warm_start,
+    record_search,
+    save_history,
+    top_configs,
+)
+from src.models.scheduler import Job, JobResult, resolve_cpu_budget, run_jobs
 
 
 try:
@@ -26,6 +60,15 @@ except Exception:  # pragma: no cover
     _MLFLOW_AVAILABLE = False
 
 
+# Верхняя граница кэша препроцессинга (joblib Memory), старые записи вытесняются
+PREPROCESSING_CACHE_LIMIT = "2G"
+
+# Модели, которые сами параллелят обучение через n_jobs
+MULTICORE_ESTIMATORS = (RandomForestClassifier,)
+# Параллелят через OpenMP: потоки ограничивает threadpool_limits планировщика
+THREADED_ESTIMATORS = (HistGradientBoostingClassifier,)
+
+
 def load_params() -> dict:
     with open("params.yaml", "r", encoding="utf-8") as f:
         return yaml.safe_load(f)
@@ -53,7 +96,78 @@ def save_roc_curve(y_true, y_proba, out_path: Path) -> None:
     plt.close()
 
 
-def run_one_experiment(
+def param_distributions_for(estimator) -> dict:
+    if isinstance(estimator, LogisticRegression):
+        return {
+            "model__C": np.logspace(-3, 1, 20),
+            "model__solver": ["lbfgs", "liblinear"],
+            "model__max_iter": [500],
+        }
+    if isinstance(estimator, RandomForestClassifier):
+        return {
+            "model__n_estimators": [200, 400, 600],
+            "model__max_depth": [None, 5, 10, 15],
+            "model__min_samples_split": [2, 5, 10],
+        }
+    if isinstance(estimator, GradientBoostingClassifier):
+        return {
+            "model__n_estimators": [100, 200, 400],
+            "model__learning_rate": [0.03, 0.05, 0.1],
+            "model__max_depth": [2, 3, 4],
+        }
+    if isinstance(estimator, HistGradientBoostingClassifier):
+        return {
+            "model__learning_rate": [0.03, 0.05, 0.1, 0.2],
+            "model__max_leaf_nodes": [15, 31, 63],
+            "model__min_samples_leaf": [20, 50, 100],
+            "model__l2_regularization": [0.0, 0.1, 1.0],
+        }
+    if isinstance(estimator, SVC):
+        return {
+            "model__C": np.logspace(-2, 2, 10),
+            "model__gamma": ["scale", "auto"],
+            "model__kernel": ["rbf"],
+        }
+    return {}
+
+
+@dataclass
+class Experiment:
+    name: str
+    estimator: Any
+    tune: bool
+    cost: float = 1.0  # относительная длительность: дорогие запускаются первыми
+
+    @property
+    def run_name(self) -> str:
+        return f"{self.name}{'_tuned' if self.tune else ''}"
+
+    @property
+    def parallel(self) -> bool:
+        """Может ли эксперимент занять несколько ядер (поиск или n_jobs у модели)."""
+        return self.tune or isinstance(self.estimator, MULTICORE_ESTIMATORS + THREADED_ESTIMATORS)
+
+
+@dataclass
+class ExperimentResult:
+    name: str
+    tune: bool
+    metrics: dict
+    model: Any
+    y_proba: np.ndarray
+    best_params: dict
+    cv_best: Optional[float]
+    cat_cols: List[str]
+    num_cols: List[str]
+    search_info: dict = field(default_factory=dict)
+    search_top: List[dict] = field(default_factory=list)
+
+    @property
+    def run_name(self) -> str:
+        return f"{self.name}{'_tuned' if self.tune else ''}"
+
+
+def fit_experiment(
     name: str,
     estimator,
     X_train,
@@ -62,101 +176,309 @@ def run_one_experiment(
     y_test,
     tune: bool,
     n_iter: int,
-):
+    n_jobs: int = -1,
+    cache_dir: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+    warm_start: Optional[WarmStart] = None,
+) -> ExperimentResult:
+    """Обучение и метрики без побочных эффектов (можно запускать в отдельном процессе).
+
+    ``cache_dir`` включает joblib-кэш шага ``prep``: на одном фолде (и на всём
+    train) препроцессор обучается один раз для всех кандидатов и экспериментов.
+    """
     schema = Schema()
     cat_cols, num_cols = get_feature_lists(pd.concat([X_train, X_test], axis=0), schema)
-    preprocessor = build_preprocessor(cat_cols, num_cols)
-
-    pipe = Pipeline(steps=[("prep", preprocessor), ("model", estimator)])
-
-    run_name = f"{name}{'_tuned' if tune else ''}"
+    estimator = clone(estimator)
+    if isinstance(estimator, HistGradientBoostingClassifier):
+        # Нативные категории вместо one-hot, пропуски и масштаб — на стороне модели
+        preprocessor = build_native_preprocessor(cat_cols, num_cols)
+        estimator.set_params(categorical_features=categorical_mask(cat_cols, num_cols))
+    else:
+        preprocessor = build_preprocessor(cat_cols, num_cols)
+    if isinstance(estimator, MULTICORE_ESTIMATORS) and not tune:
+        estimator.set_params(n_jobs=n_jobs)
+    pipe = Pipeline(steps=[("prep", preprocessor), ("model", estimator)], memory=cache_dir)
 
     final_model = pipe
+    search_info: dict = {}
+    search_top: List[dict] = []
 
     if tune:
-        param_distributions = {}
-        if isinstance(estimator, LogisticRegression):
-            param_distributions = {
-                "model__C": np.logspace(-3, 1, 20),
-                "model__solver": ["lbfgs", "liblinear"],
-                "model__max_iter": [500],
-            }
-        elif isinstance(estimator, RandomForestClassifier):
-            param_distributions = {
-                "model__n_estimators": [200, 400, 600],
-                "model__max_depth": [None, 5, 10, 15],
-                "model__min_samples_split": [2, 5, 10],
-            }
-        elif isinstance(estimator, GradientBoostingClassifier):
-            param_distributions = {
-                "model__n_estimators": [100, 200, 400],
-                "model__learning_rate": [0.03, 0.05, 0.1],
-                "model__max_depth": [2, 3, 4],
-            }
-        elif isinstance(estimator, SVC):
-            param_distributions = {
-                "model__C": np.logspace(-2, 2, 10),
-                "model__gamma": ["scale", "auto"],
-                "model__kernel": ["rbf"],
-            }
-
-        search = RandomizedSearchCV(
-            estimator=pipe,
-            param_distributions=param_distributions,
-            n_iter=n_iter,
-            scoring="roc_auc",
-            cv=3,
-            n_jobs=-1,
-            random_state=42,
+        cfg = search if search is not None else SearchConfig(n_iter=n_iter)
+        searcher = build_search(
+            pipe,
+            param_distributions_for(estimator),
+            cfg,
+            n_samples=len(X_train),
+            n_jobs=n_jobs,
+            candidates=warm_start.candidates if warm_start is not None else None,
         )
-        search.fit(X_train, y_train)
-        final_model = search.best_estimator_
-        best_params = search.best_params_
-        cv_best = float(search.best_score_)
+        t0 = time.perf_counter()
+        searcher.fit(X_train, y_train)
+        search_info = search_summary(searcher, time.perf_counter() - t0)
+        if warm_start is not None:
+            search_info["drift"] = round(warm_start.drift, 4)
+            search_info["budget_fraction"] = round(warm_start.budget_fraction, 3)
+        search_top = top_configs(searcher.cv_results_)
+        final_model = searcher.best_estimator_
+        best_params = searcher.best_params_
+        cv_best = float(searcher.best_score_)
     else:
         final_model.fit(X_train, y_train)
         best_params = {}
         cv_best = None
+    # Сохранённая модель не должна ссылаться на локальный кэш
+    final_model.set_params(memory=None)
 
     y_proba = final_model.predict_proba(X_test)[:, 1]
     y_pred = (y_proba >= 0.5).astype(int)
-    metrics = eval_metrics(y_test, y_proba, y_pred)
+    return ExperimentResult(
+        name=name,
+        tune=tune,
+        metrics=eval_metrics(y_test, y_proba, y_pred),
+        model=final_model,
+        y_proba=y_proba,
+        best_params=best_params,
+        cv_best=cv_best,
+        cat_cols=cat_cols,
+        num_cols=num_cols,
+        search_info=search_info,
+        search_top=search_top,
+    )
 
-    roc_path = Path("artifacts") / f"roc_{run_name}.png"
-    save_roc_curve(y_test, y_proba, roc_path)
+
+def log_experiment(result: ExperimentResult, y_test, n_jobs: Optional[int] = None) -> None:
+    """ROC-кривая и MLflow-run; вызывается в основном процессе по мере готовности."""
+    roc_path = Path("artifacts") / f"roc_{result.run_name}.png"
+    save_roc_curve(y_test, result.y_proba, roc_path)
 
     if not _MLFLOW_AVAILABLE:
-        return metrics, final_model
-
-    with mlflow.start_run(run_name=run_name):
-        mlflow.log_param("model_name", name)
-        mlflow.log_param("tuned", tune)
-        mlflow.log_param("cat_cols", ",".join(cat_cols))
-        mlflow.log_param("num_cols_count", len(num_cols))
-        if best_params:
-            mlflow.log_params(best_params)
-        if cv_best is not None:
-            mlflow.log_metric("cv_best_score", cv_best)
-
-        mlflow.log_metrics(metrics)
+        return
+
+    with mlflow.start_run(run_name=result.run_name):
+        mlflow.log_param("model_name", result.name)
+        mlflow.log_param("tuned", result.tune)
+        mlflow.log_param("cat_cols", ",".join(result.cat_cols))
+        mlflow.log_param("num_cols_count", len(result.num_cols))
+        if n_jobs is not None:
+            mlflow.log_param("n_jobs", n_jobs)
+        if result.best_params:
+            mlflow.log_params(result.best_params)
+        if result.cv_best is not None:
+            mlflow.log_metric("cv_best_score", result.cv_best)
+        if result.search_info:
+            mlflow.log_param("search_mode", result.search_info["mode"])
+            mlflow.log_metric("search_seconds", result.search_info["seconds"])
+            mlflow.log_metric(
+                "search_full_fit_equivalents", result.search_info["full_fit_equivalents"]
+            )
+
+        mlflow.log_metrics(result.metrics)
         mlflow.log_artifact(str(roc_path))
-        mlflow.sklearn.log_model(final_model, artifact_path="model")
+        mlflow.sklearn.log_model(result.model, artifact_path="model")
+
+
+def run_one_experiment(
+    name: str,
+    estimator,
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    tune: bool,
+    n_iter: int,
+):
+    result = fit_experiment(name, estimator, X_train, y_train, X_test, y_test, tune, n_iter)
+    log_experiment(result, y_test)
+    return result.metrics, result.model
+
+
+def default_experiments() -> List[Experiment]:
+    # >= 5 experiments total; cost — грубая относительная оценка времени на 30k строк
+    return [
+        Experiment("logreg", LogisticRegression(max_iter=500), False, cost=1),
+        Experiment("logreg", LogisticRegression(max_iter=500), True, cost=20),
+        Experiment("rf", RandomForestClassifier(random_state=42), False, cost=10),
+        Experiment("rf", RandomForestClassifier(random_state=42), True, cost=200),
+        Experiment("gb", GradientBoostingClassifier(random_state=42), False, cost=15),
+        Experiment("hgb", build_hgb(), False, cost=5),
+        Experiment("svc", SVC(probability=True, random_state=42), False, cost=150),
+    ]
+
+
+def run_experiments(
+    experiments: List[Experiment],
+    X_train,
+    y_train,
+    X_test,
+    y_test,
+    n_iter: int,
+    cpu_budget: int = 0,
+    max_parallel: int = 0,
+    on_done: Optional[Callable[[JobResult], None]] = None,
+    cache_dir: Optional[str] = None,
+    search: Optional[SearchConfig] = None,
+    warm: Optional[Dict[str, WarmStart]] = None,
+) -> List[JobResult]:
+    budget = resolve_cpu_budget(cpu_budget)
+    data = {"X_train": X_train, "y_train": y_train, "X_test": X_test, "y_test": y_test}
+    jobs = [
+        Job(
+            key=exp.run_name,
+            fn=fit_experiment,
+            kwargs={
+                "name": exp.name,
+                "estimator": exp.estimator,
+                "tune": exp.tune,
+                "n_iter": n_iter,
+                "cache_dir": cache_dir,
+                "search": search,
+                "warm_start": (warm or {}).get(exp.run_name),
+                **data,
+            },
+            demand=budget if exp.parallel else 1,
+            cost=exp.cost,
+        )
+        for exp in experiments
+    ]
+    return run_jobs(jobs, cpu_budget=budget, max_parallel=max_parallel, on_done=on_done)
+
+
+def plan_warm_starts(
+    experiments: List[Experiment],
+    history: dict,
+    fingerprint: dict,
+    search: SearchConfig,
+) -> Dict[str, WarmStart]:
+    """Warm start для tuned-экспериментов, у которых есть история на близких данных."""
+    warm: Dict[str, WarmStart] = {}
+    for exp in experiments:
+        if not exp.tune:
+            continue
+        ws = plan_warm_start(
+            history["experiments"].get(exp.run_name, []),
+            fingerprint,
+            param_distributions_for(exp.estimator),
+            full_candidates=search.full_candidates,
+            min_drift=search.warm_min_drift,
+            max_drift=search.warm_max_drift,
+            min_fraction=search.warm_min_fraction,
+            random_state=search.random_state,
+        )
+        if ws is not None:
+            warm[exp.run_name] = ws
+    return warm
 
-    return metrics, final_model
+
+def log_selection(selection: dict, cfg: SelectionConfig, report_path: Path) -> None:
+    """Отчёт выбора модели и график Парето — в reports/ и MLflow."""
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(selection, indent=2), encoding="utf-8")
+    plot_path = report_path.with_name(report_path.stem + "_pareto.png")
+    plot_pareto(selection, cfg, plot_path)
+    if not _MLFLOW_AVAILABLE:
+        return
+    with mlflow.start_run(run_name="selection"):
+        mlflow.log_param("selected", selection["selected"])
+        mlflow.log_param("latency_slo", slo_summary(cfg) or "none")
+        mlflow.log_param("pareto_front", ",".join(selection["pareto_front"]))
+        mlflow.log_metric("slo_met", int(selection["slo_met"]))
+        mlflow.log_metric("auc_given_up", selection["auc_given_up"])
+        for c in selection["candidates"]:
+            mlflow.log_metric(f"{c['run_name']}_roc_auc", c["roc_auc"])
+            mlflow.log_metric(f"{c['run_name']}_size_mb", c["size_mb"])
+            for bs, lat in c["latency"].items():
+                mlflow.log_metric(f"{c['run_name']}_p95_ms_b{bs}", lat["p95_ms"])
+        mlflow.log_artifact(str(report_path))
+        mlflow.log_artifact(str(plot_path))
+
+
+def schedule_report(results: List[JobResult], cpu_budget: int, max_parallel: int) -> dict:
+    wall = max((r.end_s for r in results), default=0.0)
+    return {
+        "cpu_budget": cpu_budget,
+        "max_parallel": max_parallel,
+        "wall_seconds": round(wall, 3),
+        "sum_task_seconds": round(sum(r.seconds for r in results), 3),
+        "experiments": [
+            {
+                "run_name": r.key,
+                "n_jobs": r.n_jobs,
+                "start_s": round(r.start_s, 3),
+                "end_s": round(r.end_s, 3),
+                "seconds": round(r.seconds, 3),
+                "roc_auc": r.value.metrics["roc_auc"],
+                **({"search": r.value.search_info} if r.value.search_info else {}),
+            }
+            for r in results
+        ],
+    }
 
 
 def main() -> None:
     parser = argparse.ArgumentParser()
     parser.add_argument("--data-path", required=True)
     parser.add_argument("--model-path", required=True)
+    parser.add_argument(
+        "--cpu-budget", type=int, default=None, help="Ядер на все эксперименты (0 — все)"
+    )
+    parser.add_argument(
+        "--max-parallel", type=int, default=None, help="Одновременных экспериментов (1 — serial)"
+    )
+    parser.add_argument(
+        "--compare-serial",
+        action="store_true",
+        help="Дополнительно прогнать serial-расписание (без MLflow) и сравнить wall-clock",
+    )
+    parser.add_argument("--report-path", default="reports/train_schedule.json")
+    parser.add_argument("--selection-report-path", default="reports/model_selection.json")
+    parser.add_argument("--onnx-path", default="models/model.onnx")
+    parser.add_argument("--onnx-report-path", default="reports/model_onnx.json")
+    parser.add_argument(
+        "--no-onnx",
+        action="store_true",
+        help="Не экспортировать выбранную модель в ONNX (без проверки паритета и замера ORT)",
+    )
+    parser.add_argument(
+        "--search-mode",
+        choices=SEARCH_MODES,
+        default=None,
+        help="Переопределить train.search.mode из params.yaml",
+    )
+    parser.add_argument(
+        "--cold-start",
+        action="store_true",
+        help="Игнорировать историю поиска (она всё равно дополняется)",
+    )
+    parser.add_argument(
+        "--no-preprocessing-cache",
+        action="store_true",
+        help="Не кэшировать обученный препроцессор между фолдами/экспериментами",
+    )
     args = parser.parse_args()
 
     params = load_params()
-    test_size = float(params.get("train", {}).get("test_size", 0.2))
-    random_state = int(params.get("train", {}).get("random_state", 42))
-    n_iter = int(params.get("train", {}).get("n_iter_search", 10))
-
-    df = pd.read_csv(args.data_path)
+    train_params = params.get("train", {})
+    test_size = float(train_params.get("test_size", 0.2))
+    random_state = int(train_params.get("random_state", 42))
+    n_iter = int(train_params.get("n_iter_search", 10))
+    cpu_budget = resolve_cpu_budget(
+        args.cpu_budget if args.cpu_budget is not None else int(train_params.get("cpu_budget", 0))
+    )
+    max_parallel = (
+        args.max_parallel
+        if args.max_parallel is not None
+        else int(train_params.get("max_parallel", 0))
+    )
+    search_cfg = SearchConfig.from_params(train_params)
+    selection_cfg = SelectionConfig.from_params(train_params)
+    if args.search_mode:
+        search_cfg = replace(search_cfg, mode=args.search_mode)
+    cache_dir = None
+    if not args.no_preprocessing_cache:
+        cache_dir = train_params.get("preprocessing_cache") or None
+
+    df = read_dataset(Path(args.data_path))
     schema = Schema()
     X, y = split_xy(df, schema)
 
@@ -167,40 +489,136 @@ def main() -> None:
     if _MLFLOW_AVAILABLE:
         mlflow.set_experiment("credit_scoring_pd")
 
-    # >= 5 experiments total
-    experiments = [
-        ("logreg", LogisticRegression(max_iter=500), False),
-        ("logreg", LogisticRegression(max_iter=500), True),
-        ("rf", RandomForestClassifier(random_state=42), False),
-        ("rf", RandomForestClassifier(random_state=42), True),
-        ("gb", GradientBoostingClassifier(random_state=42), False),
-        ("svc", SVC(probability=True, random_state=42), False),
-    ]
+    experiments = default_experiments()
+
+    history = load_history(Path(search_cfg.history_path)) if search_cfg.history_path else None
+    fingerprint = data_fingerprint(X_train, y_train, schema.categorical)
+    warm: Dict[str, WarmStart] = {}
+    if history is not None and search_cfg.warm_start and not args.cold_start:
+        warm = plan_warm_starts(experiments, history, fingerprint, search_cfg)
+        for run_name, ws in warm.items():
+            print(
+                f"Warm start {run_name}: drift={ws.drift:.3f} "
+                f"budget={ws.budget_fraction:.0%} candidates={len(ws.candidates)}"
+            )
+
+    def on_done(res: JobResult) -> None:
+        # MLflow пишется только из основного процесса: runs не пересекаются
+        log_experiment(res.value, y_test, n_jobs=res.n_jobs)
+        print(
+            f"  {res.key}: roc_auc={res.value.metrics['roc_auc']:.4f} "
+            f"n_jobs={res.n_jobs} {res.seconds:.1f}s"
+        )
+
+    results = run_experiments(
+        experiments,
+        X_train,
+        y_train,
+        X_test,
+        y_test,
+        n_iter,
+        cpu_budget,
+        max_parallel,
+        on_done,
+        cache_dir=cache_dir,
+        search=search_cfg,
+        warm=warm,
+    )
+    if cache_dir:
+        Memory(cache_dir, verbose=0).reduce_size(bytes_limit=PREPROCESSING_CACHE_LIMIT)
+    if history is not None:
+        for res in results:
+            if res.value.search_top:
+                record_search(
+                    history, res.key, fingerprint, res.value.search_top, res.value.search_info
+                )
+        save_history(Path(search_cfg.history_path), history)
+    report = schedule_report(results, cpu_budget, max_parallel)
+    print(
+        f"Experiments wall-clock: {report['wall_seconds']:.1f}s "
+        f"(cpu_budget={cpu_budget}, max_parallel={max_parallel or 'auto'})"
+    )
 
-    best_auc = -1.0
-    best_model = None
-    best_name = None
-
-    for name, est, tune in experiments:
-        metrics, model = run_one_experiment(
-            name=name,
-            estimator=est,
-            X_train=X_train,
-            y_train=y_train,
-            X_test=X_test,
-            y_test=y_test,
-            tune=tune,
-            n_iter=n_iter,
+    if args.compare_serial:
+        # Свой холодный кэш, чтобы serial-прогон не пользовался результатами первого
+        with tempfile.TemporaryDirectory() as tmp_cache:
+            serial = run_experiments(
+                experiments,
+                X_train,
+                y_train,
+                X_test,
+                y_test,
+                n_iter,
+                cpu_budget,
+                max_parallel=1,
+                cache_dir=tmp_cache if cache_dir else None,
+                search=search_cfg,
+                warm=warm,
+            )
+        report["serial"] = schedule_report(serial, cpu_budget, 1)
+        report["speedup"] = round(
+            report["serial"]["wall_seconds"] / max(report["wall_seconds"], 1e-9), 3
         )
-        if metrics["roc_auc"] > best_auc:
-            best_auc = metrics["roc_auc"]
-            best_model = model
-            best_name = f"{name}{'_tuned' if tune else ''}"
+        print(
+            f"Serial wall-clock: {report['serial']['wall_seconds']:.1f}s "
+            f"(speedup {report['speedup']:.2f}x)"
+        )
+
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    if _MLFLOW_AVAILABLE:
+        with mlflow.start_run(run_name="schedule"):
+            mlflow.log_params({"cpu_budget": cpu_budget, "max_parallel": max_parallel})
+            mlflow.log_metric("wall_seconds", report["wall_seconds"])
+            mlflow.log_metric("sum_task_seconds", report["sum_task_seconds"])
+            if "speedup" in report:
+                mlflow.log_metric("serial_wall_seconds", report["serial"]["wall_seconds"])
+                mlflow.log_metric("speedup", report["speedup"])
+            mlflow.log_artifact(str(report_path))
+
+    # Замеры задержки — в основном процессе после обучения, чтобы не мешали друг другу;
+    # порядок results = порядок experiments: при равном AUC выигрывает первый, как раньше
+    selection = select_model(
+        [
+            candidate_entry(r.key, r.value.model, r.value.metrics["roc_auc"], X_test, selection_cfg)
+            for r in results
+        ],
+        selection_cfg,
+    )
+    print(f"Model selection (SLO: {slo_summary(selection_cfg) or 'none, AUC only'}):")
+    print("\n".join(describe(selection)))
+    if not selection["slo_met"]:
+        print(f"WARNING: no candidate meets the SLO, falling back to {selection['selected']}")
+    log_selection(selection, selection_cfg, Path(args.selection_report_path))
+
+    best = next(r for r in results if r.key == selection["selected"])
+    best_auc = best.value.metrics["roc_auc"]
 
     out_path = Path(args.model_path)
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(best_model, out_path)
-    print(f"Saved best model: {out_path} (best={best_name}, roc_auc={best_auc:.4f})")
+    joblib.dump(best.value.model, out_path)
+    print(f"Saved best model: {out_path} (best={best.key}, roc_auc={best_auc:.4f})")
+
+    if not args.no_onnx:
+        # Расхождение с sklearn роняет обучение: ONNX-артефакт не должен молча врать
+        onnx_report = export_selected(
+            best.value.model,
+            X_test,
+            best.value.cat_cols,
+            Path(args.onnx_path),
+            Path(args.onnx_report_path),
+            selection_cfg.batch_sizes,
+            selection_cfg.repeats,
+        )
+        print(describe_onnx(onnx_report))
+        if _MLFLOW_AVAILABLE:
+            with mlflow.start_run(run_name="onnx_export"):
+                mlflow.log_param("model", best.key)
+                mlflow.log_metric("onnx_max_abs_diff", onnx_report["parity"]["max_abs_diff"])
+                for bs, speedup in onnx_report["latency"]["speedup_p50"].items():
+                    mlflow.log_metric(f"onnx_speedup_p50_b{bs}", speedup)
+                mlflow.log_artifact(args.onnx_report_path)
 
 
 if __name__ == "__main__":
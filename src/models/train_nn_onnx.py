@@ -1,5 +1,23 @@
+"""Обучение MLP-пайплайна и экспорт в ONNX.
+
+``--mode full`` (по умолчанию) — обучение с нуля на ``--data-path``.
+``--mode incremental`` — дообучение предыдущего ``nn_model.joblib``: обученный
+препроцессор не меняется, сеть обновляется ``partial_fit`` только на новых
+данных (``--new-data-path`` или партиции ``--data-path``, которых ещё нет в
+``<model>.meta.json``) плюс replay-выборка старых строк (``--replay-ratio``).
+Строки новых данных, совпадающие со старым test-сплитом, отбрасываются (иначе
+partial_fit учится на строках, по которым затем считается AUC). sha256 файла
+новых данных пишется в meta (``applied_batches``); уже применённый файл
+повторно не применяется.
+``--compare-full`` дополнительно обучает модель с нуля на старых+новых данных
+и пишет в отчёт AUC обеих и сэкономленное время.
+"""
+
 import argparse
+import json
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 
 import joblib
 import numpy as np
@@ -14,6 +32,20 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.pipeline import Pipeline
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 
+from src.data.columnar import (
+    PARTITION_MANIFEST,
+    is_partitioned_path,
+    read_dataset,
+    read_manifest,
+)
+from src.data.make_dataset import file_sha256
+from src.features.engine import with_engineered
+
+TARGET = "default"
+CAT_COLS = ["SEX", "EDUCATION", "MARRIAGE", "AGE_BIN"]
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
+
 
 def build_preprocessor(cat_cols, num_cols) -> ColumnTransformer:
     num_pipe = Pipeline(
@@ -37,6 +69,16 @@ def build_preprocessor(cat_cols, num_cols) -> ColumnTransformer:
     )
 
 
+def build_mlp() -> MLPClassifier:
+    return MLPClassifier(
+        hidden_layer_sizes=(64, 32),
+        activation="relu",
+        solver="adam",
+        max_iter=30,
+        random_state=RANDOM_STATE,
+    )
+
+
 def infer_types_from_df(df: pd.DataFrame, cat_cols):
     initial_types = []
     for c in df.columns:
@@ -47,30 +89,13 @@ def infer_types_from_df(df: pd.DataFrame, cat_cols):
     return initial_types
 
 
-def main() -> None:
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--data-path", default="data/processed/credit.csv")
-    parser.add_argument("--model-path", default="models/nn_model.joblib")
-    parser.add_argument("--onnx-path", default="models/nn_model.onnx")
-    args = parser.parse_args()
-
-    df = pd.read_csv(args.data_path)
-
-    target = "default"
-    X = df.drop(columns=[target])
-
-    for c in X.columns:
-        if X[c].dtype == "object":
-            X[c] = X[c].astype(str)
-        else:
-            X[c] = X[c].astype(np.float32)
-
-    y = df[target].astype(int)
+def prepare_xy(df: pd.DataFrame) -> Tuple[pd.DataFrame, pd.Series, List[str], List[str]]:
+    df = with_engineered(df)
+    X = df.drop(columns=[TARGET])
+    y = df[TARGET].astype(int)
 
-    cat_cols = ["SEX", "EDUCATION", "MARRIAGE", "AGE_BIN"]
-    cat_cols = [c for c in cat_cols if c in X.columns]
+    cat_cols = [c for c in CAT_COLS if c in X.columns]
     num_cols = [c for c in X.columns if c not in cat_cols]
-    X = X.copy()
 
     # Категориальные -> строка (важно для ONNX)
     for c in cat_cols:
@@ -79,42 +104,289 @@ def main() -> None:
     # Остальные -> float32
     for c in num_cols:
         X[c] = X[c].astype(np.float32)
+    return X, y, cat_cols, num_cols
 
-    X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42, stratify=y
+
+def split(X: pd.DataFrame, y: pd.Series):
+    return train_test_split(X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y)
+
+
+def fit_full(X_train: pd.DataFrame, y_train: pd.Series, cat_cols, num_cols) -> Pipeline:
+    pipe = Pipeline(
+        steps=[("prep", build_preprocessor(cat_cols, num_cols)), ("model", build_mlp())]
     )
+    pipe.fit(X_train, y_train)
+    return pipe
 
-    pre = build_preprocessor(cat_cols, num_cols)
 
-    nn = MLPClassifier(
-        hidden_layer_sizes=(64, 32),
-        activation="relu",
-        solver="adam",
-        max_iter=30,
-        random_state=42,
+def partial_fit_pipeline(
+    pipe: Pipeline,
+    X_new: pd.DataFrame,
+    y_new: pd.Series,
+    X_replay: Optional[pd.DataFrame] = None,
+    y_replay: Optional[pd.Series] = None,
+    epochs: int = 5,
+    random_state: int = RANDOM_STATE,
+) -> Pipeline:
+    """Дообучает сеть на новых (+ replay) строках; препроцессор не переобучается."""
+    if X_replay is not None and len(X_replay):
+        X_new = pd.concat([X_new, X_replay], axis=0)
+        y_new = pd.concat([y_new, y_replay], axis=0)
+    Xt = pipe.named_steps["prep"].transform(X_new[pipe.feature_names_in_])
+    yt = y_new.to_numpy()
+    model = pipe.named_steps["model"]
+    rng = np.random.default_rng(random_state)
+    for _ in range(epochs):
+        # Один partial_fit — одна эпоха мини-батчей (batch_size MLP) по перемешанным строкам
+        idx = rng.permutation(len(yt))
+        model.partial_fit(Xt[idx], yt[idx])
+    return pipe
+
+
+def replay_sample(
+    X_old: pd.DataFrame, y_old: pd.Series, n_rows: int, random_state: int = RANDOM_STATE
+) -> Tuple[pd.DataFrame, pd.Series]:
+    n_rows = min(n_rows, len(X_old))
+    if n_rows <= 0:
+        return X_old.iloc[:0], y_old.iloc[:0]
+    idx = np.random.default_rng(random_state).choice(len(X_old), size=n_rows, replace=False)
+    return X_old.iloc[idx], y_old.iloc[idx]
+
+
+def export_onnx(pipe: Pipeline, X_sample: pd.DataFrame, cat_cols, onnx_path: Path) -> None:
+    initial_types = infer_types_from_df(X_sample.iloc[:5].copy(), cat_cols=cat_cols)
+    onnx_model = convert_sklearn(pipe, initial_types=initial_types, target_opset=12)
+    onnx_path.parent.mkdir(parents=True, exist_ok=True)
+    onnx_path.write_bytes(onnx_model.SerializeToString())
+
+
+def meta_path_for(model_path: Path) -> Path:
+    return model_path.with_suffix(".meta.json")
+
+
+def read_meta(model_path: Path) -> Dict[str, Any]:
+    path = meta_path_for(model_path)
+    return json.loads(path.read_text(encoding="utf-8")) if path.exists() else {}
+
+
+def write_meta(model_path: Path, meta: Dict[str, Any]) -> None:
+    meta_path_for(model_path).write_text(
+        json.dumps(meta, ensure_ascii=False, indent=2), encoding="utf-8"
     )
 
-    pipe = Pipeline(steps=[("prep", pre), ("model", nn)])
-    pipe.fit(X_train, y_train)
+
+def dataset_partitions(path: Path) -> List[str]:
+    return sorted(read_manifest(path).get("partitions", {})) if is_partitioned_path(path) else []
+
+
+def batch_fingerprint(path: Path) -> str:
+    """sha256 файла новых данных (для каталога партиций — его манифеста)."""
+    path = Path(path)
+    return file_sha256(path / PARTITION_MANIFEST if path.is_dir() else path)
+
+
+def drop_overlap(
+    X: pd.DataFrame, y: pd.Series, X_ref: pd.DataFrame, y_ref: pd.Series
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """Убирает из (X, y) строки, целиком совпадающие со строками (X_ref, y_ref)."""
+    cols = list(X_ref.columns)
+
+    def row_hash(X_part: pd.DataFrame, y_part: pd.Series) -> pd.Series:
+        frame = X_part[cols].assign(**{TARGET: y_part.to_numpy()})
+        return pd.util.hash_pandas_object(frame, index=False)
+
+    keep = ~row_hash(X, y).isin(set(row_hash(X_ref, y_ref))).to_numpy()
+    return X[keep], y[keep]
+
+
+def load_old_new(
+    data_path: Path, new_data_path: Optional[Path], trained_partitions: List[str]
+) -> Tuple[pd.DataFrame, pd.DataFrame, List[str]]:
+    """(старые данные, новые данные, все партиции после обновления)."""
+    partitions = dataset_partitions(data_path)
+    if new_data_path is not None:
+        return read_dataset(data_path), read_dataset(new_data_path), partitions
+    if not partitions:
+        raise ValueError(
+            "--mode incremental needs --new-data-path or a partitioned --data-path "
+            "(new partitions are those missing from the model meta)"
+        )
+    new_keys = [k for k in partitions if k not in set(trained_partitions)]
+    old_keys = [k for k in partitions if k in set(trained_partitions)]
+    if not new_keys:
+        raise ValueError(f"No new partitions in {data_path} since the last training")
+    if not old_keys:
+        raise ValueError("Model meta has no trained partitions: run --mode full first")
+    old = read_dataset(data_path, partitions=old_keys)
+    return old, read_dataset(data_path, partitions=new_keys), partitions
+
+
+def run_full(args) -> Dict[str, Any]:
+    data_path = Path(args.data_path)
+    X, y, cat_cols, num_cols = prepare_xy(read_dataset(data_path))
+    X_train, X_test, y_train, y_test = split(X, y)
+
+    t0 = time.perf_counter()
+    pipe = fit_full(X_train, y_train, cat_cols, num_cols)
+    seconds = time.perf_counter() - t0
 
     proba = pipe.predict_proba(X_test)[:, 1]
     auc = roc_auc_score(y_test, proba)
     print(f"NN pipeline trained. ROC-AUC={auc:.4f}")
+    return {
+        "pipe": pipe,
+        "X_sample": X_train,
+        "cat_cols": cat_cols,
+        "meta": {
+            "mode": "full",
+            "partitions": dataset_partitions(data_path),
+            "rows": int(len(X)),
+            "roc_auc": round(float(auc), 4),
+            "fit_seconds": round(seconds, 3),
+        },
+    }
+
+
+def run_incremental(args) -> Dict[str, Any]:
+    model_path = Path(args.model_path)
+    prev_meta = read_meta(model_path)
+    applied = list(prev_meta.get("applied_batches", []))
+    fingerprint = batch_fingerprint(Path(args.new_data_path)) if args.new_data_path else None
+    if fingerprint is not None and fingerprint in applied:
+        return {"skipped": f"{args.new_data_path} already applied (sha256 {fingerprint[:12]})"}
+    old_df, new_df, partitions = load_old_new(
+        Path(args.data_path),
+        Path(args.new_data_path) if args.new_data_path else None,
+        prev_meta.get("partitions", []),
+    )
+    X_old, y_old, cat_cols, num_cols = prepare_xy(old_df)
+    X_new, y_new, _, _ = prepare_xy(new_df)
+    # Тот же сплит, что при полном обучении: старый test не попадает в обучение,
+    # оценка — на объединении старого и нового test
+    X_old_train, X_old_test, y_old_train, y_old_test = split(X_old, y_old)
+    # Новые данные могут быть выборкой из тех же строк (simulate_production_data)
+    n_new = len(X_new)
+    X_new, y_new = drop_overlap(X_new, y_new, X_old_test, y_old_test)
+    dropped = n_new - len(X_new)
+    if dropped:
+        print(f"Dropped {dropped} new rows that are in the old test split")
+    if X_new.empty:
+        return {"skipped": "all new rows are in the old test split"}
+    X_new_train, X_new_test, y_new_train, y_new_test = split(X_new, y_new)
+    X_test = pd.concat([X_old_test, X_new_test], axis=0)
+    y_test = pd.concat([y_old_test, y_new_test], axis=0)
+
+    pipe = joblib.load(model_path)
+    auc_before = roc_auc_score(y_test, pipe.predict_proba(X_test)[:, 1])
+
+    X_replay, y_replay = replay_sample(
+        X_old_train, y_old_train, int(round(args.replay_ratio * len(X_new_train)))
+    )
+    t0 = time.perf_counter()
+    partial_fit_pipeline(pipe, X_new_train, y_new_train, X_replay, y_replay, epochs=args.epochs)
+    seconds = time.perf_counter() - t0
+    auc = roc_auc_score(y_test, pipe.predict_proba(X_test)[:, 1])
+    print(
+        f"NN pipeline updated (partial_fit, new={len(X_new_train)}, replay={len(X_replay)}, "
+        f"epochs={args.epochs}) in {seconds:.2f}s. ROC-AUC {auc_before:.4f} -> {auc:.4f}"
+    )
+
+    report: Dict[str, Any] = {
+        "new_rows": int(len(X_new_train)),
+        "dropped_test_overlap": int(dropped),
+        "replay_rows": int(len(X_replay)),
+        "epochs": args.epochs,
+        "test_rows": int(len(X_test)),
+        "roc_auc_before": round(float(auc_before), 4),
+        "roc_auc_incremental": round(float(auc), 4),
+        "incremental_seconds": round(seconds, 3),
+    }
+    if args.compare_full:
+        X_all = pd.concat([X_old_train, X_new_train], axis=0)
+        y_all = pd.concat([y_old_train, y_new_train], axis=0)
+        t0 = time.perf_counter()
+        full = fit_full(X_all, y_all, cat_cols, num_cols)
+        full_seconds = time.perf_counter() - t0
+        full_auc = roc_auc_score(y_test, full.predict_proba(X_test)[:, 1])
+        report.update(
+            roc_auc_full=round(float(full_auc), 4),
+            full_seconds=round(full_seconds, 3),
+            auc_gap=round(float(full_auc - auc), 4),
+            seconds_saved=round(full_seconds - seconds, 3),
+            speedup=round(full_seconds / seconds, 2) if seconds > 0 else None,
+        )
+        print(
+            f"Full retrain: ROC-AUC={full_auc:.4f} in {full_seconds:.2f}s "
+            f"(saved {full_seconds - seconds:.2f}s, x{report['speedup']})"
+        )
+
+    return {
+        "pipe": pipe,
+        "X_sample": X_new_train,
+        "cat_cols": cat_cols,
+        "report": report,
+        "meta": {
+            "mode": "incremental",
+            "partitions": partitions,
+            "rows": int(prev_meta.get("rows", len(X_old)) + len(X_new)),
+            "roc_auc": report["roc_auc_incremental"],
+            "fit_seconds": report["incremental_seconds"],
+            "updates": int(prev_meta.get("updates", 0)) + 1,
+            "applied_batches": applied + ([fingerprint] if fingerprint else []),
+        },
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--model-path", default="models/nn_model.joblib")
+    parser.add_argument("--onnx-path", default="models/nn_model.onnx")
+    parser.add_argument("--mode", choices=["full", "incremental"], default="full")
+    parser.add_argument(
+        "--new-data-path",
+        default=None,
+        help="incremental: новые размеченные данные (иначе — новые партиции --data-path)",
+    )
+    parser.add_argument(
+        "--replay-ratio",
+        type=float,
+        default=0.5,
+        help="incremental: replay старых строк, доля от числа новых (0 — без replay)",
+    )
+    parser.add_argument("--epochs", type=int, default=5, help="incremental: проходов partial_fit")
+    parser.add_argument(
+        "--compare-full",
+        action="store_true",
+        help="incremental: обучить с нуля для сравнения AUC и времени",
+    )
+    parser.add_argument("--report-path", default="reports/nn_incremental.json")
+    args = parser.parse_args()
 
     model_path = Path(args.model_path)
+    if args.mode == "incremental" and not model_path.exists():
+        raise SystemExit(f"--mode incremental needs an existing model: {model_path}")
+    result = run_incremental(args) if args.mode == "incremental" else run_full(args)
+    if "skipped" in result:
+        print(f"Incremental update skipped: {result['skipped']}")
+        return
+
     model_path.parent.mkdir(parents=True, exist_ok=True)
-    joblib.dump(pipe, model_path)
+    joblib.dump(result["pipe"], model_path)
+    write_meta(model_path, result["meta"])
     print(f"Saved sklearn NN model: {model_path}")
 
     # Конвертация в ONNX
-    initial_types = infer_types_from_df(X_train.iloc[:5].copy(), cat_cols=cat_cols)
-    onnx_model = convert_sklearn(pipe, initial_types=initial_types, target_opset=12)
-
     onnx_path = Path(args.onnx_path)
-    onnx_path.parent.mkdir(parents=True, exist_ok=True)
-    onnx_path.write_bytes(onnx_model.SerializeToString())
+    export_onnx(result["pipe"], result["X_sample"], result["cat_cols"], onnx_path)
     print(f"Saved ONNX model: {onnx_path}")
 
+    if "report" in result:
+        report_path = Path(args.report_path)
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        report_path.write_text(json.dumps(result["report"], indent=2), encoding="utf-8")
+        print(f"Saved incremental report: {report_path}")
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,388 @@
+"""Out-of-core обучение MLP / SGD-моделей кусками с диска.
+
+Данные не загружаются целиком: ``iter_dataset_batches`` читает кусками по
+``--chunk-rows`` строк (CSV, Parquet, Feather, партиционированный каталог).
+
+1. Один проход статистик: ``StandardScaler.partial_fit`` по числовым колонкам,
+   точные частоты категорий и reservoir-выборка строк (медианы для импутера).
+   Среднее/дисперсия скейлера пересчитываются с учётом подстановки медианы
+   вместо пропусков, так что препроцессор совпадает с обученным на всём train.
+2. Эпохи обучения: куски проходят через shuffle-буфер (``--shuffle-buffer-rows``),
+   буфер перемешивается и подаётся в ``partial_fit``; у партиционированного
+   датасета порядок партиций перемешивается на каждой эпохе.
+3. Оценка на holdout: строка попадает в test по хэшу её номера (без чтения
+   всего файла для стратификации).
+
+Пиковая память ограничена размером куска, буфера и reservoir, а не датасета.
+Результат — такой же ``Pipeline(prep, model)``, как у ``train_nn_onnx``, плюс
+ONNX и отчёт с памятью и пропускной способностью по фазам.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import roc_auc_score
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+
+from src.data.columnar import is_partitioned_path, iter_dataset_batches, partition_files
+from src.features.engine import MISSING_LABEL
+from src.models.latency import peak_rss_mb
+from src.models.train_nn_onnx import (
+    build_mlp,
+    build_preprocessor,
+    export_onnx,
+    prepare_xy,
+)
+
+STREAMING_MODELS = ("mlp", "sgd")
+CLASSES = np.array([0, 1])
+_STATUS_PATH = Path("/proc/self/status")
+
+
+class AnonMemoryPeak:
+    """Пик анонимной памяти (куча, без страниц memory-mapped файла) по замерам.
+
+    ``ru_maxrss`` включает прочитанные страницы mmap-файла и растёт с размером
+    датасета, хотя это page cache; ``RssAnon`` показывает то, что реально
+    держит процесс. Замеры — после каждого куска и в момент сборки буфера.
+    """
+
+    def __init__(self) -> None:
+        self.peak: Optional[float] = None
+
+    def sample(self) -> None:
+        if not _STATUS_PATH.exists():
+            return
+        for line in _STATUS_PATH.read_text().splitlines():
+            if line.startswith("RssAnon:"):
+                mb = round(int(line.split()[1]) / 1024, 1)
+                self.peak = mb if self.peak is None else max(self.peak, mb)
+                return
+
+
+MEMORY = AnonMemoryPeak()
+
+
+def build_model(name: str, random_state: int = 42):
+    if name == "mlp":
+        return build_mlp()
+    if name == "sgd":
+        return SGDClassifier(loss="log_loss", alpha=1e-4, random_state=random_state)
+    raise ValueError(f"model must be one of {STREAMING_MODELS}, got {name!r}")
+
+
+def holdout_mask(index: np.ndarray, test_size: float, salt: int = 0) -> np.ndarray:
+    """Детерминированный test-флаг строки по её номеру (и соли файла партиции)."""
+    h = (np.asarray(index, dtype=np.uint64) + np.uint64(salt)) * np.uint64(0x9E3779B97F4A7C15)
+    return (h >> np.uint64(11)).astype(np.float64) / float(1 << 53) < test_size
+
+
+def iter_chunks(
+    path: Path, chunk_rows: int, rng: Optional[np.random.Generator] = None
+) -> Iterator[Tuple[pd.DataFrame, int]]:
+    """(кусок, соль holdout); при ``rng`` партиции идут в случайном порядке."""
+    path = Path(path)
+    if not is_partitioned_path(path):
+        for chunk in iter_dataset_batches(path, chunk_rows):
+            yield chunk, 0
+            MEMORY.sample()
+        return
+    files = partition_files(path)
+    if rng is not None:
+        files = [files[i] for i in rng.permutation(len(files))]
+    for part in files:
+        salt = zlib.crc32(part.name.encode("utf-8"))
+        for chunk in iter_dataset_batches(part, chunk_rows):
+            yield chunk, salt
+            MEMORY.sample()
+
+
+def split_chunk(chunk: pd.DataFrame, salt: int, test_size: float):
+    X, y, cat_cols, num_cols = prepare_xy(chunk)
+    test = holdout_mask(chunk.index.to_numpy(), test_size, salt)
+    return X, y, test, cat_cols, num_cols
+
+
+class StreamingStats:
+    """Статистики препроцессинга за один проход по train-строкам."""
+
+    def __init__(self, reservoir_rows: int, random_state: int = 42):
+        self.reservoir_rows = reservoir_rows
+        self.rng = np.random.default_rng(random_state)
+        self.scaler = StandardScaler()
+        self.counts: Dict[str, Counter] = {}
+        self.reservoir: Optional[pd.DataFrame] = None
+        self.rows = 0
+        self.cat_cols: List[str] = []
+        self.num_cols: List[str] = []
+
+    def update(self, X: pd.DataFrame, cat_cols: List[str], num_cols: List[str]) -> None:
+        self.cat_cols, self.num_cols = cat_cols, num_cols
+        self.scaler.partial_fit(X[self.num_cols].to_numpy(dtype=np.float64))
+        for c in self.cat_cols:
+            self.counts.setdefault(c, Counter()).update(X[c].value_counts().to_dict())
+        self._sample(X)
+        self.rows += len(X)
+
+    def _sample(self, X: pd.DataFrame) -> None:
+        # Algorithm R кусками: строка t заменяет случайный слот с вероятностью k/(t+1)
+        k = self.reservoir_rows
+        X = X.reset_index(drop=True)
+        if self.reservoir is None:
+            self.reservoir = X.iloc[:k].copy()
+            X = X.iloc[k:]
+            seen = self.rows + len(self.reservoir)
+        else:
+            fill = max(0, k - len(self.reservoir))
+            if fill:
+                self.reservoir = pd.concat([self.reservoir, X.iloc[:fill]], ignore_index=True)
+                X = X.iloc[fill:]
+            seen = self.rows + fill
+        if X.empty:
+            return
+        t = seen + np.arange(len(X))
+        slots = (self.rng.random(len(X)) * (t + 1)).astype(np.int64)
+        take = np.flatnonzero(slots < k)
+        # При повторе слота побеждает более поздняя строка, как в последовательном алгоритме
+        _, last = np.unique(slots[take][::-1], return_index=True)
+        take = take[::-1][last]
+        for c in X.columns:
+            col = self.reservoir[c].to_numpy(copy=True)
+            col[slots[take]] = X[c].to_numpy()[take]
+            self.reservoir[c] = col
+
+    def medians(self) -> np.ndarray:
+        return np.nanmedian(self.reservoir[self.num_cols].to_numpy(dtype=np.float64), axis=0)
+
+    def modes(self) -> np.ndarray:
+        modes = []
+        for c in self.cat_cols:
+            counts = {k: v for k, v in self.counts[c].items() if k != MISSING_LABEL}
+            # most_frequent у SimpleImputer при равенстве берёт меньшее значение
+            best = max(counts.values(), default=0)
+            modes.append(min((k for k, v in counts.items() if v == best), default=""))
+        return np.array(modes, dtype=object)
+
+    def imputed_moments(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Среднее и дисперсия после подстановки медианы вместо пропусков."""
+        n_obs = np.broadcast_to(self.scaler.n_samples_seen_, self.scaler.mean_.shape)
+        n_obs = n_obs.astype(np.float64)
+        n_miss = self.rows - n_obs
+        med = self.medians()
+        mean = (n_obs * self.scaler.mean_ + n_miss * med) / self.rows
+        var = (
+            n_obs * (self.scaler.var_ + (self.scaler.mean_ - mean) ** 2)
+            + n_miss * (med - mean) ** 2
+        ) / self.rows
+        return mean, var
+
+    def build_preprocessor(self):
+        """ColumnTransformer ``train_nn_onnx`` с потоковыми статистиками."""
+        fit_frame = self.reservoir
+        extra = []
+        for c in self.cat_cols:
+            # Категории, не попавшие в reservoir, всё равно должны быть в OHE
+            for value in sorted(set(self.counts[c]) - set(fit_frame[c])):
+                row = fit_frame.iloc[[0]].copy()
+                row[c] = value
+                extra.append(row)
+        if extra:
+            fit_frame = pd.concat([fit_frame, *extra], ignore_index=True)
+
+        pre = build_preprocessor(self.cat_cols, self.num_cols).fit(fit_frame)
+        num_pipe = pre.named_transformers_["num"]
+        num_pipe.named_steps["imputer"].statistics_ = self.medians()
+        scaler = num_pipe.named_steps["scaler"]
+        scaler.mean_, scaler.var_ = self.imputed_moments()
+        scaler.scale_ = np.where(scaler.var_ > 0, np.sqrt(scaler.var_), 1.0)
+        scaler.n_samples_seen_ = self.rows
+        pre.named_transformers_["cat"].named_steps["imputer"].statistics_ = self.modes()
+        return pre
+
+
+def stats_pass(path: Path, chunk_rows: int, test_size: float, reservoir_rows: int, seed: int):
+    stats = StreamingStats(reservoir_rows, random_state=seed)
+    for chunk, salt in iter_chunks(path, chunk_rows):
+        X, _, test, cat_cols, num_cols = split_chunk(chunk, salt, test_size)
+        if (~test).any():
+            stats.update(X[~test], cat_cols, num_cols)
+    if stats.rows == 0:
+        raise ValueError(f"No training rows in {path}")
+    return stats
+
+
+def train_epoch(
+    model,
+    prep,
+    path: Path,
+    chunk_rows: int,
+    buffer_rows: int,
+    test_size: float,
+    rng: np.random.Generator,
+) -> int:
+    buf_X: List[np.ndarray] = []
+    buf_y: List[np.ndarray] = []
+    buffered = 0
+    rows = 0
+
+    def flush() -> None:
+        Xb, yb = np.concatenate(buf_X), np.concatenate(buf_y)
+        idx = rng.permutation(len(yb))
+        MEMORY.sample()
+        model.partial_fit(Xb[idx], yb[idx], classes=CLASSES)
+        buf_X.clear()
+        buf_y.clear()
+
+    for chunk, salt in iter_chunks(path, chunk_rows, rng):
+        X, y, test, _, _ = split_chunk(chunk, salt, test_size)
+        train = ~test
+        if not train.any():
+            continue
+        buf_X.append(prep.transform(X[train]))
+        buf_y.append(y.to_numpy()[train])
+        buffered += int(train.sum())
+        rows += int(train.sum())
+        if buffered >= buffer_rows:
+            flush()
+            buffered = 0
+    if buf_X:
+        flush()
+    return rows
+
+
+def evaluate(
+    pipe: Pipeline, path: Path, chunk_rows: int, test_size: float, max_rows: int
+) -> Tuple[float, int]:
+    probas: List[np.ndarray] = []
+    labels: List[np.ndarray] = []
+    n = 0
+    for chunk, salt in iter_chunks(path, chunk_rows):
+        X, y, test, _, _ = split_chunk(chunk, salt, test_size)
+        if not test.any():
+            continue
+        probas.append(pipe.predict_proba(X[test])[:, 1])
+        labels.append(y.to_numpy()[test])
+        n += int(test.sum())
+        if n >= max_rows:
+            break
+    y_true, y_score = np.concatenate(labels)[:max_rows], np.concatenate(probas)[:max_rows]
+    return float(roc_auc_score(y_true, y_score)), int(len(y_true))
+
+
+def train_streaming(
+    data_path: Path,
+    model_name: str = "mlp",
+    chunk_rows: int = 50_000,
+    buffer_rows: int = 200_000,
+    epochs: int = 3,
+    test_size: float = 0.2,
+    reservoir_rows: int = 100_000,
+    max_eval_rows: int = 500_000,
+    seed: int = 42,
+) -> Tuple[Pipeline, StreamingStats, Dict]:
+    report: Dict = {
+        "model": model_name,
+        "chunk_rows": chunk_rows,
+        "buffer_rows": buffer_rows,
+        "epochs": epochs,
+        "phases": [],
+    }
+
+    def phase(name: str, rows: int, seconds: float) -> None:
+        report["phases"].append(
+            {
+                "phase": name,
+                "rows": rows,
+                "seconds": round(seconds, 3),
+                "rows_per_s": round(rows / seconds, 1) if seconds > 0 else None,
+                "peak_rss_mb": peak_rss_mb(),
+                "peak_anon_mb": MEMORY.peak,
+            }
+        )
+        print(
+            f"  {name}: {rows} rows in {seconds:.2f}s, "
+            f"peak RSS {peak_rss_mb()} MB (anon {MEMORY.peak} MB)"
+        )
+
+    t0 = time.perf_counter()
+    stats = stats_pass(data_path, chunk_rows, test_size, reservoir_rows, seed)
+    prep = stats.build_preprocessor()
+    phase("stats", stats.rows, time.perf_counter() - t0)
+
+    model = build_model(model_name, seed)
+    rng = np.random.default_rng(seed)
+    for epoch in range(epochs):
+        t0 = time.perf_counter()
+        rows = train_epoch(model, prep, data_path, chunk_rows, buffer_rows, test_size, rng)
+        phase(f"epoch_{epoch + 1}", rows, time.perf_counter() - t0)
+
+    pipe = Pipeline(steps=[("prep", prep), ("model", model)])
+    t0 = time.perf_counter()
+    auc, n_test = evaluate(pipe, data_path, chunk_rows, test_size, max_eval_rows)
+    phase("evaluate", n_test, time.perf_counter() - t0)
+
+    report.update(train_rows=stats.rows, test_rows=n_test, roc_auc=round(auc, 4))
+    report["peak_rss_mb"] = peak_rss_mb()
+    report["peak_anon_mb"] = MEMORY.peak
+    return pipe, stats, report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Out-of-core обучение кусками с диска")
+    parser.add_argument("--data-path", default="data/processed/credit.feather")
+    parser.add_argument("--model", choices=STREAMING_MODELS, default="mlp")
+    parser.add_argument("--model-path", default="models/nn_model_streaming.joblib")
+    parser.add_argument("--onnx-path", default="models/nn_model_streaming.onnx")
+    parser.add_argument("--report-path", default="reports/streaming_train.json")
+    parser.add_argument("--chunk-rows", type=int, default=50_000)
+    parser.add_argument("--shuffle-buffer-rows", type=int, default=200_000)
+    parser.add_argument("--epochs", type=int, default=3)
+    parser.add_argument("--test-size", type=float, default=0.2)
+    parser.add_argument("--reservoir-rows", type=int, default=100_000)
+    parser.add_argument("--max-eval-rows", type=int, default=500_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"Streaming training ({args.model}) from {args.data_path}")
+    pipe, stats, report = train_streaming(
+        Path(args.data_path),
+        model_name=args.model,
+        chunk_rows=args.chunk_rows,
+        buffer_rows=args.shuffle_buffer_rows,
+        epochs=args.epochs,
+        test_size=args.test_size,
+        reservoir_rows=args.reservoir_rows,
+        max_eval_rows=args.max_eval_rows,
+        seed=args.seed,
+    )
+    print(f"ROC-AUC={report['roc_auc']:.4f} (test rows={report['test_rows']})")
+
+    model_path = Path(args.model_path)
+    model_path.parent.mkdir(parents=True, exist_ok=True)
+    joblib.dump(pipe, model_path)
+    print(f"Saved sklearn model: {model_path}")
+
+    if args.onnx_path:
+        export_onnx(pipe, stats.reservoir, stats.cat_cols, Path(args.onnx_path))
+        print(f"Saved ONNX model: {args.onnx_path}")
+
+    report_path = Path(args.report_path)
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    report_path.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"Saved report: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,13 +3,15 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Dict, List, Tuple
 
-import joblib
 import pandas as pd
 from sklearn.metrics import f1_score, precision_score, recall_score, roc_auc_score
 
 from evidently import ColumnMapping, Report
 from evidently.presets import DataDriftPreset, ClassificationPreset
 
+from src.inference.bundle import decision_threshold
+from src.inference.model import load_scorer
+
 
 @dataclass
 class DriftConfig:
@@ -25,7 +27,8 @@ def _split_columns(
 ) -> Tuple[List[str], List[str]]:
     drop_cols = {target_col, prediction_col, proba_col}
     features = [c for c in df.columns if c not in drop_cols]
-    cat = [c for c in features if df[c].dtype == "object"]
+    # object (CSV) и category (Parquet) — оба категориальные
+    cat = [c for c in features if not pd.api.types.is_numeric_dtype(df[c])]
     num = [c for c in features if c not in cat]
     return num, cat
 
@@ -42,12 +45,12 @@ def build_column_mapping(df: pd.DataFrame, cfg: DriftConfig) -> ColumnMapping:
 
 def add_model_predictions(df: pd.DataFrame, model_path: Path, cfg: DriftConfig) -> pd.DataFrame:
     """Добавляет prediction и prediction_proba в датасет (для performance decay / concept drift).
-    Ожидается sklearn Pipeline (joblib).
+    Модель — sklearn Pipeline (joblib), её ONNX-экспорт (``.onnx`` / ``.ort``) или бандл
+    (``.bundle``, ``src.inference.bundle``).
     """
-    pipe = joblib.load(model_path)
     X = df.drop(columns=[cfg.target_col], errors="ignore")
-    proba = pipe.predict_proba(X)[:, 1]
-    pred = (proba >= 0.5).astype(int)
+    proba = load_scorer(model_path)(X)
+    pred = (proba >= decision_threshold(model_path)).astype(int)
     out = df.copy()
     out[cfg.proba_col] = proba.astype(float)
     out[cfg.prediction_col] = pred.astype(int)
@@ -1,8 +1,8 @@
 import argparse
 from pathlib import Path
 
-import pandas as pd
-
+from src.data.columnar import read_dataset
+from src.features.engine import with_engineered
 from src.monitoring.drift import DriftConfig, add_model_predictions, run_evidently_report
 
 
@@ -12,7 +12,7 @@ def main() -> None:
     )
     parser.add_argument(
         "--reference-path",
-        default="data/processed/credit.csv",
+        default="data/processed/credit.feather",
         help="Эталонный датасет (обычно train)",
     )
     parser.add_argument(
@@ -48,8 +48,9 @@ def main() -> None:
             "Сначала сгенерируй их (scripts/drift/simulate_production_data.py)"
         )
 
-    reference = pd.read_csv(ref_path)
-    current = pd.read_csv(cur_path)
+    # Сырой current (без инженерных колонок) досчитывается тем же движком, что и при обучении
+    reference = with_engineered(read_dataset(ref_path))
+    current = with_engineered(read_dataset(cur_path))
 
     cfg = DriftConfig(
         target_col=args.target_col,
@@ -2,7 +2,43 @@ from __future__ import annotations
 
 import sys
 from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
 
 ROOT = Path(__file__).resolve().parents[1]
 
 sys.path.insert(0, str(ROOT))
+
+from src.data.make_dataset import RAW_COLUMNS  # noqa: E402
+from src.models import train_nn_onnx  # noqa: E402
+
+
+@pytest.fixture
+def raw_frame():
+    """Фабрика сырого фрейма: коды 0..2 во всех колонках ``RAW_COLUMNS``, AGE и ``default``."""
+
+    def make(n: int, seed: int = 0) -> pd.DataFrame:
+        rng = np.random.default_rng(seed)
+        df = pd.DataFrame({c: rng.integers(0, 3, n) for c in RAW_COLUMNS})
+        df["AGE"] = rng.integers(21, 70, n)
+        df["default"] = (df["PAY_0"] + rng.normal(size=n) > 1.5).astype(int)
+        return df
+
+    return make
+
+
+@pytest.fixture
+def nn_artifacts(tmp_path):
+    """Фабрика: MLP ``train_nn_onnx`` на фрейме с ``default`` и его ONNX (``tmp_path/nn.onnx``)."""
+
+    def build(df: pd.DataFrame) -> SimpleNamespace:
+        X, y, cat_cols, num_cols = train_nn_onnx.prepare_xy(df)
+        pipe = train_nn_onnx.fit_full(X, y, cat_cols, num_cols)
+        onnx_path = tmp_path / "nn.onnx"
+        train_nn_onnx.export_onnx(pipe, X, cat_cols, onnx_path)
+        return SimpleNamespace(X=X, y=y, cat_cols=cat_cols, pipe=pipe, onnx_path=onnx_path)
+
+    return build
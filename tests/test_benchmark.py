@@ -0,0 +1,46 @@
+import copy
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.models.benchmark import compare, parse_backend, run_suite
+
+
+def test_parse_backend_infers_kind():
+    assert parse_backend("models/nn_model_int8.onnx") == {
+        "name": "nn_model_int8",
+        "kind": "onnx",
+        "path": "models/nn_model_int8.onnx",
+    }
+    assert parse_backend("fast=numpy:models/nn.joblib")["kind"] == "numpy"
+    assert parse_backend("b=models/nn.bundle")["kind"] == "bundle"
+
+
+def test_sweep_and_regression_check(tmp_path):
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=300), "b": rng.normal(size=300)})
+    joblib.dump(LogisticRegression().fit(X, X["a"] > 0), tmp_path / "lr.joblib")
+    backends = [parse_backend(f"lr={tmp_path / 'lr.joblib'}"), parse_backend("gone=missing.onnx")]
+
+    report = run_suite(backends, X, [1, 32], [1, 2], repeats=20, warmup=2, isolate=False)
+    assert [(r["threads"], r["batch_size"]) for r in report["results"]] == [
+        (1, 1),
+        (1, 32),
+        (2, 1),
+        (2, 32),
+    ]
+    row = report["results"][0]
+    assert row["p50_ms"] <= row["p95_ms"] <= row["p99_ms"] and row["rows_per_s"] > 0
+    assert report["skipped"][0]["name"] == "gone"
+
+    assert compare(report, report)["regressions"] == []
+    slower = copy.deepcopy(report)
+    slower["results"][1]["p95_ms"] = report["results"][1]["p95_ms"] * 2 + 1.0
+    slower["results"][2]["rows_per_s"] = report["results"][2]["rows_per_s"] / 2
+    found = compare(slower, report)["regressions"]
+    assert {(r["batch_size"], r["threads"], r["metric"]) for r in found} == {
+        (32, 1, "p95_ms"),
+        (1, 2, "rows_per_s"),
+    }
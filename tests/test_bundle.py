@@ -0,0 +1,41 @@
+import joblib
+import numpy as np
+import pytest
+
+from src.inference.bundle import ModelBundle, decision_threshold
+from src.inference.model import load_scorer
+from src.models import train_nn_onnx
+from src.models.build_bundle import build
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_bundle_roundtrip_maps_weights_without_copies(tmp_path, raw_frame, nn_artifacts):
+    n = 400
+    nn = nn_artifacts(raw_frame(n, seed=1))
+    X, pipe = nn.X, nn.pipe
+    joblib_path = tmp_path / "nn.joblib"
+    joblib.dump(pipe, joblib_path)
+    train_nn_onnx.write_meta(joblib_path, {"mode": "full", "rows": n})
+
+    out = tmp_path / "nn.bundle"
+    report = build(nn.onnx_path, out, joblib_path, threshold=0.3)
+    assert report["numpy_mlp"] and report["features"] == X.shape[1]
+
+    bundle = ModelBundle.open(out)
+    assert bundle.manifest["training"] == {"mode": "full", "rows": n}
+    assert bundle.feature_order == list(X.columns) and decision_threshold(out) == 0.3
+    mlp = bundle.numpy_model()
+    for arr in (mlp.w_num, mlp.table, *mlp.layers[0]):
+        assert not arr.flags.owndata and not arr.flags.writeable
+        assert arr.ctypes.data % 64 == 0
+
+    expected = pipe.predict_proba(X)[:, 1]
+    np.testing.assert_allclose(mlp.predict_proba_frame(X), expected, atol=1e-5)
+    np.testing.assert_allclose(bundle.onnx_model().predict_proba_frame(X), expected, atol=1e-5)
+    np.testing.assert_allclose(load_scorer(out)(X), expected, atol=1e-5)
+
+    raw = bytearray(out.read_bytes())
+    raw[-1] ^= 0xFF
+    out.write_bytes(bytes(raw))
+    with pytest.raises(ValueError, match="checksum"):
+        ModelBundle.open(out).verify()
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from src.data.columnar import ChunkedColumnarWriter, read_dataset, read_schema, write_columnar
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "LIMIT_BAL": [20000.0, 120000.0, 90000.0],
+            "SEX": [2, 1, 2],
+            "AGE": [24, 26, 34],
+            "PAY_0": [2, -1, 0],
+            "BILL_AMT1": [3913.0, 2682.0, 29239.0],
+            "default": [1, 1, 0],
+            "PAY_RATIO": [0.0, 0.5, 0.1],
+            "AGE_BIN": ["<25", "25-34", "25-34"],
+        }
+    )
+
+
+def test_columnar_roundtrip_types_and_schema(tmp_path):
+    for name in ("credit.feather", "credit.parquet"):
+        path = write_columnar(_frame(), tmp_path / name)
+        out = read_dataset(path)
+
+        assert list(out.columns) == list(_frame().columns)
+        assert out["LIMIT_BAL"].dtype == np.float32
+        assert out["SEX"].dtype == np.int8
+        assert out["default"].dtype == np.int8
+        assert isinstance(out["AGE_BIN"].dtype, pd.CategoricalDtype)
+
+        schema = read_schema(path)
+        assert schema["target"] == "default"
+        assert schema["rows"] == 3
+        roles = {c["name"]: c["role"] for c in schema["columns"]}
+        assert roles["SEX"] == "categorical" and roles["LIMIT_BAL"] == "numeric"
+
+
+def test_read_dataset_selects_columns(tmp_path):
+    path = write_columnar(_frame(), tmp_path / "credit.feather")
+    out = read_dataset(path, columns=["AGE", "default"])
+    assert list(out.columns) == ["AGE", "default"]
+
+    csv_path = tmp_path / "credit.csv"
+    _frame().to_csv(csv_path, index=False)
+    out_csv = read_dataset(csv_path, columns=["default", "AGE"])
+    assert list(out_csv.columns) == ["default", "AGE"]
+
+
+def test_chunked_writer_fixes_schema_for_whole_stream(tmp_path):
+    first = _frame()
+    # Во втором куске другие категории AGE_BIN и значения вне диапазона int8 первого куска
+    second = _frame().assign(AGE=[200, 45, 70], AGE_BIN=["65+", "45-54", "nan"])
+    for name in ("credit.feather", "credit.parquet"):
+        with ChunkedColumnarWriter(tmp_path / name) as writer:
+            writer.write(first)
+            writer.write(second)
+        out = read_dataset(tmp_path / name)
+
+        assert len(out) == 6 and out["AGE"].tolist()[3] == 200
+        assert out["AGE_BIN"].tolist() == first["AGE_BIN"].tolist() + second["AGE_BIN"].tolist()
+        assert list(out["AGE_BIN"].cat.categories)[:2] == ["<25", "25-34"]
+        assert out["SEX"].dtype == np.int8
+        assert read_schema(tmp_path / name)["rows"] is None
@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.columnar import write_columnar
+from src.data.compiled_validation import compile_suite
+
+SUITE = {
+    "expectation_suite_name": "tmp",
+    "expectations": [
+        {
+            "expectation_type": "expect_table_columns_to_match_ordered_list",
+            "kwargs": {"column_list": ["AGE", "LIMIT_BAL", "AGE_BIN", "default"]},
+        },
+        {"expectation_type": "expect_table_row_count_to_be_between", "kwargs": {"min_value": 5}},
+        {
+            "expectation_type": "expect_column_values_to_be_between",
+            "kwargs": {"column": "AGE", "min_value": 18, "max_value": 100},
+        },
+        {
+            "expectation_type": "expect_column_values_to_be_between",
+            "kwargs": {"column": "LIMIT_BAL", "min_value": 0, "mostly": 0.8},
+        },
+        {
+            "expectation_type": "expect_column_values_to_be_in_set",
+            "kwargs": {"column": "AGE_BIN", "value_set": ["<25", "25-34"]},
+        },
+        {
+            "expectation_type": "expect_column_values_to_not_be_null",
+            "kwargs": {"column": "default"},
+        },
+    ],
+}
+
+
+def _frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "AGE": [17, 30, 40, 22, 120, 33],
+            "LIMIT_BAL": [1000.0, -5.0, 2000.0, np.nan, 3000.0, 100.0],
+            "AGE_BIN": ["<25", "25-34", "35-44", "<25", "65+", "25-34"],
+            "default": [0, 1, 0, 1, 0, 1],
+        }
+    )
+
+
+def test_compiled_suite_results_and_samples():
+    res = compile_suite(SUITE).validate(_frame())
+    results = res["results"]
+
+    assert res["success"] is False
+    assert [r["success"] for r in results] == [True, True, False, True, False, True]
+    assert results[2]["result"]["partial_unexpected_index_list"] == [0, 4]
+    assert results[2]["result"]["partial_unexpected_list"] == [17, 120]
+    # 1 нарушение из 5 непустых -> 80% >= mostly
+    assert results[3]["result"]["unexpected_count"] == 1
+    assert results[3]["result"]["missing_count"] == 1
+    assert all("elapsed_ms" in r for r in results)
+
+
+def test_chunked_file_validation_matches_in_memory(tmp_path):
+    path = write_columnar(_frame(), tmp_path / "data.feather")
+    plan = compile_suite(SUITE)
+
+    in_memory = plan.validate(_frame())
+    chunked = plan.validate_path(path, chunk_rows=2)
+
+    assert chunked["meta"]["chunks"] == 3
+    for a, b in zip(in_memory["results"], chunked["results"]):
+        assert a["success"] == b["success"]
+        if "unexpected_count" in a.get("result", {}):
+            assert a["result"]["unexpected_count"] == b["result"]["unexpected_count"]
+            assert a["result"]["partial_unexpected_list"] == b["result"]["partial_unexpected_list"]
+            assert (
+                a["result"]["partial_unexpected_index_list"]
+                == b["result"]["partial_unexpected_index_list"]
+            )
+
+
+def test_unsupported_expectation_type_is_rejected():
+    suite = {"expectations": [{"expectation_type": "expect_column_kl_divergence", "kwargs": {}}]}
+    with pytest.raises(ValueError, match="expect_column_kl_divergence"):
+        compile_suite(suite)
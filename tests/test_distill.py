@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.pipeline import Pipeline
+
+from src.inference.model import OnnxModel
+from src.models.distill import StudentMLP, parse_sizes, register_onnx_converter, select_student
+from src.models.onnx_export import export_pipeline
+from src.models.pipeline import build_preprocessor
+
+
+def test_student_learns_teacher_probabilities_and_exports(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 3000
+    X = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(size=n).astype(np.float32),
+            "PAY_0": rng.integers(-2, 9, n).astype(np.int8),
+            "SEX": rng.integers(1, 3, n).astype(np.int8),
+            "AGE_BIN": pd.Categorical(rng.choice(["<25", "25-34", "35-44"], n)),
+        }
+    )
+    y = ((X["LIMIT_BAL"] + 0.3 * X["PAY_0"] + rng.normal(0, 0.5, n)) > 0.5).astype(int)
+    cat_cols, num_cols = ["SEX", "AGE_BIN"], ["LIMIT_BAL", "PAY_0"]
+    teacher = Pipeline(
+        [
+            ("prep", build_preprocessor(cat_cols, num_cols)),
+            ("model", RandomForestClassifier(n_estimators=50, min_samples_leaf=20, random_state=0)),
+        ]
+    ).fit(X, y)
+    p_teacher = teacher.predict_proba(X)[:, 1]
+
+    prep = build_preprocessor(cat_cols, num_cols).fit(X)
+    student = StudentMLP(parse_sizes("8")[0], max_iter=200, random_state=0)
+    pipe = Pipeline([("prep", prep), ("model", student.fit(prep.transform(X), p_teacher))])
+    assert np.abs(pipe.predict_proba(X)[:, 1] - p_teacher).mean() < 0.05
+
+    register_onnx_converter()
+    out = export_pipeline(pipe, X, cat_cols, tmp_path / "student.onnx")
+    assert out["parity"]["max_abs_diff"] < 1e-4
+    assert OnnxModel(tmp_path / "student.onnx").output["n_classes"] == 2
+
+
+def test_select_student_prefers_auc_within_target():
+    def cand(name, auc, p95, n_params):
+        return {
+            "name": name,
+            "roc_auc": auc,
+            "n_params": n_params,
+            "latency_onnx": {64: {"p95_ms": p95}},
+        }
+
+    cands = [
+        cand("logistic", 0.70, 0.05, 40),
+        cand("32", 0.75, 0.1, 1400),
+        cand("64x32", 0.76, 0.5, 5000),
+    ]
+    assert select_student(cands, 0.2, 64) == (cands[1], True)
+    assert select_student(cands, 0.01, 64) == (cands[0], False)
+    assert parse_sizes("0, 16,32x16") == [(), (16,), (32, 16)]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.build_features import build_features
+from src.features.engine import BILL_COLS, PAY_AMT_COLS, engineer_columns, with_engineered
+
+
+def _reference(df: pd.DataFrame) -> pd.DataFrame:
+    """Исходная pandas-реализация, на которой обучались модели."""
+    df = df.copy()
+    df["BILL_AMT_SUM"] = df[list(BILL_COLS)].sum(axis=1)
+    df["PAY_AMT_SUM"] = df[list(PAY_AMT_COLS)].sum(axis=1)
+    denom = df["BILL_AMT_SUM"].replace(0, np.nan)
+    df["PAY_RATIO"] = (df["PAY_AMT_SUM"] / denom).fillna(0.0).clip(lower=0.0)
+    df["AGE_BIN"] = pd.cut(
+        df["AGE"],
+        bins=[0, 25, 35, 45, 55, 65, 200],
+        labels=["<25", "25-34", "35-44", "45-54", "55-64", "65+"],
+        right=False,
+    ).astype(str)
+    return df
+
+
+def _raw(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"AGE": rng.integers(-5, 210, n).astype(float)})
+    for c in BILL_COLS + PAY_AMT_COLS:
+        df[c] = rng.choice([0.0, -500.0, 1000.0, 250.5], n) * rng.integers(0, 3, n)
+    # Граничные случаи: нулевая сумма счетов при ненулевых платежах, пропуски, границы бинов
+    df.loc[0, list(BILL_COLS)] = 0.0
+    df.loc[0, "PAY_AMT1"] = 100.0
+    df.loc[1, "BILL_AMT3"] = np.nan
+    df.loc[2, "AGE"] = np.nan
+    df.loc[3:9, "AGE"] = [0, 25, 35, 64.5, 65, 199.9, 200]
+    return df
+
+
+def test_matches_reference_implementation():
+    df = _raw(5000)
+    expected = _reference(df)
+    actual = build_features(df)
+    pd.testing.assert_frame_equal(actual, expected, check_dtype=False)
+    assert actual.loc[0, "PAY_RATIO"] == 0.0
+
+
+@pytest.mark.parametrize("n", [1, 2, 257])
+def test_arrays_match_frame(n):
+    df = _raw(max(n, 10)).head(n)
+    expected = _reference(df)
+    out = engineer_columns({c: df[c].to_numpy() for c in df.columns})
+    for name, values in out.items():
+        np.testing.assert_array_equal(values, expected[name].to_numpy())
+
+
+def test_with_engineered_keeps_existing_columns():
+    df = build_features(_raw(10))
+    assert with_engineered(df) is df
+    raw = df.drop(columns=["PAY_RATIO", "AGE_BIN"])
+    pd.testing.assert_frame_equal(with_engineered(raw)[df.columns], df)
@@ -0,0 +1,45 @@
+import numpy as np
+import pandas as pd
+
+from src.inference.model import OnnxModel
+from src.models.hgb import build_hgb_pipeline
+from src.models.onnx_export import export_pipeline
+
+
+def _data(n: int = 3000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(size=n).astype(np.float32),
+            "PAY_0": rng.normal(size=n),
+            "SEX": rng.integers(1, 3, n).astype(np.int8),
+            "EDUCATION": rng.integers(0, 7, n).astype(np.int8),
+            "AGE_BIN": pd.Categorical(rng.choice(["<25", "25-34", "35-44", "nan"], n)),
+        }
+    )
+    X.loc[::7, "LIMIT_BAL"] = np.nan
+    y = (
+        (X["LIMIT_BAL"].fillna(0) > 0)
+        ^ (X["SEX"] == 2)
+        ^ X["EDUCATION"].isin([1, 4, 5])
+        ^ (X["AGE_BIN"] == "<25")
+    ).astype(int)
+    return X, y
+
+
+def test_native_categorical_splits_survive_onnx_export(tmp_path):
+    X, y = _data()
+    cat_cols, num_cols = ["SEX", "EDUCATION", "AGE_BIN"], ["LIMIT_BAL", "PAY_0"]
+    pipe = build_hgb_pipeline(cat_cols, num_cols).fit(X, y)
+    model = pipe.named_steps["model"]
+    assert model.is_categorical_.sum() == 3 and pipe.score(X, y) > 0.95
+
+    max_diff = export_pipeline(pipe, X, cat_cols, tmp_path / "hgb.onnx")["parity"]["max_abs_diff"]
+    assert max_diff < 1e-5
+
+    # Неизвестные категории sklearn отправляет по ветке пропусков — ONNX тоже
+    unseen = X.assign(EDUCATION=np.int8(9))
+    onnx_model = OnnxModel(tmp_path / "hgb.onnx")
+    assert onnx_model.inputs.dtypes[onnx_model.inputs.names.index("SEX")] is np.int64
+    onnx_proba = onnx_model.predict_proba_frame(unseen)
+    np.testing.assert_allclose(onnx_proba, pipe.predict_proba(unseen)[:, 1], atol=1e-5)
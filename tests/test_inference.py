@@ -0,0 +1,76 @@
+import numpy as np
+import onnxruntime as ort
+import pandas as pd
+import pytest
+from onnx import TensorProto, helper
+from skl2onnx import convert_sklearn
+from skl2onnx.common.data_types import FloatTensorType
+from sklearn.linear_model import LogisticRegression
+
+from src.inference.decode import decode_probas
+from src.inference.model import OnnxModel
+
+
+def _frame(n: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(5e4, 1e4, n),
+            "SEX": rng.integers(1, 3, n),
+            "AGE": rng.integers(21, 70, n),
+            "PAY_0": rng.integers(-1, 3, n),
+        }
+    )
+    df["default"] = (df["PAY_0"] + rng.normal(size=n) > 1).astype(int)
+    return df
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_zipmap_model_is_read_as_probability_tensor(nn_artifacts):
+    nn = nn_artifacts(_frame())
+    X, pipe, path = nn.X, nn.pipe, nn.onnx_path
+
+    model = OnnxModel(path)
+    assert model.output["kind"] == "tensor"
+    proba = model.predict_proba_frame(X)
+    np.testing.assert_allclose(proba, pipe.predict_proba(X)[:, 1], atol=1e-5)
+
+    # Тот же результат через ZipMap-выход исходной сессии
+    sess = ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+    zipmap = sess.run(["output_probability"], model.inputs.from_frame(X))[0]
+    np.testing.assert_allclose(decode_probas(zipmap), proba, atol=1e-7)
+
+    with pytest.raises(ValueError, match="io_binding"):
+        OnnxModel(path, io_binding=True)  # строковые категории не привязываются
+
+
+def test_io_binding_reuses_output_buffers(tmp_path):
+    df = _frame()
+    X = df.drop(columns=["default"]).astype(np.float32)
+    clf = LogisticRegression().fit(X, df["default"])
+    onx = convert_sklearn(
+        clf,
+        initial_types=[("X", FloatTensorType([None, X.shape[1]]))],
+        options={id(clf): {"zipmap": False}},
+    )
+    # Входы модели — [N, 1] на признак: склеиваем их Concat-ом перед классификатором
+    path = tmp_path / "lr.onnx"
+    path.write_bytes(_per_column_inputs(onx, list(X.columns)).SerializeToString())
+
+    plain, bound = OnnxModel(path), OnnxModel(path, io_binding=True)
+    for n in (1, 64, 64, 7):
+        feeds = bound.inputs.from_frame(X.iloc[:n])
+        np.testing.assert_allclose(bound.run(feeds), plain.run(feeds), atol=1e-7)
+    assert sorted(bound._local.buffers) == [1, 7, 64]
+    np.testing.assert_allclose(plain.run(feeds), clf.predict_proba(X.iloc[:7])[:, 1], atol=1e-5)
+
+
+def _per_column_inputs(onx, columns):
+    graph = onx.graph
+    concat = helper.make_node("Concat", columns, [graph.input[0].name], axis=1)
+    del graph.input[:]
+    graph.input.extend(
+        helper.make_tensor_value_info(c, TensorProto.FLOAT, [None, 1]) for c in columns
+    )
+    graph.node.insert(0, concat)
+    return onx
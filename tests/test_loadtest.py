@@ -0,0 +1,102 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from src.api.app_onnx import CreditBatch
+from src.data.make_dataset import RAW_COLUMNS
+from src.data.synthetic import fit_synthetic
+from src.loadtest.config import LoadTestConfig, Slo
+from src.loadtest.payloads import FIELDS, PayloadSampler
+from src.loadtest.shapes import build_shape
+from src.loadtest.summary import AGGREGATED, evaluate_slo, summarize
+
+HISTORY_HEADER = (
+    "Timestamp,User Count,Type,Name,Requests/s,Failures/s,50%,66%,75%,80%,90%,95%,98%,99%,"
+    "99.9%,99.99%,100%,Total Request Count,Total Failure Count,Total Median Response Time,"
+    "Total Average Response Time,Total Min Response Time,Total Max Response Time,"
+    "Total Average Content Size"
+)
+
+
+def test_shapes_and_payloads(tmp_path):
+    step = build_shape("step", {"start_users": 5, "step_users": 5, "steps": 3, "step_seconds": 10})
+    assert [step.tick(t)[0] for t in (0, 9.9, 10, 25)] == [5, 5, 10, 15]
+    assert step.tick(30) is None
+    spike = build_shape("spike", {"base_users": 2, "spike_users": 50, "warmup_seconds": 5})
+    assert [spike.tick(t)[0] for t in (0, 6)] == [2, 50]
+    assert build_shape("none", {}) is None
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({c: rng.integers(0, 5, 200) for c in RAW_COLUMNS})
+    df["LIMIT_BAL"] = rng.normal(1e5, 2e4, 200)
+    path = tmp_path / "credit.csv"
+    df.to_csv(path, index=False)
+
+    generator = fit_synthetic(df).save(tmp_path / "generator.npz")
+    for sampler in (
+        PayloadSampler.from_dataset(path, rows=50, seed=1),
+        PayloadSampler.from_synthetic(generator, rows=50, seed=1),
+    ):
+        batch = sampler.batch(16)
+        assert set(batch[0]) == set(FIELDS) and isinstance(batch[0]["SEX"], int)
+        # JSON туда-обратно и схема API — как в реальном запросе
+        CreditBatch(records=json.loads(json.dumps(batch)))
+
+
+def test_summary_flags_connection_failures(tmp_path):
+    prefix = tmp_path / "run"
+    rows = [
+        "100,0,,Aggregated,0,0,N/A,N/A,N/A,N/A,N/A,N/A,N/A,N/A,N/A,N/A,N/A,0,0,0,0,0,0,0",
+        "101,5,,Aggregated,0,0,40,0,0,0,0,60,0,70,0,0,0,100,0,0,0,0,0,0",
+        "102,5,,Aggregated,100,0,40,0,0,0,0,80,0,90,0,0,0,200,0,0,0,0,0,0",
+        "103,10,,Aggregated,100,50,50,0,0,0,0,90,0,300,0,0,0,300,50,0,0,0,0,0",
+    ]
+    (tmp_path / "run_stats_history.csv").write_text("\n".join([HISTORY_HEADER, *rows]))
+    (tmp_path / "run_failures.csv").write_text(
+        "Method,Name,Error,Occurrences\nPOST,/predict,CatchResponseError('HTTP 0'),50\n"
+    )
+
+    summary = summarize(str(prefix), LoadTestConfig())
+    assert summary["peak_users"] == 10 and summary["duration_s"] == 3
+    assert [(s["users"], s["requests"], s["failures"]) for s in summary["stages"]] == [
+        (0, 0, 0),
+        (5, 200, 0),
+        (10, 100, 50),
+    ]
+    assert summary["stages"][1]["p95_ms_max"] == 80.0
+    assert "unreachable" in summary["failures"][0]["hint"]
+    failed = {c["metric"] for c in summary["slo"]["checks"] if not c["passed"]}
+    assert not summary["slo"]["passed"] and failed == {"error_rate", "p99_ms"}
+    json.dumps(summary)
+
+
+def test_aggregated_latency_does_not_override_per_request_slo():
+    cfg = LoadTestConfig(
+        slo=Slo(p95_ms=100, p99_ms=250, error_rate=0.01),
+        slo_overrides={"/predict/batch": {"p95_ms": 300, "p99_ms": 600}},
+    )
+    ok = {"requests": 1000, "error_rate": 0.0}
+    metrics = {
+        "POST /predict": {**ok, "p95_ms": 40.0, "p99_ms": 80.0},
+        "POST /predict/batch": {**ok, "p95_ms": 280.0, "p99_ms": 500.0},
+        AGGREGATED: {**ok, "p95_ms": 260.0, "p99_ms": 480.0},
+    }
+    assert evaluate_slo(metrics, cfg)["passed"]
+
+    metrics[AGGREGATED]["error_rate"] = 0.05
+    failed = [
+        (c["name"], c["metric"]) for c in evaluate_slo(metrics, cfg)["checks"] if not c["passed"]
+    ]
+    assert failed == [(AGGREGATED, "error_rate")]
+
+
+def test_history_only_summary_enforces_latency(tmp_path):
+    rows = [
+        "100,5,,Aggregated,10,0,4000,0,0,0,0,5000,0,5000,0,0,0,100,0,0,0,0,0,0",
+        "101,5,,Aggregated,10,0,4000,0,0,0,0,5000,0,5000,0,0,0,200,0,0,0,0,0,0",
+    ]
+    (tmp_path / "slow_stats_history.csv").write_text("\n".join([HISTORY_HEADER, *rows]))
+    summary = summarize(str(tmp_path / "slow"), LoadTestConfig())
+    failed = {c["metric"] for c in summary["slo"]["checks"] if not c["passed"]}
+    assert not summary["slo"]["passed"] and failed == {"p95_ms", "p99_ms"}
@@ -0,0 +1,27 @@
+import numpy as np
+import pytest
+
+from src.inference.model import OnnxModel
+from src.inference.numpy_mlp import NumpyMLP
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_numpy_backend_matches_onnx(raw_frame, nn_artifacts):
+    df = raw_frame(600)
+    df["LIMIT_BAL"] = np.random.default_rng(1).lognormal(11, 1, len(df))
+    nn = nn_artifacts(df)
+    X, pipe = nn.X, nn.pipe
+
+    fast, onnx = NumpyMLP.from_pipeline(pipe), OnnxModel(nn.onnx_path)
+    # Пропуски числовых -> медиана, "nan" -> мода, неизвестная категория -> нулевой one-hot
+    X_odd = X.copy()
+    X_odd.loc[::7, "LIMIT_BAL"] = np.nan
+    X_odd.loc[::5, "EDUCATION"] = "nan"
+    X_odd.loc[::11, "MARRIAGE"] = "42"
+    for frame in (X, X_odd, X.iloc[:1]):
+        np.testing.assert_allclose(
+            fast.predict_proba_frame(frame), onnx.predict_proba_frame(frame), atol=1e-5
+        )
+    np.testing.assert_allclose(
+        fast.predict_proba_frame(X_odd), pipe.predict_proba(X_odd)[:, 1], atol=1e-5
+    )
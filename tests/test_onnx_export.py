@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+
+from src.inference.model import load_scorer
+from src.models.onnx_export import export_pipeline
+from src.models.pipeline import build_preprocessor
+
+
+def _data(n: int = 2000, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.lognormal(10, 1, n).astype(np.float32),
+            "BILL_AMT1": rng.normal(5e4, 3e4, n).astype(np.float32),
+            "PAY_0": rng.integers(-2, 9, n).astype(np.int8),
+            "SEX": rng.integers(1, 3, n).astype(np.int8),
+            "EDUCATION": rng.integers(0, 7, n).astype(np.int8),
+            "AGE_BIN": pd.Categorical(rng.choice(["<25", "25-34", "35-44"], n)),
+        }
+    )
+    X.loc[::9, "BILL_AMT1"] = np.nan
+    X.loc[::13, "AGE_BIN"] = np.nan
+    y = ((X["PAY_0"] > 1) ^ (X["SEX"] == 2) ^ (X["LIMIT_BAL"] > 3e4)).astype(int)
+    return X, y
+
+
+@pytest.mark.parametrize(
+    "estimator", [RandomForestClassifier(n_estimators=30, random_state=0), LogisticRegression()]
+)
+def test_train_pipeline_exports_with_parity(tmp_path, estimator):
+    X, y = _data()
+    cat_cols, num_cols = ["SEX", "EDUCATION", "AGE_BIN"], ["LIMIT_BAL", "BILL_AMT1", "PAY_0"]
+    pipe = Pipeline([("prep", build_preprocessor(cat_cols, num_cols)), ("model", estimator)]).fit(
+        X, y
+    )
+
+    out = export_pipeline(pipe, X, cat_cols, tmp_path / "model.onnx")
+    assert out["parity"]["passed"] and out["parity"]["max_abs_diff"] < 1e-5
+
+    # Пропуск AGE_BIN заменяется модой, неизвестная категория — нулевой one-hot, как в sklearn
+    unseen = X.assign(EDUCATION=np.int8(9))
+    np.testing.assert_allclose(
+        load_scorer(tmp_path / "model.onnx")(unseen), pipe.predict_proba(unseen)[:, 1], atol=1e-5
+    )
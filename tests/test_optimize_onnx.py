@@ -0,0 +1,43 @@
+import numpy as np
+import onnx
+import pandas as pd
+import pytest
+
+from src.models import optimize_onnx
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_optimized_ort_model_matches_original(tmp_path, nn_artifacts):
+    rng = np.random.default_rng(0)
+    n = 400
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(5e4, 1e4, n),
+            "SEX": rng.integers(1, 3, n),
+            "EDUCATION": rng.integers(1, 5, n),
+            "MARRIAGE": rng.integers(1, 4, n),
+            "AGE": rng.integers(21, 70, n),
+            "PAY_0": rng.integers(-1, 3, n),
+            "BILL_AMT1": rng.normal(1e4, 3e3, n),
+            "PAY_AMT1": rng.normal(2e3, 5e2, n),
+        }
+    )
+    df["default"] = (df["PAY_0"] + rng.normal(size=n) > 1).astype(int)
+    nn = nn_artifacts(df)
+    X, onnx_path, out_path = nn.X, nn.onnx_path, tmp_path / "nn.ort"
+    X.loc[0, "EDUCATION"] = "nan"  # пропуск категории идёт через импьютер
+
+    report = optimize_onnx.optimize(
+        onnx_path, out_path, X, batch_sizes=[1], repeats=5, load_repeats=2
+    )
+
+    assert out_path.exists() and report["format"] == "ORT"
+    assert report["max_abs_diff"] <= optimize_onnx.PARITY_ATOL
+    assert report["after"]["nodes"] < report["before"]["nodes"]
+    assert report["passes"]["fuse_matmul_add"] == 3
+    # Переписанный граф остаётся валидной ONNX-моделью
+    rewritten = onnx.load(str(onnx_path))
+    optimize_onnx.rewrite_graph(rewritten)
+    assert "ArrayFeatureExtractor" not in {
+        n.op_type for n in rewritten.graph.node if n.input[0] != "classes"
+    }
@@ -0,0 +1,83 @@
+import json
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.columnar import read_dataset
+from src.data import make_dataset
+from src.data.partitions import prepare_partitions
+
+
+@pytest.fixture
+def raw_partition(raw_frame):
+    def make(n: int, seed: int) -> pd.DataFrame:
+        df = raw_frame(n, seed).rename(columns={"default": "default payment next month"})
+        df.insert(0, "ID", np.arange(n))
+        return df
+
+    return make
+
+
+def _suite(tmp_path):
+    suite = {
+        "expectation_suite_name": "t",
+        "expectations": [
+            {
+                "expectation_type": "expect_table_row_count_to_be_between",
+                "kwargs": {"min_value": 1000},
+            },
+            {
+                "expectation_type": "expect_column_values_to_be_between",
+                "kwargs": {"column": "AGE", "min_value": 18, "max_value": 100},
+            },
+        ],
+    }
+    path = tmp_path / "suite.json"
+    path.write_text(json.dumps(suite), encoding="utf-8")
+    return path
+
+
+def test_only_new_or_changed_partitions_are_rebuilt(tmp_path, monkeypatch, raw_partition):
+    raw, out, suite = tmp_path / "raw", tmp_path / "out", _suite(tmp_path)
+    raw.mkdir()
+    for i, key in enumerate(["2024-01", "2024-02", "2024-03"]):
+        raw_partition(50, i).to_csv(raw / f"{key}.csv", index=False)
+
+    first = prepare_partitions(raw, out, suite_path=suite)
+    assert first["built"] == ["2024-01", "2024-02", "2024-03"]
+
+    second = prepare_partitions(raw, out, suite_path=suite)
+    assert second["built"] == [] and len(second["unchanged"]) == 3
+
+    bad = raw_partition(50, 1)
+    bad.loc[0, "AGE"] = 300
+    bad.to_csv(raw / "2024-02.csv", index=False)
+    (raw / "2024-01.csv").unlink()
+    raw_partition(20, 4).to_csv(raw / "2024-04.csv", index=False)
+
+    third = prepare_partitions(raw, out, suite_path=suite)
+    assert third["built"] == ["2024-02", "2024-04"]
+    assert third["removed"] == ["2024-01"]
+    assert not (out / "2024-01.feather").exists()
+
+    manifest = json.loads((out / "manifest.json").read_text(encoding="utf-8"))
+    # Ожидание на число строк — уровня датасета, в партициях не проверяется
+    assert manifest["partitions"]["2024-04"]["validation"]["success"]
+    assert manifest["partitions"]["2024-02"]["validation"]["failed"] == [
+        "expect_column_values_to_be_between:AGE"
+    ]
+
+    assert len(read_dataset(out)) == 120
+    part = read_dataset(out, columns=["AGE", "AGE_BIN"], partitions=["2024-04"])
+    assert list(part.columns) == ["AGE", "AGE_BIN"] and len(part) == 20
+
+    # Проваленная партиция: сводные файлы не перезаписываются
+    processed = tmp_path / "credit.csv"
+    argv = ["make_dataset", "--raw-dir", str(raw), "--partitioned-path", str(out)]
+    argv += ["--suite-path", str(suite), "--processed-path", str(processed)]
+    monkeypatch.setattr(sys, "argv", argv)
+    with pytest.raises(SystemExit, match="1"):
+        make_dataset.main()
+    assert not processed.exists()
@@ -0,0 +1,33 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.features.engine import with_engineered
+from src.inference.model import OnnxModel
+from src.models import predict
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_batch_scoring_resumes_from_checkpoint(tmp_path, raw_frame, nn_artifacts):
+    n = 500
+    df = raw_frame(n, seed=2)
+    model_path = nn_artifacts(df).onnx_path
+    input_path = tmp_path / "input.csv"
+    df.drop(columns=["default"]).to_csv(input_path, index=False)
+    out = tmp_path / "scored"
+
+    # «Падение» после двух кусков, затем продолжение в двух процессах
+    first = predict.run(input_path, model_path, out, chunk_rows=120, workers=1, max_chunks=2)
+    assert not first["complete"] and first["rows"] == 240
+    second = predict.run(input_path, model_path, out, chunk_rows=120, workers=2)
+    assert second["complete"] and second["rows"] == n - 240 and second["total_rows"] == n
+
+    parts = sorted(out.glob("part-*.parquet"))
+    assert len(parts) == 5
+    scored = pd.concat([pd.read_parquet(p) for p in parts], ignore_index=True)
+    expected = OnnxModel(model_path).predict_proba_frame(with_engineered(df))
+    np.testing.assert_allclose(scored["pred_proba"], expected, atol=1e-6)
+    assert (scored["pred_class"] == (expected >= 0.5)).all()
+
+    with pytest.raises(ValueError, match="chunk_rows"):
+        predict.run(input_path, model_path, out, chunk_rows=100, workers=1)
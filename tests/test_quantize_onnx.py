@@ -0,0 +1,52 @@
+import json
+import sys
+
+import numpy as np
+import onnx
+import pandas as pd
+import pytest
+
+from src.models import quantize_onnx
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_static_quantization_is_gated_on_test_split(tmp_path, monkeypatch, nn_artifacts):
+    rng = np.random.default_rng(0)
+    n = 1000
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(5e4, 1e4, n),
+            "SEX": rng.integers(1, 3, n),
+            "EDUCATION": rng.integers(1, 5, n),
+            "AGE": rng.integers(21, 70, n),
+            "PAY_0": rng.integers(-1, 3, n),
+            "BILL_AMT1": rng.normal(1e4, 3e3, n),
+        }
+    )
+    df["default"] = (df["PAY_0"] + rng.normal(size=n) > 1).astype(int)
+    data_path = tmp_path / "credit.csv"
+    df.to_csv(data_path, index=False)
+    onnx_path = nn_artifacts(df).onnx_path
+
+    static_path, report_path = tmp_path / "static.onnx", tmp_path / "q.json"
+    argv = ["quantize_onnx", "--data-path", str(data_path), "--onnx-path", str(onnx_path)]
+    argv += ["--out-path", str(static_path), "--mode", "static", "--exclude-nodes", "MatMul"]
+    argv += ["--calibration-method", "entropy", "--calibration-rows", "400"]
+    argv += ["--batch-sizes", "1", "--repeats", "5", "--report-path", str(report_path)]
+    monkeypatch.setattr(sys, "argv", argv)
+    quantize_onnx.main()
+
+    report = json.loads(report_path.read_text())
+    gate = report["models"]["static"]["gate"]
+    assert gate["passed"] and report["test_rows"] == 200
+    assert report["calibration"] == {"method": "entropy", "rows": 400, "excluded_nodes": ["MatMul"]}
+    # Исключённый первый слой остался fp32-Gemm, остальные — в QDQ
+    nodes = onnx.load(str(static_path)).graph.node
+    assert [nd.name for nd in nodes if nd.op_type == "Gemm"][0] == "MatMul"
+    assert sum(nd.op_type == "QuantizeLinear" for nd in nodes) >= 2
+
+    # Невыполнимый гейт: модель удаляется, скрипт падает
+    monkeypatch.setattr(sys, "argv", argv + ["--max-p99-abs-diff", "0"])
+    with pytest.raises(SystemExit, match="gate failed"):
+        quantize_onnx.main()
+    assert not static_path.exists()
@@ -0,0 +1,35 @@
+import pandas as pd
+
+from src.data import make_dataset
+
+
+def test_raw_parse_cache_hit_and_invalidation(tmp_path, monkeypatch):
+    calls = []
+
+    def fake_read_raw_xls(path):
+        calls.append(path)
+        return pd.DataFrame({"LIMIT_BAL": [1000.0, 2000.0], "default": [0, 1]})
+
+    monkeypatch.setattr(make_dataset, "read_raw_xls", fake_read_raw_xls)
+    xls = tmp_path / "raw.xls"
+    xls.write_bytes(b"v1")
+    cache_dir = tmp_path / "cache"
+
+    first = make_dataset.read_raw_cached(xls, cache_dir)
+    second = make_dataset.read_raw_cached(xls, cache_dir)
+    assert len(calls) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+    # Другое содержимое -> новый ключ, старая запись удаляется
+    # (кэш другой книги с тем же префиксом имени не трогается)
+    other = cache_dir / "raw-2023-0123456789abcdef-p1.feather"
+    other.write_bytes(b"x")
+    xls.write_bytes(b"v2")
+    make_dataset.read_raw_cached(xls, cache_dir)
+    assert len(calls) == 2
+    assert len(list(cache_dir.glob("raw-*.feather"))) == 2 and other.exists()
+
+    # Новая версия парсера -> промах
+    monkeypatch.setattr(make_dataset, "RAW_PARSER_VERSION", make_dataset.RAW_PARSER_VERSION + 1)
+    make_dataset.read_raw_cached(xls, cache_dir)
+    assert len(calls) == 3
@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+
+from src.api.request_validation import RequestValidator
+from src.data.compiled_validation import compile_suite
+
+SUITE = {
+    "expectations": [
+        {"expectation_type": "expect_table_row_count_to_be_between", "kwargs": {"min_value": 1}},
+        {
+            "expectation_type": "expect_column_values_to_be_between",
+            "kwargs": {"column": "LIMIT_BAL", "min_value": 0},
+        },
+        {
+            "expectation_type": "expect_column_values_to_be_in_set",
+            "kwargs": {"column": "EDUCATION", "value_set": [0, 1, 2, 3]},
+        },
+        {
+            "expectation_type": "expect_column_values_to_be_in_set",
+            "kwargs": {"column": "default", "value_set": [0, 1]},
+        },
+    ]
+}
+
+
+def _validator() -> RequestValidator:
+    return RequestValidator(compile_suite(SUITE).column_checks, fields=["LIMIT_BAL", "EDUCATION"])
+
+
+def test_only_request_fields_are_checked():
+    assert _validator().rule_names == [
+        "expect_column_values_to_be_between:LIMIT_BAL",
+        "expect_column_values_to_be_in_set:EDUCATION",
+    ]
+
+
+def test_record_and_batch_checks_agree():
+    v = _validator()
+    records = [
+        {"LIMIT_BAL": 1000.0, "EDUCATION": 2},
+        {"LIMIT_BAL": -1.0, "EDUCATION": 9},
+        {"LIMIT_BAL": 0.0, "EDUCATION": 3},
+    ]
+    assert v.check_record(records[0]) == []
+    assert v.check_record(records[1]) == v.rule_names
+
+    masks = v.check_columns(
+        {
+            "LIMIT_BAL": np.array([r["LIMIT_BAL"] for r in records]),
+            "EDUCATION": np.array([r["EDUCATION"] for r in records]),
+        }
+    )
+    assert {k: m.tolist() for k, m in masks.items()} == {
+        name: [False, True, False] for name in v.rule_names
+    }
+
+
+class _RecordingModel:
+    def __init__(self):
+        self.columns = []
+
+    def predict_proba_columns(self, columns):
+        self.columns.append(columns)
+        return np.full(len(columns["LIMIT_BAL"]), 0.25)
+
+
+def test_api_ignores_client_engineered_fields(tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from src.api import app_onnx
+    from src.data.make_dataset import RAW_COLUMNS
+
+    suite = {
+        "expectations": [
+            *SUITE["expectations"],
+            {
+                "expectation_type": "expect_column_values_to_be_between",
+                "kwargs": {"column": "PAY_RATIO", "min_value": 0},
+            },
+        ]
+    }
+    suite_path = tmp_path / "suite.json"
+    suite_path.write_text(json.dumps(suite))
+    model = _RecordingModel()
+    monkeypatch.setattr(app_onnx, "SUITE_PATH", suite_path)
+    monkeypatch.setattr(app_onnx, "REQUEST_VALIDATION_MODE", "reject")
+    monkeypatch.setattr(app_onnx, "MODEL", model)
+    monkeypatch.setattr(app_onnx, "SMALL_MODEL", None)
+    monkeypatch.setattr(app_onnx, "REQUEST_VALIDATOR", app_onnx.load_request_validator())
+    assert (
+        "expect_column_values_to_be_between:PAY_RATIO" not in app_onnx.REQUEST_VALIDATOR.rule_names
+    )
+
+    record = {c: 1 for c in RAW_COLUMNS if c != "default"}
+    client = TestClient(app_onnx.app)
+    # PAY_RATIO клиента не проверяется и не доходит до модели — пересчитывается
+    for body in (record, {**record, "PAY_RATIO": -5.0}):
+        assert client.post("/predict", json=body).status_code == 200
+    batch = client.post("/predict/batch", json={"records": [{**record, "PAY_RATIO": -5.0}]})
+    assert batch.status_code == 200
+    assert all(c["PAY_RATIO"].tolist() == [1.0] for c in model.columns)
+    assert client.post("/predict", json={**record, "LIMIT_BAL": -1}).status_code == 422
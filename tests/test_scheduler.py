@@ -0,0 +1,32 @@
+import os
+
+from src.models.scheduler import Job, run_jobs
+
+
+def _work(tag: str, n_jobs: int) -> tuple:
+    return tag, n_jobs, os.getpid()
+
+
+def test_jobs_stay_within_cpu_budget_and_keep_order():
+    jobs = [
+        Job("small", _work, {"tag": "a"}, demand=1, cost=1),
+        Job("search", _work, {"tag": "b"}, demand=4, cost=10),
+        Job("single", _work, {"tag": "c"}, demand=1, cost=5),
+    ]
+    seen = []
+    results = run_jobs(jobs, cpu_budget=4, on_done=seen.append)
+
+    assert [r.key for r in results] == ["small", "search", "single"]
+    assert [r.value[0] for r in results] == ["a", "b", "c"]
+    assert len(seen) == 3
+    # Дорогая задача стартует первой и оставляет по ядру двум однопоточным
+    assert results[1].n_jobs == 2
+    assert all(r.value[1] == r.n_jobs for r in results)
+    assert {r.value[2] for r in results} != {os.getpid()}
+
+
+def test_serial_mode_runs_in_process_with_full_budget():
+    jobs = [Job("search", _work, {"tag": "b"}, demand=4), Job("single", _work, {"tag": "c"})]
+    results = run_jobs(jobs, cpu_budget=4, max_parallel=1)
+    assert [r.n_jobs for r in results] == [4, 1]
+    assert {r.value[2] for r in results} == {os.getpid()}
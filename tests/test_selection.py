@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+from sklearn.linear_model import LogisticRegression
+
+from src.models.selection import SelectionConfig, candidate_entry, select_model
+
+
+def _cand(name, auc, p95_b1, p95_b64):
+    return {
+        "run_name": name,
+        "roc_auc": auc,
+        "size_mb": 1.0,
+        "latency": {1: {"p95_ms": p95_b1}, 64: {"p95_ms": p95_b64}},
+    }
+
+
+def test_best_auc_within_slo_and_fallback_to_fastest():
+    cfg = SelectionConfig(latency_slo_ms={1: 10.0, 64: 40.0})
+    candidates = [
+        _cand("logreg", 0.80, 2.0, 3.0),
+        _cand("rf_tuned", 0.81, 30.0, 90.0),
+        _cand("gb", 0.79, 5.0, 8.0),
+    ]
+    report = select_model(candidates, cfg)
+    assert report["selected"] == "logreg" and report["slo_met"]
+    assert report["best_auc_run"] == "rf_tuned" and report["auc_given_up"] == 0.01
+    assert report["pareto_front"] == ["logreg", "rf_tuned"]
+
+    strict = select_model(candidates, SelectionConfig(latency_slo_ms={1: 1.0}))
+    assert strict["selected"] == "logreg" and not strict["slo_met"]
+
+
+def test_latency_is_measured_per_batch_size():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=200), "b": rng.normal(size=200)})
+    model = LogisticRegression(n_jobs=2).fit(X, (X["a"] > 0).astype(int))
+    cfg = SelectionConfig(batch_sizes=(1, 16), repeats=5, warmup=1)
+    entry = candidate_entry("lr", model, 0.7, X, cfg)
+    assert set(entry["latency"]) == {1, 16}
+    assert entry["latency"][16]["rows_per_s"] > 0 and entry["size_mb"] > 0
+    assert model.n_jobs == 2
+
+
+def test_slo_batch_sizes_are_always_measured():
+    cfg = SelectionConfig.from_params(
+        {"selection": {"batch_sizes": [1, 64], "latency_slo_ms": {128: 10}}}
+    )
+    assert cfg.batch_sizes == (1, 64, 128)
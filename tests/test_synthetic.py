@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+from src.data.make_dataset import PROCESSED_COLUMNS
+from src.data.synthetic import DriftScenario, SyntheticModel, fit_synthetic, generate_chunks
+
+
+def _source(n: int = 2000) -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    risk = rng.normal(size=n)
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.integers(1, 50, n) * 10000.0,
+            "SEX": rng.integers(1, 3, n),
+            "EDUCATION": rng.integers(1, 4, n),
+            "MARRIAGE": rng.integers(1, 3, n),
+            "AGE": rng.integers(21, 70, n),
+        }
+    )
+    for c in ["PAY_0", "PAY_2", "PAY_3", "PAY_4", "PAY_5", "PAY_6"]:
+        df[c] = np.clip(np.round(risk + rng.normal(size=n) * 0.5), -2, 8).astype(int)
+    base = rng.lognormal(9, 1, n)
+    for i in range(1, 7):
+        df[f"BILL_AMT{i}"] = np.round(base * rng.uniform(0.9, 1.1, n))
+        df[f"PAY_AMT{i}"] = np.round(base * 0.05)
+    df["default"] = (risk + rng.normal(size=n) > 1).astype(int)
+    return df
+
+
+def test_generation_is_reproducible_and_in_processed_schema(tmp_path):
+    model = fit_synthetic(_source())
+    model = SyntheticModel.load(model.save(tmp_path / "gen.npz"))
+
+    a = pd.concat(generate_chunks(model, 5000, chunk_rows=1500, seed=7))
+    b = pd.concat(generate_chunks(model, 5000, chunk_rows=1500, seed=7))
+    c = pd.concat(generate_chunks(model, 5000, chunk_rows=1500, seed=8))
+
+    assert list(a.columns) == PROCESSED_COLUMNS
+    assert len(a) == 5000 and a.index[-1] == 4999
+    pd.testing.assert_frame_equal(a, b)
+    assert not a.equals(c)
+    # Совместная структура: задержки коррелируют между месяцами и с дефолтом
+    assert a["PAY_0"].corr(a["PAY_2"]) > 0.5
+    assert a["PAY_0"].corr(a["default"]) > 0.2
+
+
+def test_scheduled_drift_applies_after_start():
+    model = fit_synthetic(_source())
+    scenario = DriftScenario(name="age", kind="shift", column="AGE", value=10, start=0.5)
+    base = pd.concat(generate_chunks(model, 4000, chunk_rows=1000, seed=1))
+    drifted = pd.concat(generate_chunks(model, 4000, chunk_rows=1000, seed=1, scenarios=[scenario]))
+
+    diff = drifted["AGE"] - base["AGE"]
+    assert (diff.iloc[:2000] == 0).all()
+    assert (diff.iloc[2000:] == 10).all()
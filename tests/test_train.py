@@ -0,0 +1,85 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.linear_model import LogisticRegression
+
+from src.models.search_history import data_fingerprint, plan_warm_start, record_search
+from src.models.train import fit_experiment
+
+
+def _data(n: int = 300, seed: int = 0):
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(1e5, 3e4, n),
+            "AGE": rng.integers(21, 70, n),
+            "PAY_0": rng.integers(-2, 4, n),
+            "SEX": rng.integers(1, 3, n).astype(str),
+        }
+    )
+    y = pd.Series((X["PAY_0"] + rng.normal(size=n) > 1).astype(int))
+    return X.iloc[:240], y.iloc[:240], X.iloc[240:], y.iloc[240:]
+
+
+def test_preprocessing_cache_is_reused_and_not_persisted(tmp_path):
+    X_train, y_train, X_test, y_test = _data()
+    est = LogisticRegression(max_iter=200)
+    plain = fit_experiment("logreg", est, X_train, y_train, X_test, y_test, True, n_iter=4)
+    cached = fit_experiment(
+        "logreg", est, X_train, y_train, X_test, y_test, True, n_iter=4, cache_dir=str(tmp_path)
+    )
+
+    assert cached.metrics == plain.metrics
+    assert cached.model.memory is None
+    # Препроцессор обучен по разу на каждом из 3 фолдов и на всём train, а не 4 * 3 + 1 раз
+    assert len(list(tmp_path.rglob("output.pkl"))) == 4
+
+
+def test_halving_search_fits_budget():
+    from src.models.search import SearchConfig
+
+    X_train, y_train, X_test, y_test = _data(600)
+    cfg = SearchConfig(mode="halving", resource="n_samples", factor=3, budget_fits=6)
+    res = fit_experiment(
+        "logreg",
+        LogisticRegression(max_iter=200),
+        X_train,
+        y_train,
+        X_test,
+        y_test,
+        True,
+        0,
+        search=cfg,
+    )
+    info = res.search_info
+    assert info["mode"] == "halving"
+    assert info["n_candidates"][0] > info["n_candidates"][-1]
+    assert info["full_fit_equivalents"] <= cfg.budget * 1.5
+
+
+def test_warm_start_budget_follows_data_drift():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame({"a": rng.normal(size=500), "c": rng.choice(["x", "y"], size=500)})
+    y = pd.Series(rng.integers(0, 2, size=500))
+    dists = {"model__C": [0.01, 0.1, 1.0, 10.0], "model__penalty": ["l1", "l2"]}
+    fp = data_fingerprint(X, y, ["c"])
+    history = {"experiments": {}}
+    record_search(history, "lr", fp, [{"params": {"model__C": 1.0}, "score": 0.7}], {})
+    runs = history["experiments"]["lr"]
+
+    same = plan_warm_start(runs, fp, dists, full_candidates=8)
+    assert same.drift == 0.0 and same.budget_fraction == pytest.approx(0.2)
+    assert len(same.candidates) == 2 and same.candidates[0]["model__C"] == 1.0
+    assert {c["model__C"] for c in same.candidates} <= {0.1, 1.0, 10.0}
+
+    shifted = data_fingerprint(X.assign(a=X["a"] + 3), y, ["c"])
+    assert plan_warm_start(runs, shifted, dists, full_candidates=8) is None
+
+    from sklearn.pipeline import Pipeline
+
+    from src.models.search import SearchConfig, build_search, search_summary
+
+    pipe = Pipeline([("model", LogisticRegression(solver="liblinear"))])
+    search = build_search(pipe, dists, SearchConfig(), len(X), 1, candidates=same.candidates)
+    info = search_summary(search.fit(X[["a"]], y))
+    assert info["mode"] == "warm_grid" and info["n_candidates"] == [2]
@@ -0,0 +1,72 @@
+import json
+import sys
+
+import pandas as pd
+import pytest
+
+from src.data.columnar import read_dataset, write_columnar
+from src.data.partitions import prepare_partitions
+from src.models import train_nn_onnx
+
+
+@pytest.fixture
+def raw_partition(raw_frame):
+    def make(n: int, seed: int) -> pd.DataFrame:
+        return raw_frame(n, seed).rename(columns={"default": "default payment next month"})
+
+    return make
+
+
+def _run(monkeypatch, *argv):
+    monkeypatch.setattr(sys, "argv", ["train_nn_onnx", *argv])
+    train_nn_onnx.main()
+
+
+@pytest.mark.filterwarnings("ignore::sklearn.exceptions.ConvergenceWarning")
+def test_incremental_update_uses_only_new_partitions(tmp_path, monkeypatch, raw_partition):
+    raw, data = tmp_path / "raw", tmp_path / "data"
+    raw.mkdir()
+    for i, key in enumerate(["2024-01", "2024-02"]):
+        raw_partition(300, i).to_csv(raw / f"{key}.csv", index=False)
+    prepare_partitions(raw, data)
+
+    model = tmp_path / "nn.joblib"
+    common = ["--data-path", str(data), "--model-path", str(model)]
+    common += ["--onnx-path", str(tmp_path / "nn.onnx")]
+    _run(monkeypatch, *common)
+    meta = json.loads(model.with_suffix(".meta.json").read_text())
+    assert meta["mode"] == "full" and meta["partitions"] == ["2024-01", "2024-02"]
+
+    raw_partition(200, 7).to_csv(raw / "2024-03.csv", index=False)
+    prepare_partitions(raw, data)
+    report_path = tmp_path / "report.json"
+    incremental = ["--mode", "incremental", "--report-path", str(report_path)]
+    _run(monkeypatch, *common, *incremental, "--compare-full")
+
+    report = json.loads(report_path.read_text())
+    assert report["new_rows"] == 160 and report["replay_rows"] == 80
+    assert {"roc_auc_incremental", "roc_auc_full", "seconds_saved"} <= set(report)
+    meta = json.loads(model.with_suffix(".meta.json").read_text())
+    assert meta["mode"] == "incremental" and meta["partitions"][-1] == "2024-03"
+
+    with pytest.raises(ValueError, match="No new partitions"):
+        _run(monkeypatch, *common, *incremental)
+
+    # Новые данные файлом: строки старого test-сплита отбрасываются, повторный файл пропускается
+    old = read_dataset(data)
+    X_old, y_old, _, _ = train_nn_onnx.prepare_xy(old)
+    test_index = train_nn_onnx.split(X_old, y_old)[1].index
+    (tmp_path / "raw_new").mkdir()
+    raw_partition(200, 11).to_csv(tmp_path / "raw_new" / "2024-04.csv", index=False)
+    prepare_partitions(tmp_path / "raw_new", tmp_path / "data_new")
+    fresh = read_dataset(tmp_path / "data_new")
+    new_path = write_columnar(
+        pd.concat([old.loc[test_index[:40]], fresh], ignore_index=True), tmp_path / "new.parquet"
+    )
+    _run(monkeypatch, *common, *incremental, "--new-data-path", str(new_path))
+    assert json.loads(report_path.read_text())["dropped_test_overlap"] == 40
+    meta = json.loads(model.with_suffix(".meta.json").read_text())
+    assert meta["updates"] == 2 and len(meta["applied_batches"]) == 1
+
+    _run(monkeypatch, *common, *incremental, "--new-data-path", str(new_path))
+    assert json.loads(model.with_suffix(".meta.json").read_text()) == meta
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data.columnar import write_columnar
+from src.models.train_nn_onnx import build_preprocessor, prepare_xy
+from src.models.train_streaming import holdout_mask, stats_pass, train_streaming
+
+
+def _dataset(tmp_path, n: int = 3000):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(
+        {
+            "LIMIT_BAL": rng.normal(1e5, 3e4, n),
+            "AGE": rng.integers(21, 70, n).astype(float),
+            "PAY_0": rng.integers(-2, 4, n).astype(float),
+            "SEX": rng.integers(1, 3, n),
+            "EDUCATION": rng.integers(0, 7, n),
+        }
+    )
+    df.loc[rng.random(n) < 0.1, "LIMIT_BAL"] = np.nan
+    df["default"] = (df["PAY_0"] + rng.normal(size=n) > 1).astype(int)
+    path = tmp_path / "credit.feather"
+    write_columnar(df, path)
+    return df, path
+
+
+def test_streaming_stats_match_full_preprocessor(tmp_path):
+    df, path = _dataset(tmp_path)
+    stats = stats_pass(path, chunk_rows=256, test_size=0.2, reservoir_rows=10_000, seed=0)
+    prep = stats.build_preprocessor()
+
+    X, y, cat_cols, num_cols = prepare_xy(df)
+    train = ~holdout_mask(np.arange(len(df)), 0.2)
+    assert stats.rows == int(train.sum())
+    full = build_preprocessor(cat_cols, num_cols).fit(X[train])
+    np.testing.assert_allclose(prep.transform(X), full.transform(X), rtol=1e-5, atol=1e-6)
+
+
+@pytest.mark.parametrize("model", ["sgd", "mlp"])
+def test_streaming_training_learns(tmp_path, model):
+    _, path = _dataset(tmp_path)
+    pipe, _, report = train_streaming(
+        path, model_name=model, chunk_rows=500, buffer_rows=1000, epochs=2, reservoir_rows=500
+    )
+    assert report["train_rows"] + report["test_rows"] == 3000
+    assert report["roc_auc"] > 0.7
+    assert [p["phase"] for p in report["phases"]] == ["stats", "epoch_1", "epoch_2", "evaluate"]